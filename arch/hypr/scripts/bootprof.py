@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS Autostart Profiler
+Boot cost of exec-once entries, read from /proc
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import argparse
+from pathlib import Path
+from typing import Optional, List, Dict, Set, NamedTuple
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+PROC = Path("/proc")
+HYPRLAND_CONF = Path.home() / ".config" / "hypr" / "hyprland.conf"
+STATE_HOME = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+HISTORY_FILE = STATE_HOME / "carmonyos" / "autostart-history.jsonl"
+HISTORY_SESSIONS = 30
+
+COMPOSITOR_NAMES = ("Hyprland",)
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# Words that start a command line but aren't the program being started
+WRAPPERS = {"env", "nohup", "setsid", "exec", "uwsm", "uwsm-app", "app", "systemd-run", "--"}
+SHELLS = {"sh", "bash", "zsh", "dash", "fish"}
+INTERPRETERS = SHELLS | {"python", "python3", "perl", "node"}
+SHELL_OPERATORS = {"&", "&&", "||", ";", "|"}
+DELAYS = {"sleep", "true"}
+
+_EXEC_ONCE_RE = re.compile(r'^\s*exec-once\s*=\s*(.+?)\s*$', re.MULTILINE)
+
+
+class Proc(NamedTuple):
+    pid: int
+    ppid: int
+    comm: str
+    argv: List[str]
+    start: float        # seconds since boot
+    cpu: float          # user + system seconds, reaped children included
+    rss: int            # bytes
+
+
+class AutostartCost(NamedTuple):
+    command: str
+    pid: Optional[int]
+    start: Optional[float]   # seconds after the compositor started
+    cpu: float
+    rss: int
+    processes: int
+
+    @property
+    def running(self) -> bool:
+        return self.pid is not None
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  /proc Scanner
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def read_proc(pid: int) -> Optional[Proc]:
+    base = PROC / str(pid)
+    try:
+        stat = (base / "stat").read_text()
+        cmdline = (base / "cmdline").read_bytes()
+    except OSError:
+        return None
+    # comm is parenthesised and may itself contain spaces or parentheses
+    lparen, rparen = stat.index('('), stat.rindex(')')
+    fields = stat[rparen + 2:].split()
+    ticks = sum(int(f) for f in fields[11:15])
+    return Proc(
+        pid=pid,
+        ppid=int(fields[1]),
+        comm=stat[lparen + 1:rparen],
+        argv=[a for a in cmdline.decode(errors="replace").split('\0') if a],
+        start=int(fields[19]) / CLK_TCK,
+        cpu=ticks / CLK_TCK,
+        rss=int(fields[21]) * PAGE_SIZE,
+    )
+
+
+def scan(uid: Optional[int] = None) -> Dict[int, Proc]:
+    """Every process of `uid` (default: ours), by pid."""
+    uid = os.getuid() if uid is None else uid
+    procs: Dict[int, Proc] = {}
+    for entry in os.scandir(PROC):
+        if not entry.name.isdigit():
+            continue
+        try:
+            if entry.stat().st_uid != uid:
+                continue
+        except OSError:
+            continue
+        proc = read_proc(int(entry.name))
+        if proc is not None:
+            procs[proc.pid] = proc
+    return procs
+
+
+def boot_time() -> float:
+    with open(PROC / "stat") as f:
+        for line in f:
+            if line.startswith("btime "):
+                return float(line.split()[1])
+    return time.time() - float((PROC / "uptime").read_text().split()[0])
+
+
+def find_compositor(procs: Dict[int, Proc]) -> Optional[Proc]:
+    """The newest compositor process of this user."""
+    found = [p for p in procs.values() if p.comm in COMPOSITOR_NAMES]
+    return max(found, key=lambda p: p.start) if found else None
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Matching
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def command_program(command: str) -> Optional[str]:
+    """Name of the program an exec-once line starts.
+
+    Skips environment assignments, launch wrappers such as uwsm or
+    nohup and leading `sleep N &&` delays, and looks inside `sh -c "..."`.
+    For `bash ~/x.sh` or `python3 foo.py` it is the script, not the
+    interpreter, so the match doesn't land on any other shell.
+    """
+    try:
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+        lexer.whitespace_split = True
+        tokens = list(lexer)
+    except ValueError:
+        tokens = command.split()
+    program = None
+    script = False
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok in SHELL_OPERATORS:
+            if program not in DELAYS:
+                break
+            program, script = None, False
+        elif program is not None:
+            if (not script and not tok.startswith('-')
+                    and program.rstrip("0123456789.") in INTERPRETERS):
+                program, script = os.path.basename(tok), True
+        elif '=' in tok and not tok.startswith(('/', '~', '.')):
+            pass
+        elif tok in WRAPPERS or tok.startswith('-'):
+            pass
+        elif os.path.basename(tok) in SHELLS and tokens[i + 1:i + 2] == ["-c"]:
+            return command_program(tokens[i + 2]) if i + 2 < len(tokens) else None
+        else:
+            program = os.path.basename(tok)
+        i += 1
+    return program if program not in DELAYS else None
+
+
+def _runs(proc: Proc, program: str) -> bool:
+    if not proc.argv:
+        return proc.comm == program[:15]
+    exe = os.path.basename(proc.argv[0])
+    if exe == program or proc.comm == program[:15]:
+        return True
+    # Scripts show up as their interpreter
+    if exe.rstrip("0123456789.") in INTERPRETERS:
+        return any(os.path.basename(a) == program for a in proc.argv[1:3])
+    return False
+
+
+def _subtree(root: int, children: Dict[int, List[int]]) -> List[int]:
+    pids, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, ()))
+    return pids
+
+
+def profile(commands: List[str], procs: Optional[Dict[int, Proc]] = None) -> List[AutostartCost]:
+    """Match each exec-once command to the process it started.
+
+    The match is the earliest process, started after the compositor,
+    whose program is the command's; its whole process tree counts
+    towards CPU and memory. Entries whose process has exited are
+    reported with pid None.
+    """
+    procs = scan() if procs is None else procs
+    compositor = find_compositor(procs)
+    since = compositor.start if compositor else 0.0
+
+    children: Dict[int, List[int]] = {}
+    for p in procs.values():
+        children.setdefault(p.ppid, []).append(p.pid)
+
+    claimed: Set[int] = set()
+    results = []
+    for command in commands:
+        program = command_program(command)
+        candidates = sorted(
+            (p for p in procs.values()
+             if program and p.pid not in claimed and p.start >= since
+             and (compositor is None or p.pid != compositor.pid) and _runs(p, program)),
+            key=lambda p: p.start)
+        if not candidates:
+            results.append(AutostartCost(command, None, None, 0.0, 0, 0))
+            continue
+        root = candidates[0]
+        tree = _subtree(root.pid, children)
+        claimed.update(tree)
+        results.append(AutostartCost(
+            command=command,
+            pid=root.pid,
+            start=root.start - since,
+            cpu=sum(procs[pid].cpu for pid in tree),
+            rss=sum(procs[pid].rss for pid in tree),
+            processes=len(tree),
+        ))
+    return results
+
+
+def exec_once_commands(config: Path = HYPRLAND_CONF) -> List[str]:
+    try:
+        return _EXEC_ONCE_RE.findall(config.read_text())
+    except OSError:
+        return []
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  History
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def load_history(path: Path = HISTORY_FILE) -> List[dict]:
+    sessions = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    sessions.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return sessions
+
+
+def record_session(commands: List[str], path: Path = HISTORY_FILE,
+                   keep: int = HISTORY_SESSIONS) -> Optional[dict]:
+    """Append this login's costs to the rolling history.
+
+    Returns None when the current compositor session is already recorded.
+    """
+    procs = scan()
+    compositor = find_compositor(procs)
+    started = boot_time() + compositor.start if compositor else None
+    sessions = load_history(path)
+    if started is not None and any(abs(s.get("compositor_start", 0) - started) < 1 for s in sessions):
+        return None
+
+    session = {
+        "time": time.time(),
+        "compositor_start": started,
+        "entries": [
+            {"command": c.command, "start": c.start, "cpu": c.cpu, "rss": c.rss,
+             "running": c.running}
+            for c in profile(commands, procs)
+        ],
+    }
+    sessions = (sessions + [session])[-keep:]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        for s in sessions:
+            f.write(json.dumps(s) + "\n")
+    os.replace(tmp, path)
+    return session
+
+
+def command_history(command: str, sessions: List[dict]) -> List[dict]:
+    """This command's entries from each recorded session, oldest first."""
+    return [e for s in sessions for e in s.get("entries", ()) if e.get("command") == command]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Formatting
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def format_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def format_cost(cost: AutostartCost) -> str:
+    if not cost.running:
+        return "not running"
+    return f"+{cost.start:.1f} s · {cost.cpu:.1f} s CPU · {format_bytes(cost.rss)}"
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Command Line
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Boot cost of Hyprland exec-once entries")
+    parser.add_argument("--config", type=Path, default=HYPRLAND_CONF)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("show", help="print the current cost of each entry")
+
+    p_record = sub.add_parser("record", help="append this login to the history (run from exec-once)")
+    p_record.add_argument("--delay", type=float, default=0,
+                          help="seconds to wait for the session to settle first")
+
+    p_hist = sub.add_parser("history", help="print the recorded history of each entry")
+    p_hist.add_argument("-n", "--sessions", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    commands = exec_once_commands(args.config)
+
+    if args.command == "show":
+        for cost in profile(commands):
+            print(f"{format_cost(cost):<40} {cost.command}")
+    elif args.command == "record":
+        if args.delay:
+            time.sleep(args.delay)
+        if record_session(commands) is None:
+            print("session already recorded", file=sys.stderr)
+    elif args.command == "history":
+        sessions = load_history()[-args.sessions:]
+        for command in commands:
+            print(command)
+            for e in command_history(command, sessions):
+                if e.get("running"):
+                    print(f"    +{e['start']:6.1f} s  {e['cpu']:6.1f} s CPU  {format_bytes(e['rss'])}")
+                else:
+                    print("    not running")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS Package Database
+Direct readers and search index for the pacman databases
+"""
+
+import os
+import re
+import sys
+import signal
+import argparse
+import time
+import shutil
+import tarfile
+import threading
+import subprocess
+from bisect import bisect_left
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, List, Dict, Set, Tuple, NamedTuple, Any, Callable
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration Paths
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+PACMAN_DB = Path("/var/lib/pacman")
+SYNC_DIR = PACMAN_DB / "sync"
+LOCAL_DIR = PACMAN_DB / "local"
+
+SEARCH_CACHE_TTL = 300
+SEARCH_CACHE_SIZE = 64
+
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+_SEARCH_HEADER_RE = re.compile(r'^(\S+)/(\S+)\s+(\S+)(.*)$')
+_VOTES_RE = re.compile(r'\(\+(\d+)\s+([\d.]+)\)')
+_STEP_RE = re.compile(r'\(\s*(\d+)/(\d+)\)\s+([^\[]*?)\s*(?:\[[^\]]*\]\s*(\d{1,3})%)?\s*$')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Desc Files
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class Package(NamedTuple):
+    name: str
+    version: str
+    description: str
+    repo: str
+    provides: Tuple[str, ...] = ()
+    groups: Tuple[str, ...] = ()
+
+    def as_result(self) -> Dict[str, str]:
+        """The dict shape DownloadsPage renders."""
+        return {"name": self.name, "version": self.version,
+                "description": self.description, "repo": self.repo}
+
+
+def parse_desc(text: str) -> Dict[str, List[str]]:
+    """Parse a pacman `desc` file: %FIELD% headers followed by value lines."""
+    fields: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in text.splitlines():
+        if line.startswith('%') and line.endswith('%') and len(line) > 2:
+            current = fields.setdefault(line[1:-1], [])
+        elif not line:
+            current = None
+        elif current is not None:
+            current.append(line)
+    return fields
+
+
+def package_from_desc(fields: Dict[str, List[str]], repo: str) -> Optional[Package]:
+    try:
+        name, version = fields["NAME"][0], fields["VERSION"][0]
+    except (KeyError, IndexError):
+        return None
+    desc = fields.get("DESC", [""])
+    # Provides may carry a version constraint ("sh=5.2"); only the name matters here
+    provides = tuple(re.split(r'[<>=]', p, 1)[0] for p in fields.get("PROVIDES", ()))
+    return Package(name, version, desc[0] if desc else "", repo,
+                   provides, tuple(fields.get("GROUPS", ())))
+
+
+def _open_db(path: Path) -> tarfile.TarFile:
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:4] == _ZSTD_MAGIC:
+        # tarfile has no zstd support before Python 3.14
+        data = subprocess.run(["zstd", "-dcq"], input=data, capture_output=True,
+                              check=True).stdout
+    return tarfile.open(fileobj=BytesIO(data), mode='r:*')
+
+
+def read_sync_db(path: Path, repo: Optional[str] = None) -> List[Package]:
+    """Read every package from a sync database archive (`<repo>.db`)."""
+    repo = repo or path.name.split('.', 1)[0]
+    packages = []
+    with _open_db(path) as tar:
+        for member in tar:
+            if not member.isfile() or not member.name.endswith('/desc'):
+                continue
+            f = tar.extractfile(member)
+            if f is None:
+                continue
+            pkg = package_from_desc(parse_desc(f.read().decode('utf-8', 'replace')), repo)
+            if pkg:
+                packages.append(pkg)
+    return packages
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Version Comparison
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _rpmvercmp(a: str, b: str) -> int:
+    """Segment-wise comparison, ported from libalpm's rpmvercmp()."""
+    if a == b:
+        return 0
+    i = j = 0
+    prev_i = prev_j = 0
+    while i < len(a) and j < len(b):
+        while i < len(a) and not a[i].isalnum():
+            i += 1
+        while j < len(b) and not b[j].isalnum():
+            j += 1
+        if i >= len(a) or j >= len(b):
+            break
+        # Differing separator lengths decide it
+        if i - prev_i != j - prev_j:
+            return -1 if i - prev_i < j - prev_j else 1
+
+        isnum = a[i].isdigit()
+        kind = str.isdigit if isnum else str.isalpha
+        ei, ej = i, j
+        while ei < len(a) and kind(a[ei]):
+            ei += 1
+        while ej < len(b) and kind(b[ej]):
+            ej += 1
+        seg_a, seg_b = a[i:ei], b[j:ej]
+        if not seg_b:
+            # Numeric segments beat alpha ones
+            return 1 if isnum else -1
+        if isnum:
+            seg_a, seg_b = seg_a.lstrip('0'), seg_b.lstrip('0')
+            if len(seg_a) != len(seg_b):
+                return 1 if len(seg_a) > len(seg_b) else -1
+        if seg_a != seg_b:
+            return 1 if seg_a > seg_b else -1
+        i, j = prev_i, prev_j = ei, ej
+
+    rest_a, rest_b = a[i:], b[j:]
+    if not rest_a and not rest_b:
+        return 0
+    # A leftover alpha segment never beats an empty string
+    if (not rest_a and not rest_b[:1].isalpha()) or rest_a[:1].isalpha():
+        return -1
+    return 1
+
+
+def _split_evr(version: str) -> Tuple[str, str, Optional[str]]:
+    epoch = "0"
+    m = re.match(r'(\d*):', version)
+    if m:
+        epoch, version = m.group(1) or "0", version[m.end():]
+    if '-' in version:
+        version, release = version.rsplit('-', 1)
+        return epoch, version, release
+    return epoch, version, None
+
+
+def vercmp(a: str, b: str) -> int:
+    """Compare two pacman versions like `vercmp`: -1, 0 or 1."""
+    if a == b:
+        return 0
+    epoch_a, ver_a, rel_a = _split_evr(a)
+    epoch_b, ver_b, rel_b = _split_evr(b)
+    ret = _rpmvercmp(epoch_a, epoch_b)
+    if ret == 0:
+        ret = _rpmvercmp(ver_a, ver_b)
+        if ret == 0 and rel_a is not None and rel_b is not None:
+            ret = _rpmvercmp(rel_a, rel_b)
+    return ret
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Local Database
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+STATE_INSTALLED = "installed"
+STATE_OUTDATED = "outdated"
+STATE_NOT_INSTALLED = "not-installed"
+
+
+class LocalIndex:
+    """Installed packages by name, from /var/lib/pacman/local.
+
+    Every installed package is a `<name>-<version>-<release>` directory,
+    so the names alone give the whole index without opening a desc file.
+    pacman adds and removes those entries in every transaction, which
+    bumps the directory's mtime; that is the refresh trigger.
+    """
+
+    def __init__(self, local_dir: Path = LOCAL_DIR):
+        self.local_dir = local_dir
+        self.versions: Dict[str, str] = {}
+        self._stamp: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        with self._lock:
+            try:
+                stamp = self.local_dir.stat().st_mtime_ns
+            except OSError:
+                self.versions, self._stamp = {}, None
+                return False
+            if stamp == self._stamp and not force:
+                return False
+            versions = {}
+            with os.scandir(self.local_dir) as entries:
+                for entry in entries:
+                    parts = entry.name.rsplit('-', 2)
+                    if len(parts) == 3 and entry.is_dir():
+                        versions[parts[0]] = f"{parts[1]}-{parts[2]}"
+            self.versions, self._stamp = versions, stamp
+            return True
+
+    def state(self, name: str, version: str) -> str:
+        installed = self.versions.get(name)
+        if installed is None:
+            return STATE_NOT_INSTALLED
+        if version and vercmp(installed, version) < 0:
+            return STATE_OUTDATED
+        return STATE_INSTALLED
+
+    def annotate(self, results: List[Dict[str, Any]]):
+        """Add `state` and `installed_version` to search result dicts."""
+        self.refresh()
+        for result in results:
+            result["state"] = self.state(result["name"], result["version"])
+            result["installed_version"] = self.versions.get(result["name"])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Sync Search Index
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class SyncIndex:
+    """In-memory search index over the sync databases.
+
+    Like `pacman -Ss`, every term must match, but names are matched
+    anywhere while descriptions and provides are matched by word prefix
+    through an inverted index with a sorted vocabulary (a bisect per
+    term). Name hits rank above description hits. A database is re-read
+    when its mtime or size changes.
+    """
+
+    def __init__(self, sync_dir: Path = SYNC_DIR):
+        self.sync_dir = sync_dir
+        self.packages: List[Package] = []
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._by_repo: Dict[str, List[Package]] = {}
+        self._names: List[str] = []
+        self._descs: List[str] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocab: List[str] = []
+        self._lock = threading.Lock()
+
+    def databases(self) -> List[Path]:
+        """Sync databases in pacman.conf order where it can be recovered."""
+        dbs = sorted(self.sync_dir.glob("*.db"))
+        order = _repo_order()
+        return sorted(dbs, key=lambda p: order.get(p.stem, len(order)))
+
+    def refresh(self) -> bool:
+        """Re-read databases that changed on disk. Returns True if any did."""
+        with self._lock:
+            dbs = self.databases()
+            changed = False
+            seen = set()
+            for db in dbs:
+                seen.add(db.stem)
+                try:
+                    st = db.stat()
+                except OSError:
+                    continue
+                stamp = (st.st_mtime_ns, st.st_size)
+                if self._stamps.get(db.stem) == stamp:
+                    continue
+                try:
+                    self._by_repo[db.stem] = read_sync_db(db)
+                except (OSError, tarfile.TarError, subprocess.CalledProcessError):
+                    self._by_repo.pop(db.stem, None)
+                self._stamps[db.stem] = stamp
+                changed = True
+            for repo in [r for r in self._by_repo if r not in seen]:
+                del self._by_repo[repo]
+                self._stamps.pop(repo, None)
+                changed = True
+            if changed:
+                self._rebuild([db.stem for db in dbs])
+            return changed
+
+    def _rebuild(self, order: List[str]):
+        self.packages = [pkg for repo in order for pkg in self._by_repo.get(repo, ())]
+        self._names = [pkg.name.lower() for pkg in self.packages]
+        self._descs = [pkg.description.lower() for pkg in self.packages]
+        postings: Dict[str, Set[int]] = {}
+        for i, pkg in enumerate(self.packages):
+            text = " ".join((pkg.name, pkg.description, *pkg.provides)).lower()
+            for word in set(_WORD_RE.findall(text)):
+                postings.setdefault(word, set()).add(i)
+        self._postings = postings
+        self._vocab = sorted(postings)
+
+    def _candidates(self, term: str) -> Set[int]:
+        hits = {i for i, name in enumerate(self._names) if term in name}
+        if _WORD_RE.fullmatch(term):
+            i = bisect_left(self._vocab, term)
+            while i < len(self._vocab) and self._vocab[i].startswith(term):
+                hits |= self._postings[self._vocab[i]]
+                i += 1
+        else:
+            # Punctuation in the term ("qt6-base", "c++"): match descriptions directly
+            hits.update(i for i, desc in enumerate(self._descs) if term in desc)
+        return hits
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Package]:
+        terms = query.lower().split()
+        if not terms:
+            return []
+        with self._lock:
+            matches: Optional[Set[int]] = None
+            for term in sorted(terms, key=len, reverse=True):
+                hits = self._candidates(term)
+                matches = hits if matches is None else matches & hits
+                if not matches:
+                    return []
+            ranked = sorted(matches, key=lambda i: (-self._score(i, terms), i))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [self.packages[i] for i in ranked]
+
+    def _score(self, i: int, terms: List[str]) -> int:
+        name = self._names[i]
+        pkg = self.packages[i]
+        score = 0
+        for term in terms:
+            if name == term:
+                score += 100
+            elif name.startswith(term):
+                score += 60
+            elif term in name:
+                score += 40
+            elif term in pkg.provides:
+                score += 30
+            else:
+                score += 10
+        # Shorter names first among equals: "firefox" before "firefox-i18n-de"
+        return score * 100 - min(len(name), 99)
+
+
+def _repo_order() -> Dict[str, int]:
+    order: Dict[str, int] = {}
+    try:
+        with open("/etc/pacman.conf") as f:
+            for line in f:
+                m = re.match(r'\s*\[([^\]]+)\]', line)
+                if m and m.group(1) != "options":
+                    order.setdefault(m.group(1), len(order))
+    except OSError:
+        pass
+    return order
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Package Search
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def parse_search_output(output: str) -> List[Dict[str, Any]]:
+    """Parse `pacman -Ss` / `yay -Ss` output into result dicts.
+
+    Each hit is a `repo/name version [extras]` line followed by an
+    indented description. yay adds `(+votes popularity)` for AUR hits.
+    """
+    results: List[Dict[str, Any]] = []
+    for line in output.splitlines():
+        if line.startswith((' ', '\t')):
+            if results and not results[-1]["description"]:
+                results[-1]["description"] = line.strip()
+            continue
+        m = _SEARCH_HEADER_RE.match(line)
+        if not m:
+            continue
+        repo, name, version, extra = m.groups()
+        result: Dict[str, Any] = {"name": name, "version": version,
+                                  "description": "", "repo": "AUR" if repo == "aur" else repo}
+        votes = _VOTES_RE.search(extra)
+        if votes:
+            result["votes"] = int(votes.group(1))
+            result["popularity"] = float(votes.group(2))
+        results.append(result)
+    return results
+
+
+class SearchJob:
+    """One query across all backends; cancelling kills its processes."""
+
+    def __init__(self, query: str, backends: int):
+        self.query = query
+        self.pending = backends
+        self._cancelled = threading.Event()
+        self._procs: List[subprocess.Popen] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            for proc in self._procs:
+                if proc.poll() is None:
+                    # yay runs pacman itself; take the whole group down
+                    try:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    except OSError:
+                        pass
+
+    def run(self, args: List[str]) -> Optional[str]:
+        """Run `args` and return its stdout, or None if the job was cancelled."""
+        with self._lock:
+            if self.cancelled:
+                return None
+            proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    stdin=subprocess.DEVNULL, text=True,
+                                    start_new_session=True)
+            self._procs.append(proc)
+        out, _ = proc.communicate()
+        with self._lock:
+            self._procs.remove(proc)
+        return None if self.cancelled else out
+
+    def finish_backend(self) -> bool:
+        """Mark one backend's results delivered. Returns True for the last one.
+
+        Call it where the results are consumed, so the last delivery is the
+        one that reports done whatever order the threads finished in.
+        """
+        with self._lock:
+            self.pending -= 1
+            return self.pending == 0
+
+
+class PackageSearch:
+    """Run repository and AUR searches concurrently.
+
+    Each backend reports its results through `callback(job, backend,
+    results)` as soon as it finishes, on the backend's thread; the
+    receiver calls job.finish_backend() as it takes each one.
+    Starting a search cancels the previous one, killing its pacman/yay
+    processes, and subprocess results are kept in a small TTL cache so
+    retyping a recent query costs nothing.
+    """
+
+    def __init__(self, index: Optional[SyncIndex] = None, limit: Optional[int] = None,
+                 ttl: float = SEARCH_CACHE_TTL, local: Optional[LocalIndex] = None):
+        self.index = index
+        self.local = local
+        self.limit = limit
+        self.ttl = ttl
+        self.backends: Dict[str, Callable[[SearchJob], Optional[List[Dict[str, Any]]]]] = {
+            "repo": self._search_repo,
+            "aur": self._search_aur,
+        }
+        self._job: Optional[SearchJob] = None
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def search(self, query: str, callback) -> SearchJob:
+        self.cancel()
+        job = SearchJob(query, len(self.backends))
+        self._job = job
+        for name, backend in self.backends.items():
+            threading.Thread(target=self._run_backend, args=(job, name, backend, callback),
+                             daemon=True, name=f"search-{name}").start()
+        return job
+
+    def cancel(self):
+        if self._job:
+            self._job.cancel()
+            self._job = None
+
+    def _run_backend(self, job: SearchJob, name: str, backend, callback):
+        try:
+            results = backend(job)
+        except Exception:
+            results = []
+        if results is None or job.cancelled:
+            return
+        if self.limit is not None:
+            results = results[:self.limit]
+        if self.local:
+            # Cached result dicts are shared; annotate copies
+            results = [dict(r) for r in results]
+            self.local.annotate(results)
+        callback(job, name, results)
+
+    def _cached(self, job: SearchJob, key: Tuple[str, str], args: List[str]):
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit and now - hit[0] < self.ttl:
+                self._cache.move_to_end(key)
+                return hit[1]
+        out = job.run(args)
+        if out is None:
+            return None
+        results = parse_search_output(out)
+        with self._cache_lock:
+            self._cache[key] = (now, results)
+            self._cache.move_to_end(key)
+            while len(self._cache) > SEARCH_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return results
+
+    def _search_repo(self, job: SearchJob):
+        if self.index:
+            try:
+                self.index.refresh()
+            except Exception:
+                pass
+            if self.index.packages:
+                return [pkg.as_result() for pkg in self.index.search(job.query)]
+        if not shutil.which("pacman"):
+            return []
+        return self._cached(job, ("repo", job.query), ["pacman", "-Ss", job.query])
+
+    def _search_aur(self, job: SearchJob):
+        helper = shutil.which("yay") or shutil.which("paru")
+        if not helper:
+            return []
+        return self._cached(job, ("aur", job.query), [helper, "-Ss", "--aur", job.query])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Transactions
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class InstallProgress(NamedTuple):
+    step: int
+    steps: int
+    message: str
+    percent: Optional[int]
+
+
+def parse_install_progress(line: str) -> Optional[InstallProgress]:
+    """Parse a pacman/yay progress line such as
+    `(3/7) installing python-foo   [####----]  45%`."""
+    m = _STEP_RE.search(line)
+    if not m:
+        return None
+    return InstallProgress(int(m.group(1)), int(m.group(2)), m.group(3),
+                           int(m.group(4)) if m.group(4) else None)
+
+
+def install_command(names: List[str], aur: bool) -> List[str]:
+    """One transaction installing every package in `names`."""
+    if aur:
+        helper = shutil.which("yay") or shutil.which("paru") or "yay"
+        return [helper, "-S", "--needed", "--noconfirm", *names]
+    return ["sudo", "pacman", "-S", "--needed", "--noconfirm", *names]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Command Line
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Search the pacman sync databases")
+    parser.add_argument("query", nargs="+")
+    parser.add_argument("--sync-dir", type=Path, default=SYNC_DIR)
+    parser.add_argument("-n", "--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    index = SyncIndex(args.sync_dir)
+    start = time.perf_counter()
+    index.refresh()
+    loaded = time.perf_counter()
+    results = index.search(" ".join(args.query), args.limit)
+    done = time.perf_counter()
+    for pkg in results:
+        print(f"{pkg.repo}/{pkg.name} {pkg.version}\n    {pkg.description}")
+    print(f"{len(index.packages)} packages indexed in {(loaded - start) * 1000:.0f} ms, "
+          f"query took {(done - loaded) * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
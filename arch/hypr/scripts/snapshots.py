@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS Config Snapshots
+Content-addressed history of config files with undo and redo
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional, List, Dict, Any, NamedTuple
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+STATE_HOME = Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+SNAPSHOT_DIR = STATE_HOME / "carmonyos" / "snapshots"
+
+# Saves of the same kind closer together than this become one undo step,
+# so dragging a slider doesn't leave a snapshot per pixel.
+COALESCE_SECONDS = 2.0
+
+# Retention: at most KEEP_MAX versions per file; versions older than
+# KEEP_DAYS are dropped as long as KEEP_MIN remain.
+KEEP_MAX = 100
+KEEP_MIN = 20
+KEEP_DAYS = 30
+
+DESC_EXTERNAL = "Edited outside Settings"
+DESC_ORIGINAL = "Original"
+
+
+class Snapshot(NamedTuple):
+    digest: str
+    time: float
+    description: str
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Snapshot Store
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class SnapshotStore:
+    """Versions of config files, deduplicated and zlib-compressed.
+
+    Contents live once each under objects/ keyed by their SHA-256; a
+    small index.json holds, per file, the ordered list of versions and
+    the position of the current one. Versions after the position form
+    the redo stack and are discarded when a new version is recorded.
+    """
+
+    def __init__(self, root: Path = SNAPSHOT_DIR):
+        self.root = root
+        self.index_path = root / "index.json"
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # ── Storage ──
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            try:
+                self._index = json.loads(self.index_path.read_text())
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        write_atomic(self.index_path, json.dumps(self._index, indent=1).encode())
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest[2:]
+
+    def _put(self, data: bytes) -> str:
+        digest = content_digest(data)
+        path = self._object_path(digest)
+        if not path.exists():
+            write_atomic(path, zlib.compress(data, 6))
+        return digest
+
+    def read(self, digest: str) -> str:
+        return zlib.decompress(self._object_path(digest).read_bytes()).decode()
+
+    def resolve(self, prefix: str) -> Optional[str]:
+        """Expand an abbreviated digest, as printed by `log`."""
+        if len(prefix) < 4:
+            return None
+        matches = list((self.root / "objects" / prefix[:2]).glob(prefix[2:] + "*"))
+        return matches[0].parent.name + matches[0].name if len(matches) == 1 else None
+
+    def _entry(self, path: Path) -> Dict[str, Any]:
+        return self._load_index().setdefault(str(path), {"versions": [], "position": -1})
+
+    # ── History ──
+
+    def history(self, path: Path) -> List[Snapshot]:
+        entry = self._load_index().get(str(path))
+        return [Snapshot(*v) for v in entry["versions"]] if entry else []
+
+    def position(self, path: Path) -> int:
+        entry = self._load_index().get(str(path))
+        return entry["position"] if entry else -1
+
+    def can_undo(self, path: Path) -> bool:
+        return self.position(path) > 0
+
+    def can_redo(self, path: Path) -> bool:
+        return self.position(path) < len(self.history(path)) - 1
+
+    def undo_description(self, path: Path) -> Optional[str]:
+        """Description of the change an undo would revert."""
+        if not self.can_undo(path):
+            return None
+        return self.history(path)[self.position(path)].description
+
+    def redo_description(self, path: Path) -> Optional[str]:
+        if not self.can_redo(path):
+            return None
+        return self.history(path)[self.position(path) + 1].description
+
+    def record(self, path: Path, content: str, description: str = "",
+               previous: Optional[str] = None) -> bool:
+        """Record `content` as the newest version of `path`.
+
+        `previous` is what is on disk right before the write; if it isn't
+        the version we last recorded (first save, or someone edited the
+        file by hand) it is recorded first so undo can get back to it.
+        Returns False when nothing new was stored.
+        """
+        entry = self._entry(path)
+        versions, pos = entry["versions"], entry["position"]
+        current = versions[pos][0] if pos >= 0 else None
+        now = time.time()
+        before = {v[0] for v in versions}
+
+        if previous is not None:
+            digest = self._put(previous.encode())
+            if digest != current:
+                del versions[pos + 1:]
+                versions.append([digest, now, DESC_EXTERNAL if versions else DESC_ORIGINAL])
+                pos = len(versions) - 1
+                current = digest
+
+        digest = self._put(content.encode())
+        if digest == current:
+            entry["position"] = pos
+            self._save_index()
+            self._drop_unreferenced(before - {v[0] for v in versions})
+            return False
+
+        top = versions[pos] if pos >= 1 else None
+        if (top is not None and pos == len(versions) - 1 and description
+                and top[2] == description and now - top[1] < COALESCE_SECONDS):
+            top[0], top[1] = digest, now
+            # Dragged back to where it started: the step undid itself.
+            if versions[pos - 1][0] == digest:
+                versions.pop()
+                pos -= 1
+        else:
+            del versions[pos + 1:]
+            versions.append([digest, now, description])
+            pos = len(versions) - 1
+        entry["position"] = pos
+        self._prune(entry, now)
+        self._save_index()
+        # Redo branches, coalesced steps and pruned versions leave with their contents
+        self._drop_unreferenced(before - {v[0] for v in versions})
+        return True
+
+    def _step(self, path: Path, delta: int) -> Optional[str]:
+        entry = self._load_index().get(str(path))
+        if not entry:
+            return None
+        pos = entry["position"] + delta
+        if not 0 <= pos < len(entry["versions"]):
+            return None
+        content = self.read(entry["versions"][pos][0])
+        entry["position"] = pos
+        self._save_index()
+        return content
+
+    def undo(self, path: Path) -> Optional[str]:
+        """Step back one version and return its content."""
+        return self._step(path, -1)
+
+    def redo(self, path: Path) -> Optional[str]:
+        return self._step(path, 1)
+
+    # ── Retention ──
+
+    def _prune(self, entry: Dict[str, Any], now: float) -> int:
+        versions = entry["versions"]
+        drop = max(0, len(versions) - KEEP_MAX)
+        cutoff = now - KEEP_DAYS * 86400
+        while (drop < len(versions) - KEEP_MIN and drop < entry["position"]
+               and versions[drop][1] < cutoff):
+            drop += 1
+        drop = min(drop, entry["position"])
+        if drop:
+            del versions[:drop]
+            entry["position"] -= drop
+        return drop
+
+    def _drop_unreferenced(self, digests: set):
+        """Delete the objects among `digests` that no version refers to any more."""
+        if not digests:
+            return
+        live = {v[0] for entry in self._load_index().values() for v in entry["versions"]}
+        for digest in digests - live:
+            self._object_path(digest).unlink(missing_ok=True)
+
+    def gc(self) -> int:
+        """Apply retention to every file and delete unreferenced objects."""
+        index = self._load_index()
+        now = time.time()
+        for entry in index.values():
+            self._prune(entry, now)
+        self._save_index()
+        live = {v[0] for entry in index.values() for v in entry["versions"]}
+        removed = 0
+        objects = self.root / "objects"
+        if objects.is_dir():
+            for obj in objects.glob("*/*"):
+                if obj.parent.name + obj.name not in live:
+                    obj.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Command Line
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Config file snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_log = sub.add_parser("log", help="list the recorded versions of a file")
+    p_log.add_argument("file", type=Path)
+
+    p_show = sub.add_parser("show", help="print a version of a file")
+    p_show.add_argument("digest")
+
+    sub.add_parser("gc", help="apply retention and drop unreferenced contents")
+
+    args = parser.parse_args(argv)
+    store = SnapshotStore()
+    try:
+        if args.command == "log":
+            path = args.file.expanduser().absolute()
+            pos = store.position(path)
+            for i, snap in enumerate(store.history(path)):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snap.time))
+                print(f"{'*' if i == pos else ' '} {snap.digest[:12]}  {stamp}  {snap.description}")
+        elif args.command == "show":
+            digest = store.resolve(args.digest)
+            if digest is None:
+                print(f"ERROR: no unique version matches {args.digest}", file=sys.stderr)
+                return 1
+            sys.stdout.write(store.read(digest))
+        elif args.command == "gc":
+            print(f"{store.gc()} unreferenced object(s) removed")
+    except (OSError, zlib.error) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
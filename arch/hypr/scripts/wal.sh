@@ -7,6 +7,7 @@ CACHE_DIR="${HOME}/.cache"
 COLOR_DIR="${CACHE_DIR}/colors"
 CACHE_FILE="${CACHE_DIR}/current_wallpaper"
 CACHE_IMAGE="${CACHE_DIR}/current_wallpaper.png"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 mkdir -p "$COLOR_DIR"
 if [[ ! -d "$WALLPAPER_DIR" ]]; then
     notify-send -u critical "Wallpaper Selector" "Directory not found: $WALLPAPER_DIR"
@@ -16,8 +17,19 @@ if ! command -v matugen &>/dev/null; then
     notify-send -u critical "Wallpaper Selector" "matugen not found. Install it: cargo install matugen"
     exit 1
 fi
+# Template names whose output changed, or "*" when every consumer
+# should reload (matugen rendered the templates itself).
+CHANGED_TEMPLATES="*"
 extract_colors() {
     local wallpaper="$1"
+    # Cached palettes skip decoding the image, and unchanged outputs are
+    # not rewritten; see palette.py
+    if command -v python3 &>/dev/null && [[ -f "${SCRIPT_DIR}/palette.py" ]] \
+        && CHANGED_TEMPLATES=$(python3 "${SCRIPT_DIR}/palette.py" apply "$wallpaper"); then
+        CHANGED_TEMPLATES=" ${CHANGED_TEMPLATES//$'\n'/ } "
+        return 0
+    fi
+    CHANGED_TEMPLATES="*"
     echo "  Running matugen on: $(basename "$wallpaper")"
     matugen image "$wallpaper" 2>/dev/null
     if [[ ! -f "${COLOR_DIR}/colors.css" ]]; then
@@ -58,66 +70,79 @@ generate_colors_from_matugen() {
     local tertiary_fixed tertiary_fixed_dim on_tertiary_fixed on_tertiary_fixed_variant
     local scrim shadow source_color surface_tint
 
-    background=$(echo "$json_output" | jq -r ".colors.${scheme}.background // \"#0e1513\"")
-    on_background=$(echo "$json_output" | jq -r ".colors.${scheme}.on_background // \"#dee4e1\"")
-    surface=$(echo "$json_output" | jq -r ".colors.${scheme}.surface // \"#0e1513\"")
-    on_surface=$(echo "$json_output" | jq -r ".colors.${scheme}.on_surface // \"#dee4e1\"")
-    surface_variant=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_variant // \"#3f4946\"")
-    on_surface_variant=$(echo "$json_output" | jq -r ".colors.${scheme}.on_surface_variant // \"#bec9c5\"")
-    outline=$(echo "$json_output" | jq -r ".colors.${scheme}.outline // \"#89938f\"")
-    outline_variant=$(echo "$json_output" | jq -r ".colors.${scheme}.outline_variant // \"#3f4946\"")
-
-    primary=$(echo "$json_output" | jq -r ".colors.${scheme}.primary // \"#83d5c5\"")
-    on_primary=$(echo "$json_output" | jq -r ".colors.${scheme}.on_primary // \"#003730\"")
-    primary_container=$(echo "$json_output" | jq -r ".colors.${scheme}.primary_container // \"#005046\"")
-    on_primary_container=$(echo "$json_output" | jq -r ".colors.${scheme}.on_primary_container // \"#9ff2e0\"")
-
-    secondary=$(echo "$json_output" | jq -r ".colors.${scheme}.secondary // \"#b1ccc5\"")
-    on_secondary=$(echo "$json_output" | jq -r ".colors.${scheme}.on_secondary // \"#1c3530\"")
-    secondary_container=$(echo "$json_output" | jq -r ".colors.${scheme}.secondary_container // \"#334b46\"")
-    on_secondary_container=$(echo "$json_output" | jq -r ".colors.${scheme}.on_secondary_container // \"#cde8e1\"")
-
-    tertiary=$(echo "$json_output" | jq -r ".colors.${scheme}.tertiary // \"#abcae5\"")
-    on_tertiary=$(echo "$json_output" | jq -r ".colors.${scheme}.on_tertiary // \"#133348\"")
-    tertiary_container=$(echo "$json_output" | jq -r ".colors.${scheme}.tertiary_container // \"#2c4a60\"")
-    on_tertiary_container=$(echo "$json_output" | jq -r ".colors.${scheme}.on_tertiary_container // \"#cae6ff\"")
-
-    error=$(echo "$json_output" | jq -r ".colors.${scheme}.error // \"#ffb4ab\"")
-    on_error=$(echo "$json_output" | jq -r ".colors.${scheme}.on_error // \"#690005\"")
-    error_container=$(echo "$json_output" | jq -r ".colors.${scheme}.error_container // \"#93000a\"")
-    on_error_container=$(echo "$json_output" | jq -r ".colors.${scheme}.on_error_container // \"#ffdad6\"")
-
-    inverse_surface=$(echo "$json_output" | jq -r ".colors.${scheme}.inverse_surface // \"#dee4e1\"")
-    inverse_on_surface=$(echo "$json_output" | jq -r ".colors.${scheme}.inverse_on_surface // \"#2b3230\"")
-    inverse_primary=$(echo "$json_output" | jq -r ".colors.${scheme}.inverse_primary // \"#016b5d\"")
-
-    surface_dim=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_dim // \"#0e1513\"")
-    surface_bright=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_bright // \"#343b39\"")
-    surface_container_lowest=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_container_lowest // \"#090f0e\"")
-    surface_container_low=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_container_low // \"#171d1b\"")
-    surface_container=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_container // \"#1b211f\"")
-    surface_container_high=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_container_high // \"#252b29\"")
-    surface_container_highest=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_container_highest // \"#303634\"")
-    surface_tint=$(echo "$json_output" | jq -r ".colors.${scheme}.surface_tint // \"#83d5c5\"")
-
-    primary_fixed=$(echo "$json_output" | jq -r ".colors.${scheme}.primary_fixed // \"#9ff2e0\"")
-    primary_fixed_dim=$(echo "$json_output" | jq -r ".colors.${scheme}.primary_fixed_dim // \"#83d5c5\"")
-    on_primary_fixed=$(echo "$json_output" | jq -r ".colors.${scheme}.on_primary_fixed // \"#00201b\"")
-    on_primary_fixed_variant=$(echo "$json_output" | jq -r ".colors.${scheme}.on_primary_fixed_variant // \"#005046\"")
-
-    secondary_fixed=$(echo "$json_output" | jq -r ".colors.${scheme}.secondary_fixed // \"#cde8e1\"")
-    secondary_fixed_dim=$(echo "$json_output" | jq -r ".colors.${scheme}.secondary_fixed_dim // \"#b1ccc5\"")
-    on_secondary_fixed=$(echo "$json_output" | jq -r ".colors.${scheme}.on_secondary_fixed // \"#06201b\"")
-    on_secondary_fixed_variant=$(echo "$json_output" | jq -r ".colors.${scheme}.on_secondary_fixed_variant // \"#334b46\"")
-
-    tertiary_fixed=$(echo "$json_output" | jq -r ".colors.${scheme}.tertiary_fixed // \"#cae6ff\"")
-    tertiary_fixed_dim=$(echo "$json_output" | jq -r ".colors.${scheme}.tertiary_fixed_dim // \"#abcae5\"")
-    on_tertiary_fixed=$(echo "$json_output" | jq -r ".colors.${scheme}.on_tertiary_fixed // \"#001e2f\"")
-    on_tertiary_fixed_variant=$(echo "$json_output" | jq -r ".colors.${scheme}.on_tertiary_fixed_variant // \"#2c4a60\"")
-
-    scrim=$(echo "$json_output" | jq -r ".colors.${scheme}.scrim // \"#000000\"")
-    shadow=$(echo "$json_output" | jq -r ".colors.${scheme}.shadow // \"#000000\"")
-    source_color=$(echo "$json_output" | jq -r ".colors.${scheme}.source_color // \"#08110f\"")
+    background="#0e1513"
+    on_background="#dee4e1"
+    surface="#0e1513"
+    on_surface="#dee4e1"
+    surface_variant="#3f4946"
+    on_surface_variant="#bec9c5"
+    outline="#89938f"
+    outline_variant="#3f4946"
+
+    primary="#83d5c5"
+    on_primary="#003730"
+    primary_container="#005046"
+    on_primary_container="#9ff2e0"
+
+    secondary="#b1ccc5"
+    on_secondary="#1c3530"
+    secondary_container="#334b46"
+    on_secondary_container="#cde8e1"
+
+    tertiary="#abcae5"
+    on_tertiary="#133348"
+    tertiary_container="#2c4a60"
+    on_tertiary_container="#cae6ff"
+
+    error="#ffb4ab"
+    on_error="#690005"
+    error_container="#93000a"
+    on_error_container="#ffdad6"
+
+    inverse_surface="#dee4e1"
+    inverse_on_surface="#2b3230"
+    inverse_primary="#016b5d"
+
+    surface_dim="#0e1513"
+    surface_bright="#343b39"
+    surface_container_lowest="#090f0e"
+    surface_container_low="#171d1b"
+    surface_container="#1b211f"
+    surface_container_high="#252b29"
+    surface_container_highest="#303634"
+    surface_tint="#83d5c5"
+
+    primary_fixed="#9ff2e0"
+    primary_fixed_dim="#83d5c5"
+    on_primary_fixed="#00201b"
+    on_primary_fixed_variant="#005046"
+
+    secondary_fixed="#cde8e1"
+    secondary_fixed_dim="#b1ccc5"
+    on_secondary_fixed="#06201b"
+    on_secondary_fixed_variant="#334b46"
+
+    tertiary_fixed="#cae6ff"
+    tertiary_fixed_dim="#abcae5"
+    on_tertiary_fixed="#001e2f"
+    on_tertiary_fixed_variant="#2c4a60"
+
+    scrim="#000000"
+    shadow="#000000"
+    source_color="#08110f"
+
+    # One jq pass over the whole palette; roles it returns replace the
+    # defaults above. Handles both colors.<mode>.<role> and the newer
+    # colors.<role>.<mode> layout.
+    local key value
+    while IFS='=' read -r key value; do
+        [[ -v "$key" ]] && printf -v "$key" '%s' "$value"
+    done < <(jq -r --arg s "$scheme" '
+        .colors
+        | (if (.[$s] | type) == "object" then .[$s] else map_values(.[$s]?) end)
+        | to_entries[]
+        | select((.key | test("^[a-z_]+$")) and (.value | type == "string" and test("^#[0-9a-fA-F]{6}$")))
+        | "\(.key)=\(.value)"' <<<"$json_output")
 
     cat > "${COLOR_DIR}/colors.css" << WAYBAR
 /*
@@ -379,25 +404,37 @@ ROFI
     echo "  Generated: colors.css, colors.conf, colors2.conf, colors.rasi"
 }
 
+template_changed() {
+    [[ "$CHANGED_TEMPLATES" == "*" || "$CHANGED_TEMPLATES" == *" * "* || "$CHANGED_TEMPLATES" == *" $1 "* ]]
+}
+
 reload_services() {
     echo "  Reloading services..."
 
-    pkill -x waybar 2>/dev/null || true
     pkill -x rofi 2>/dev/null || true
 
-    if pgrep -x kitty &>/dev/null; then
+    local restart_waybar=0
+    if template_changed waybar; then
+        pkill -x waybar 2>/dev/null || true
+        restart_waybar=1
+    fi
+
+    if template_changed kitty && pgrep -x kitty &>/dev/null; then
         pkill -USR1 kitty 2>/dev/null || true
     fi
 
-    if command -v hyprctl &>/dev/null; then
+    # The hyprland template's post_hook reloads Hyprland when palette.py
+    # rendered it; only matugen's own run needs an explicit reload.
+    if [[ "$CHANGED_TEMPLATES" == "*" ]] && command -v hyprctl &>/dev/null; then
         hyprctl reload &>/dev/null &
     fi
 
-    sleep 0.15
-
-    if command -v waybar &>/dev/null; then
-        waybar &>/dev/null &
-        disown
+    if (( restart_waybar )); then
+        sleep 0.15
+        if command -v waybar &>/dev/null; then
+            waybar &>/dev/null &
+            disown
+        fi
     fi
 
     echo "  Services reloaded"
@@ -727,30 +764,34 @@ main() {
     local start_time
     start_time=$(date +%s%N)
 
-    # Show Rofi selector
-    local selected
-    selected=$(generate_list | rofi -dmenu \
-        -i \
-        -show-icons \
-        -p "󰸉 " \
-        -mesg "  Select a wallpaper to apply" \
-        -scroll-method 0 \
-        -theme-str "$ROFI_THEME" \
-        2>/dev/null) || exit 0
-
-    [[ -z "$selected" ]] && exit 0
-
-    # Find the actual file
-    local wallpaper=""
-    shopt -s nocaseglob
-    for ext in png jpg jpeg webp; do
-        local candidate="${WALLPAPER_DIR}/${selected}.${ext}"
-        if [[ -f "$candidate" ]]; then
-            wallpaper="$candidate"
-            break
-        fi
-    done
-    shopt -u nocaseglob
+    # An image passed on the command line skips the selector
+    local selected wallpaper=""
+    if [[ -n "${1:-}" && -f "$1" ]]; then
+        wallpaper="$1"
+        selected="$(basename "${wallpaper%.*}")"
+    else
+        selected=$(generate_list | rofi -dmenu \
+            -i \
+            -show-icons \
+            -p "󰸉 " \
+            -mesg "  Select a wallpaper to apply" \
+            -scroll-method 0 \
+            -theme-str "$ROFI_THEME" \
+            2>/dev/null) || exit 0
+
+        [[ -z "$selected" ]] && exit 0
+
+        # Find the actual file
+        shopt -s nocaseglob
+        for ext in png jpg jpeg webp; do
+            local candidate="${WALLPAPER_DIR}/${selected}.${ext}"
+            if [[ -f "$candidate" ]]; then
+                wallpaper="$candidate"
+                break
+            fi
+        done
+        shopt -u nocaseglob
+    fi
 
     if [[ -z "$wallpaper" || ! -f "$wallpaper" ]]; then
         notify-send -u critical "Error" "Wallpaper file not found: ${selected}"
@@ -9,16 +9,49 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 gi.require_version('Vte', '3.91')
-from gi.repository import Gtk, Adw, GLib, Gdk, Gio, Pango, Vte
+gi.require_version('GdkPixbuf', '2.0')
+gi.require_version('Gsk', '4.0')
+gi.require_version('Graphene', '1.0')
+from gi.repository import Gtk, Adw, GLib, GObject, Gdk, GdkPixbuf, Gio, Gsk, Graphene, Pango, Vte
 
 import os
 import re
+import sys
 import json
 import subprocess
 import threading
 import shutil
+import time
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, NamedTuple
+
+APP_START = time.perf_counter()
+
+from hyprconf import (HYPRLAND_OPTIONS, ChordIndex, ConfigError, HyprlandConfig, HyprlockConfig,
+                      Keybind, KittyConfig, Option, snapshot_store)
+
+try:
+    import palette
+except ImportError:
+    palette = None
+
+try:
+    import pkgdb
+except ImportError:
+    pkgdb = None
+
+try:
+    import snapshots
+except ImportError:
+    snapshots = None
+
+try:
+    import bootprof
+except ImportError:
+    bootprof = None
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  Configuration Paths
@@ -32,356 +65,198 @@ HYPR_SCRIPTS = HYPR_DIR / "scripts"
 WAL_SCRIPT = HYPR_SCRIPTS / "wal.sh"
 KITTY_CONF = HOME / ".config" / "kitty" / "kitty.conf"
 WALLPAPER_DIR = HOME / "Pictures" / "Wallpapers"
+THUMBNAIL_DIR = HOME / ".cache" / "thumbnails" / "large"
 SETTINGS_FILE = HOME / ".config" / "carmonyos-settings" / "settings.json"
 
 SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
 WALLPAPER_DIR.mkdir(parents=True, exist_ok=True)
 
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-#  Hyprland Config Parser
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+DEBUG = bool(os.environ.get("CARMONY_DEBUG"))
 
-class HyprlandConfig:
-    """Parse and modify Hyprland configuration files."""
-    
-    def __init__(self, path: Path):
-        self.path = path
-        self.content = ""
-        self.load()
-    
-    def load(self):
-        if self.path.exists():
-            self.content = self.path.read_text()
-        else:
-            self.content = ""
-    
-    def save(self):
-        backup = self.path.with_suffix('.conf.bak')
-        if self.path.exists():
-            shutil.copy(self.path, backup)
-        self.path.write_text(self.content)
-    
-    def _find_section_content(self, section: str) -> Tuple[Optional[int], Optional[int], str]:
-        """Find section content, handling nested sections like 'decoration:blur'."""
-        parts = section.split(':')
-        
-        if len(parts) == 1:
-            # Simple section like 'decoration'
-            pattern = rf'{section}\s*\{{\s*'
-            match = re.search(pattern, self.content)
-            if not match:
-                return None, None, ""
-            
-            start = match.end()
-            depth = 1
-            end = start
-            
-            while end < len(self.content) and depth > 0:
-                if self.content[end] == '{':
-                    depth += 1
-                elif self.content[end] == '}':
-                    depth -= 1
-                end += 1
-            
-            return start, end - 1, self.content[start:end - 1]
-        else:
-            # Nested section like 'decoration:blur'
-            parent = parts[0]
-            child = parts[1]
-            
-            p_start, p_end, p_content = self._find_section_content(parent)
-            if p_content is None:
-                return None, None, ""
-            
-            # Find child within parent
-            pattern = rf'{child}\s*\{{\s*'
-            match = re.search(pattern, p_content)
-            if not match:
-                return None, None, ""
-            
-            c_start = match.end()
-            depth = 1
-            c_end = c_start
-            
-            while c_end < len(p_content) and depth > 0:
-                if p_content[c_end] == '{':
-                    depth += 1
-                elif p_content[c_end] == '}':
-                    depth -= 1
-                c_end += 1
-            
-            # Adjust to absolute positions
-            abs_start = p_start + c_start
-            abs_end = p_start + c_end - 1
-            
-            return abs_start, abs_end, p_content[c_start:c_end - 1]
-    
-    def get_value(self, section: str, key: str, default: str = "") -> str:
-        """Get a value from config."""
-        if section:
-            _, _, content = self._find_section_content(section)
-            if content:
-                pattern = rf'^\s*{re.escape(key)}\s*=\s*(.+?)\s*$'
-                match = re.search(pattern, content, re.MULTILINE)
-                if match:
-                    return match.group(1).strip()
-        else:
-            pattern = rf'^\s*{re.escape(key)}\s*=\s*(.+?)\s*$'
-            match = re.search(pattern, self.content, re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return default
-    
-    def set_value(self, section: str, key: str, value: str):
-        """Set a value in config."""
-        if section:
-            start, end, content = self._find_section_content(section)
-            
-            if content is not None:
-                pattern = rf'^(\s*){re.escape(key)}\s*=\s*.+?$'
-                match = re.search(pattern, content, re.MULTILINE)
-                
-                if match:
-                    indent = match.group(1)
-                    new_content = re.sub(pattern, f'{indent}{key} = {value}', content, flags=re.MULTILINE)
-                    self.content = self.content[:start] + new_content + self.content[end:]
-                else:
-                    new_content = content.rstrip() + f'\n    {key} = {value}\n'
-                    self.content = self.content[:start] + new_content + self.content[end:]
-            else:
-                # Create section(s)
-                parts = section.split(':')
-                if len(parts) == 1:
-                    self.content += f'\n{section} {{\n    {key} = {value}\n}}\n'
-                else:
-                    parent, child = parts[0], parts[1]
-                    p_start, p_end, p_content = self._find_section_content(parent)
-                    if p_content is not None:
-                        new_p = p_content.rstrip() + f'\n    {child} {{\n        {key} = {value}\n    }}\n'
-                        self.content = self.content[:p_start] + new_p + self.content[p_end:]
-                    else:
-                        self.content += f'\n{parent} {{\n    {child} {{\n        {key} = {value}\n    }}\n}}\n'
-        else:
-            pattern = rf'^(\s*){re.escape(key)}\s*=\s*.+?$'
-            if re.search(pattern, self.content, re.MULTILINE):
-                self.content = re.sub(pattern, rf'\g<1>{key} = {value}', self.content, flags=re.MULTILINE)
-            else:
-                self.content += f'\n{key} = {value}\n'
-    
-    def get_bool(self, section: str, key: str, default: bool = False) -> bool:
-        val = self.get_value(section, key, str(default).lower())
-        return val.lower() in ('true', 'yes', '1', 'on')
-    
-    def set_bool(self, section: str, key: str, value: bool):
-        self.set_value(section, key, 'true' if value else 'false')
-    
-    def get_int(self, section: str, key: str, default: int = 0) -> int:
-        try:
-            return int(self.get_value(section, key, str(default)))
-        except ValueError:
-            return default
-    
-    def get_float(self, section: str, key: str, default: float = 0.0) -> float:
-        try:
-            return float(self.get_value(section, key, str(default)))
-        except ValueError:
-            return default
-    
-    def get_exec_once_list(self) -> List[str]:
-        pattern = r'^\s*exec-once\s*=\s*(.+?)\s*$'
-        return re.findall(pattern, self.content, re.MULTILINE)
-    
-    def add_exec_once(self, command: str):
-        self.content += f'\nexec-once = {command}\n'
-    
-    def remove_exec_once(self, command: str):
-        pattern = rf'^\s*exec-once\s*=\s*{re.escape(command)}\s*$\n?'
-        self.content = re.sub(pattern, '', self.content, flags=re.MULTILINE)
-    
-    def get_binds(self) -> List[Tuple[str, str, str, str]]:
-        binds = []
-        pattern = r'^\s*(bind[a-z]*)\s*=\s*([^,]*),\s*([^,]+),\s*(.+?)\s*$'
-        for match in re.finditer(pattern, self.content, re.MULTILINE):
-            binds.append((match.group(1), match.group(2).strip(), 
-                         match.group(3).strip(), match.group(4).strip()))
-        return binds
-    
-    def add_bind(self, bind_type: str, mods: str, key: str, action: str):
-        self.content += f'\n{bind_type} = {mods}, {key}, {action}\n'
-    
-    def remove_bind(self, mods: str, key: str):
-        pattern = rf'^\s*bind[a-z]*\s*=\s*{re.escape(mods)}\s*,\s*{re.escape(key)}\s*,.*$\n?'
-        self.content = re.sub(pattern, '', self.content, flags=re.MULTILINE)
+
+def debug(message: str):
+    if DEBUG:
+        print(f"[settings {(time.perf_counter() - APP_START) * 1000:7.1f} ms] {message}",
+              file=sys.stderr, flush=True)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-#  Hyprlock Config Parser
+#  Shared Config Store
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-class HyprlockConfig:
-    """Parse and modify Hyprlock configuration."""
-    
-    def __init__(self, path: Path):
-        self.path = path
-        self.content = ""
-        self.load()
-    
-    def load(self):
-        if self.path.exists():
-            self.content = self.path.read_text()
-        else:
-            # Create default config
-            self.content = """
-background {
-    path = screenshot
-    blur_passes = 3
-    blur_size = 8
-    noise = 0.0117
-    contrast = 0.8916
-    brightness = 0.8172
-    vibrancy = 0.1696
-    vibrancy_darkness = 0.0
-}
-
-input-field {
-    size = 250, 50
-    outline_thickness = 3
-    dots_size = 0.2
-    dots_spacing = 0.64
-    dots_center = true
-    fade_on_empty = true
-    placeholder_text = <i>Password...</i>
-    hide_input = false
-    position = 0, -20
-    halign = center
-    valign = center
-}
-
-label {
-    text = $TIME
-    font_size = 64
-    font_family = Google Sans Display
-    position = 0, 150
-    halign = center
-    valign = center
-}
-
-label {
-    text = cmd[update:1000] echo "$(date '+%A, %B %d')"
-    font_size = 18
-    font_family = Google Sans
-    position = 0, 80
-    halign = center
-    valign = center
-}
-"""
-    
-    def save(self):
-        backup = self.path.with_suffix('.conf.bak')
-        if self.path.exists():
-            shutil.copy(self.path, backup)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(self.content)
-    
-    def _find_block(self, block_name: str, index: int = 0) -> Tuple[Optional[int], Optional[int], str]:
-        """Find a block by name and optional index (for multiple labels)."""
-        pattern = rf'{block_name}\s*\{{'
-        matches = list(re.finditer(pattern, self.content))
-        
-        if index >= len(matches):
-            return None, None, ""
-        
-        match = matches[index]
-        start = match.end()
-        depth = 1
-        end = start
-        
-        while end < len(self.content) and depth > 0:
-            if self.content[end] == '{':
-                depth += 1
-            elif self.content[end] == '}':
-                depth -= 1
-            end += 1
-        
-        return start, end - 1, self.content[start:end - 1]
-    
-    def get_value(self, block: str, key: str, default: str = "", index: int = 0) -> str:
-        _, _, content = self._find_block(block, index)
-        if content:
-            pattern = rf'^\s*{re.escape(key)}\s*=\s*(.+?)\s*$'
-            match = re.search(pattern, content, re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-        return default
-    
-    def set_value(self, block: str, key: str, value: str, index: int = 0):
-        start, end, content = self._find_block(block, index)
-        
-        if content is not None:
-            pattern = rf'^(\s*){re.escape(key)}\s*=\s*.+?$'
-            match = re.search(pattern, content, re.MULTILINE)
-            
-            if match:
-                indent = match.group(1)
-                new_content = re.sub(pattern, f'{indent}{key} = {value}', content, flags=re.MULTILINE)
-                self.content = self.content[:start] + new_content + self.content[end:]
-            else:
-                new_content = content.rstrip() + f'\n    {key} = {value}\n'
-                self.content = self.content[:start] + new_content + self.content[end:]
+# Topics a config change can touch; pages subscribe to the ones they show.
+TOPIC_AUTOSTART = "autostart"
+TOPIC_BINDS = "binds"
+TOPIC_OPTIONS = "options"
+
+_TOPIC_LINE_RE = re.compile(r'^\s*(exec-once|bind[a-z]*)\s*=', re.MULTILINE)
+
+
+def _split_topics(content: str) -> Dict[str, List[str]]:
+    """Bucket config lines by the topic they belong to."""
+    buckets: Dict[str, List[str]] = {TOPIC_AUTOSTART: [], TOPIC_BINDS: [], TOPIC_OPTIONS: []}
+    for line in content.splitlines():
+        match = _TOPIC_LINE_RE.match(line)
+        if not match:
+            buckets[TOPIC_OPTIONS].append(line)
+        elif match.group(1) == "exec-once":
+            buckets[TOPIC_AUTOSTART].append(line.strip())
         else:
-            self.content += f'\n{block} {{\n    {key} = {value}\n}}\n'
-    
-    def get_int(self, block: str, key: str, default: int = 0, index: int = 0) -> int:
-        try:
-            return int(self.get_value(block, key, str(default), index))
-        except ValueError:
-            return default
-    
-    def get_float(self, block: str, key: str, default: float = 0.0, index: int = 0) -> float:
-        try:
-            return float(self.get_value(block, key, str(default), index))
-        except ValueError:
-            return default
+            buckets[TOPIC_BINDS].append(line.strip())
+    return buckets
 
 
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-#  Kitty Config Parser
-# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+def changed_topics(old: str, new: str) -> set:
+    """Return the topics whose lines differ between two versions of a file."""
+    if old == new:
+        return set()
+    before, after = _split_topics(old), _split_topics(new)
+    return {topic for topic in before if before[topic] != after[topic]}
 
-class KittyConfig:
-    def __init__(self, path: Path):
+
+class ConfigStore:
+    """One shared, file-watched document per config file.
+
+    Every page editing the same file works on the same parser object, so
+    edits can no longer clobber each other. External edits are picked up
+    through a Gio.FileMonitor, re-read off the main thread and broadcast
+    only to the pages subscribed to the topics that actually changed.
+    """
+
+    _stores: Dict[Path, "ConfigStore"] = {}
+    _history_listeners: List[Any] = []
+
+    @classmethod
+    def watch_history(cls, callback):
+        """Call `callback(store)` whenever a store's undo history moves."""
+        cls._history_listeners.append(callback)
+
+    @classmethod
+    def get(cls, path: Path, parser=HyprlandConfig) -> "ConfigStore":
+        store = cls._stores.get(path)
+        if store is None:
+            store = cls(path, parser)
+            cls._stores[path] = store
+        return store
+
+    def __init__(self, path: Path, parser):
         self.path = path
-        self.content = ""
-        self.load()
-    
-    def load(self):
-        if self.path.exists():
-            self.content = self.path.read_text()
-        else:
-            self.content = ""
-    
-    def save(self):
-        backup = self.path.with_suffix('.conf.bak')
-        if self.path.exists():
-            shutil.copy(self.path, backup)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(self.content)
-    
-    def get_shell(self) -> str:
-        pattern = r'^\s*shell\s+(\S+)'
-        match = re.search(pattern, self.content, re.MULTILINE)
-        return match.group(1) if match else ""
-    
-    def set_shell(self, shell: str):
-        pattern = r'^\s*shell\s+\S+.*$'
-        if re.search(pattern, self.content, re.MULTILINE):
-            self.content = re.sub(pattern, f'shell {shell}', self.content, flags=re.MULTILINE)
+        self.config = parser(path)
+        self._subscribers: List[Tuple[set, Any, Any]] = []
+        self._reload_source = 0
+        self._reading = False
+
+        self._monitor = Gio.File.new_for_path(str(path)).monitor_file(
+            Gio.FileMonitorFlags.NONE, None)
+        self._monitor.connect("changed", self._on_file_changed)
+
+    def subscribe(self, topics, callback, owner=None):
+        """Call `callback(topics)` whenever any of `topics` changes."""
+        self._subscribers.append((set(topics), callback, owner))
+
+    def commit(self, *topics, origin=None, description: str = ""):
+        """Save the shared document and notify everyone but `origin`."""
+        self.config.save(description or f"{self.path.name}: {', '.join(sorted(topics))}")
+        self._notify(set(topics), origin)
+        self._history_moved()
+
+    # ── Undo / Redo ──
+
+    def can_undo(self) -> bool:
+        store = snapshot_store()
+        return store is not None and store.can_undo(self.path)
+
+    def can_redo(self) -> bool:
+        store = snapshot_store()
+        return store is not None and store.can_redo(self.path)
+
+    def undo_description(self) -> Optional[str]:
+        store = snapshot_store()
+        return store.undo_description(self.path) if store else None
+
+    def redo_description(self) -> Optional[str]:
+        store = snapshot_store()
+        return store.redo_description(self.path) if store else None
+
+    def undo(self) -> Optional[str]:
+        """Restore the previous version; returns what was undone."""
+        return self._step(-1)
+
+    def redo(self) -> Optional[str]:
+        return self._step(1)
+
+    def _step(self, delta: int) -> Optional[str]:
+        store = snapshot_store()
+        if store is None:
+            return None
+        # Hand edits since our last save become a version of their own,
+        # so stepping away from them is itself undoable.
+        try:
+            if self.path.exists():
+                store.record(self.path, self.path.read_text(), snapshots.DESC_EXTERNAL)
+        except OSError:
+            pass
+        if delta < 0:
+            description, content = store.undo_description(self.path), store.undo(self.path)
         else:
-            self.content += f'\nshell {shell}\n'
-    
-    def remove_shell_setting(self):
-        pattern = r'^\s*shell\s+.*$\n?'
-        self.content = re.sub(pattern, '', self.content, flags=re.MULTILINE)
+            description, content = store.redo_description(self.path), store.redo(self.path)
+        if content is None:
+            return None
+        topics = changed_topics(self.config.content, content)
+        self.config.content = content
+        self.path.write_text(content)
+        self._notify(topics)
+        self._history_moved()
+        return description
+
+    def _history_moved(self):
+        for callback in list(self._history_listeners):
+            callback(self)
+
+    def _notify(self, topics: set, origin=None):
+        for wanted, callback, owner in list(self._subscribers):
+            if owner is not None and owner is origin:
+                continue
+            hit = wanted & topics
+            if hit:
+                callback(hit)
+
+    def _on_file_changed(self, monitor, file, other, event):
+        if event not in (Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+                         Gio.FileMonitorEvent.CREATED,
+                         Gio.FileMonitorEvent.DELETED):
+            return
+        # Editors fire bursts of events; coalesce them into one re-read.
+        if self._reload_source:
+            GLib.source_remove(self._reload_source)
+        self._reload_source = GLib.timeout_add(150, self._start_reload)
+
+    def _start_reload(self):
+        self._reload_source = 0
+        if self._reading:
+            self._reload_source = GLib.timeout_add(150, self._start_reload)
+            return False
+        self._reading = True
+
+        def read_thread():
+            try:
+                text = self.path.read_text() if self.path.exists() else None
+            except OSError:
+                text = None
+            GLib.idle_add(self._apply_reload, text)
+
+        threading.Thread(target=read_thread, daemon=True).start()
+        return False
+
+    def _apply_reload(self, text: Optional[str]):
+        self._reading = False
+        # Our own saves echo back through the monitor; they are no-ops here.
+        if text is None or text == self.config.content:
+            return False
+        topics = changed_topics(self.config.content, text)
+        self.config.content = text
+        self._notify(topics)
+        return False
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -842,6 +717,14 @@ window.main-window {
     opacity: 0.6;
 }
 
+listview.bind-list,
+listview.bind-list > row,
+listview.package-list,
+listview.package-list > row {
+    background: transparent;
+    padding: 0;
+}
+
 /* ─── Autostart Item ─── */
 
 .autostart-row {
@@ -862,6 +745,12 @@ window.main-window {
     font-size: 13px;
 }
 
+.autostart-cost {
+    font-size: 12px;
+    font-feature-settings: "tnum";
+    opacity: 0.7;
+}
+
 /* ─── Package Row — Enhanced Install Button ─── */
 
 .package-row {
@@ -958,6 +847,19 @@ window.main-window {
     box-shadow: 0 0 0 3px alpha(@accent_bg_color, 0.3);
 }
 
+gridview.wallpaper-grid {
+    background: transparent;
+}
+
+gridview.wallpaper-grid > child {
+    padding: 6px;
+    border-radius: 14px;
+}
+
+gridview.wallpaper-grid > child:selected {
+    background: alpha(@accent_bg_color, 0.35);
+}
+
 /* ─── Status Badge ─── */
 
 .status-success {
@@ -1035,6 +937,11 @@ window.main-window {
     background: alpha(@card_bg_color, 0.7);
 }
 
+.lock-preview {
+    border-radius: 16px;
+    border: 1px solid alpha(currentColor, 0.08);
+}
+
 /* ─── Scrolled Windows ─── */
 
 scrollbar {
@@ -1127,7 +1034,9 @@ class HyprlandPage(Gtk.Box):
     def __init__(self, app):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.app = app
-        self.config = None
+        self.store = ConfigStore.get(HYPRLAND_CONF)
+        self.config = self.store.config
+        self.options = HYPRLAND_OPTIONS
         self._loading = True
         
         scroll = Gtk.ScrolledWindow()
@@ -1155,85 +1064,17 @@ class HyprlandPage(Gtk.Box):
         subtitle.set_margin_bottom(28)
         content.append(subtitle)
         
-        # ── Decoration Group ──
-        deco_group = Adw.PreferencesGroup(title="Decoration",
-                                          description="Visual effects and appearance")
-        content.append(deco_group)
-        
-        # Blur enabled
-        self.sw_blur = Adw.SwitchRow(title="Enable Blur",
-                                      subtitle="Blur behind transparent windows")
-        self.sw_blur.connect("notify::active", self._on_setting_changed)
-        deco_group.add(self.sw_blur)
-        
-        # Blur size
-        self.spin_blur_size = Adw.SpinRow.new_with_range(1, 20, 1)
-        self.spin_blur_size.set_title("Blur Size")
-        self.spin_blur_size.set_subtitle("Blur radius strength")
-        self.spin_blur_size.connect("notify::value", self._on_setting_changed)
-        deco_group.add(self.spin_blur_size)
-        
-        # Blur passes
-        self.spin_blur_passes = Adw.SpinRow.new_with_range(1, 10, 1)
-        self.spin_blur_passes.set_title("Blur Passes")
-        self.spin_blur_passes.set_subtitle("Number of blur iterations")
-        self.spin_blur_passes.connect("notify::value", self._on_setting_changed)
-        deco_group.add(self.spin_blur_passes)
-        
-        # Active opacity
-        self.spin_active_opacity = Adw.SpinRow.new_with_range(0.1, 1.0, 0.05)
-        self.spin_active_opacity.set_title("Active Window Opacity")
-        self.spin_active_opacity.set_subtitle("Transparency of focused windows")
-        self.spin_active_opacity.set_digits(2)
-        self.spin_active_opacity.connect("notify::value", self._on_setting_changed)
-        deco_group.add(self.spin_active_opacity)
-        
-        # Inactive opacity
-        self.spin_inactive_opacity = Adw.SpinRow.new_with_range(0.1, 1.0, 0.05)
-        self.spin_inactive_opacity.set_title("Inactive Window Opacity")
-        self.spin_inactive_opacity.set_subtitle("Transparency of unfocused windows")
-        self.spin_inactive_opacity.set_digits(2)
-        self.spin_inactive_opacity.connect("notify::value", self._on_setting_changed)
-        deco_group.add(self.spin_inactive_opacity)
-        
-        # Rounding
-        self.spin_rounding = Adw.SpinRow.new_with_range(0, 30, 1)
-        self.spin_rounding.set_title("Corner Rounding")
-        self.spin_rounding.set_subtitle("Window corner radius in pixels")
-        self.spin_rounding.connect("notify::value", self._on_setting_changed)
-        deco_group.add(self.spin_rounding)
-        
-        # ── Animations Group ──
-        anim_group = Adw.PreferencesGroup(title="Animations",
-                                          description="Window and workspace animations")
-        anim_group.set_margin_top(24)
-        content.append(anim_group)
-        
-        self.sw_animations = Adw.SwitchRow(title="Enable Animations",
-                                            subtitle="Animated transitions and effects")
-        self.sw_animations.connect("notify::active", self._on_setting_changed)
-        anim_group.add(self.sw_animations)
-        
-        # ── Misc Group ──
-        misc_group = Adw.PreferencesGroup(title="Miscellaneous",
-                                          description="Performance and behavior tweaks")
-        misc_group.set_margin_top(24)
-        content.append(misc_group)
-        
-        self.sw_vfr = Adw.SwitchRow(title="Variable Frame Rate (VFR)",
-                                     subtitle="Reduce GPU usage when idle")
-        self.sw_vfr.connect("notify::active", self._on_setting_changed)
-        misc_group.add(self.sw_vfr)
-        
-        self.sw_mouse_drag = Adw.SwitchRow(title="Animate Mouse Dragging",
-                                            subtitle="Smooth window movement while dragging")
-        self.sw_mouse_drag.connect("notify::active", self._on_setting_changed)
-        misc_group.add(self.sw_mouse_drag)
-        
-        self.sw_manual_resize = Adw.SwitchRow(title="Animate Manual Resizes",
-                                               subtitle="Smooth resizing animations")
-        self.sw_manual_resize.connect("notify::active", self._on_setting_changed)
-        misc_group.add(self.sw_manual_resize)
+        # ── Option Groups ──
+        self.rows: Dict[str, Adw.PreferencesRow] = {}
+        for i, (group_title, group_desc) in enumerate(self.options.groups):
+            group = Adw.PreferencesGroup(title=group_title, description=group_desc)
+            if i:
+                group.set_margin_top(24)
+            content.append(group)
+            for option in self.options.in_group(group_title):
+                row = self._build_option_row(option)
+                self.rows[option.path] = row
+                group.add(row)
         
         # ── Actions ──
         action_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
@@ -1246,54 +1087,53 @@ class HyprlandPage(Gtk.Box):
         btn_reload.connect("clicked", self._reload_hyprland)
         action_box.append(btn_reload)
         
+        self.store.subscribe({TOPIC_OPTIONS}, lambda topics: self.load_config(), owner=self)
         self.load_config()
     
+    def _build_option_row(self, option: Option) -> Adw.PreferencesRow:
+        if option.type is bool:
+            row = Adw.SwitchRow(title=option.title, subtitle=option.description)
+            row.connect("notify::active", self._on_setting_changed, option)
+        elif option.type in (int, float):
+            row = Adw.SpinRow.new_with_range(option.minimum, option.maximum, option.step)
+            row.set_title(option.title)
+            row.set_subtitle(option.description)
+            row.set_digits(option.digits)
+            row.connect("notify::value", self._on_setting_changed, option)
+        else:
+            row = Adw.EntryRow(title=option.title, show_apply_button=True)
+            row.set_tooltip_text(option.description)
+            row.connect("apply", self._on_setting_changed, None, option)
+        return row
+    
     def load_config(self):
         self._loading = True
-        self.config = HyprlandConfig(HYPRLAND_CONF)
-        
-        # Blur settings (decoration:blur section)
-        self.sw_blur.set_active(self.config.get_bool("decoration:blur", "enabled", True))
-        self.spin_blur_size.set_value(self.config.get_int("decoration:blur", "size", 8))
-        self.spin_blur_passes.set_value(self.config.get_int("decoration:blur", "passes", 2))
-        
-        # Opacity
-        self.spin_active_opacity.set_value(self.config.get_float("decoration", "active_opacity", 1.0))
-        self.spin_inactive_opacity.set_value(self.config.get_float("decoration", "inactive_opacity", 1.0))
-        
-        # Rounding
-        self.spin_rounding.set_value(self.config.get_int("decoration", "rounding", 10))
-        
-        # Animations
-        self.sw_animations.set_active(self.config.get_bool("animations", "enabled", True))
-        
-        # Misc
-        self.sw_vfr.set_active(self.config.get_bool("misc", "vfr", True))
-        self.sw_mouse_drag.set_active(self.config.get_bool("misc", "animate_mouse_windowdragging", True))
-        self.sw_manual_resize.set_active(self.config.get_bool("misc", "animate_manual_resizes", False))
-        
+        values = self.options.read(self.config)
+        for path, row in self.rows.items():
+            value = values[path]
+            if isinstance(row, Adw.SwitchRow):
+                row.set_active(value)
+            elif isinstance(row, Adw.SpinRow):
+                row.set_value(value)
+            else:
+                row.set_text(value)
         self._loading = False
     
-    def _on_setting_changed(self, widget, param):
+    def _on_setting_changed(self, row, param, option: Option):
         if self._loading or not self.config:
             return
-        
-        # Apply all current values
-        self.config.set_bool("decoration:blur", "enabled", self.sw_blur.get_active())
-        self.config.set_value("decoration:blur", "size", str(int(self.spin_blur_size.get_value())))
-        self.config.set_value("decoration:blur", "passes", str(int(self.spin_blur_passes.get_value())))
-        
-        self.config.set_value("decoration", "active_opacity", f"{self.spin_active_opacity.get_value():.2f}")
-        self.config.set_value("decoration", "inactive_opacity", f"{self.spin_inactive_opacity.get_value():.2f}")
-        self.config.set_value("decoration", "rounding", str(int(self.spin_rounding.get_value())))
-        
-        self.config.set_bool("animations", "enabled", self.sw_animations.get_active())
-        
-        self.config.set_bool("misc", "vfr", self.sw_vfr.get_active())
-        self.config.set_bool("misc", "animate_mouse_windowdragging", self.sw_mouse_drag.get_active())
-        self.config.set_bool("misc", "animate_manual_resizes", self.sw_manual_resize.get_active())
-        
-        self.config.save()
+        if isinstance(row, Adw.SwitchRow):
+            value = row.get_active()
+        elif isinstance(row, Adw.SpinRow):
+            value = row.get_value()
+        else:
+            value = row.get_text()
+        try:
+            self.options.write(self.config, option, value)
+        except ConfigError as e:
+            self.app.toast(str(e), error=True)
+            return
+        self.store.commit(TOPIC_OPTIONS, origin=self, description=option.title)
     
     def _reload_hyprland(self, btn):
         subprocess.Popen(["hyprctl", "reload"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -1308,7 +1148,8 @@ class AutostartPage(Gtk.Box):
     def __init__(self, app):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.app = app
-        self.config = None
+        self.store = ConfigStore.get(HYPRLAND_CONF)
+        self.config = self.store.config
         
         scroll = Gtk.ScrolledWindow()
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
@@ -1341,6 +1182,17 @@ class AutostartPage(Gtk.Box):
         subtitle.set_halign(Gtk.Align.START)
         title_box.append(subtitle)
         
+        if bootprof is not None:
+            btn_measure = Gtk.Button()
+            btn_measure.add_css_class("flat")
+            btn_measure.add_css_class("md3-icon-button")
+            btn_measure.set_valign(Gtk.Align.CENTER)
+            btn_measure.set_margin_end(8)
+            btn_measure.set_icon_name("view-refresh-symbolic")
+            btn_measure.set_tooltip_text("Measure boot cost again")
+            btn_measure.connect("clicked", lambda b: self._measure_costs())
+            header.append(btn_measure)
+        
         btn_add = Gtk.Button()
         btn_add.add_css_class("md3-fab-small")
         btn_add.set_valign(Gtk.Align.CENTER)
@@ -1352,15 +1204,37 @@ class AutostartPage(Gtk.Box):
         self.apps_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         content.append(self.apps_box)
         
+        # (command, its boot-cost label) per row; identical lines get a row each
+        self.cost_labels: List[Tuple[str, Gtk.Label]] = []
+        self._measure_gen = 0
+        self._loading = False
+        
+        if bootprof is not None:
+            profile_group = Adw.PreferencesGroup(title="Boot Cost",
+                                                 description="Start time after Hyprland, CPU time and memory of each entry's processes")
+            profile_group.set_margin_top(24)
+            content.append(profile_group)
+            
+            self.sw_record = Adw.SwitchRow(title="Record at Every Login")
+            self.sw_record.set_subtitle("Keep a rolling history of these numbers to spot slow logins")
+            self.sw_record.connect("notify::active", self._on_record_toggled)
+            profile_group.add(self.sw_record)
+        
+        self.store.subscribe({TOPIC_AUTOSTART}, lambda topics: self.load_apps(), owner=self)
         self.load_apps()
     
     def load_apps(self):
         while child := self.apps_box.get_first_child():
             self.apps_box.remove(child)
+        self.cost_labels.clear()
         
-        self.config = HyprlandConfig(HYPRLAND_CONF)
         apps = self.config.get_exec_once_list()
         
+        if bootprof is not None:
+            self._loading = True
+            self.sw_record.set_active(any(self._is_recorder(cmd) for cmd in apps))
+            self._loading = False
+        
         if not apps:
             empty = Gtk.Label(label="No autostart applications configured")
             empty.add_css_class("dim-label")
@@ -1372,6 +1246,59 @@ class AutostartPage(Gtk.Box):
         for cmd in apps:
             row = self._create_app_row(cmd)
             self.apps_box.append(row)
+        self._measure_costs()
+    
+    # ── Boot Cost ──
+    
+    def _recorder_command(self) -> str:
+        return f"{HYPR_SCRIPTS / 'bootprof.py'} record --delay 30"
+    
+    def _is_recorder(self, cmd: str) -> bool:
+        return "bootprof.py record" in cmd
+    
+    def _on_record_toggled(self, row, param):
+        if self._loading:
+            return
+        recorders = [c for c in self.config.get_exec_once_list() if self._is_recorder(c)]
+        if row.get_active() and not recorders:
+            self.config.add_exec_once(self._recorder_command())
+            self.store.commit(TOPIC_AUTOSTART, origin=self, description="Record boot cost at login")
+        elif not row.get_active() and recorders:
+            for cmd in recorders:
+                self.config.remove_exec_once(cmd)
+            self.store.commit(TOPIC_AUTOSTART, origin=self, description="Stop recording boot cost")
+        else:
+            return
+        self.load_apps()
+    
+    def _measure_costs(self):
+        """Scan /proc off the main thread and fill in each row's cost."""
+        if bootprof is None or not self.cost_labels:
+            return
+        self._measure_gen += 1
+        gen = self._measure_gen
+        commands = [cmd for cmd, _ in self.cost_labels]
+        
+        def worker():
+            try:
+                costs = bootprof.profile(commands)
+                sessions = bootprof.load_history()[-5:]
+            except OSError:
+                costs, sessions = [], []
+            GLib.idle_add(self._show_costs, gen, costs, sessions)
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _show_costs(self, gen: int, costs, sessions):
+        if gen != self._measure_gen:
+            return False
+        # profile() answers each command in order, so rows match by index
+        for (_, label), cost in zip(self.cost_labels, costs):
+            label.set_text(bootprof.format_cost(cost))
+            past = [f"+{e['start']:.1f} s" if e.get("running") else "—"
+                    for e in bootprof.command_history(cost.command, sessions)]
+            label.set_tooltip_text(f"Last logins: {', '.join(past)}" if past else None)
+        return False
     
     def _create_app_row(self, cmd: str) -> Gtk.Box:
         row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
@@ -1388,6 +1315,13 @@ class AutostartPage(Gtk.Box):
         cmd_lbl.set_ellipsize(Pango.EllipsizeMode.END)
         row.append(cmd_lbl)
         
+        if bootprof is not None:
+            cost_lbl = Gtk.Label(label="measuring…")
+            cost_lbl.add_css_class("autostart-cost")
+            cost_lbl.set_halign(Gtk.Align.END)
+            row.append(cost_lbl)
+            self.cost_labels.append((cmd, cost_lbl))
+        
         btn_remove = Gtk.Button()
         btn_remove.add_css_class("flat")
         btn_remove.add_css_class("md3-icon-button")
@@ -1418,8 +1352,7 @@ class AutostartPage(Gtk.Box):
                 cmd = entry.get_text().strip()
                 if cmd:
                     self.config.add_exec_once(cmd)
-                    self.config.save()
-                    self.load_apps()
+                    self.store.commit(TOPIC_AUTOSTART, description=f"Add autostart {cmd}")
                     self.app.toast(f"Added: {cmd}")
         
         dialog.connect("response", on_response)
@@ -1427,20 +1360,337 @@ class AutostartPage(Gtk.Box):
     
     def _remove_app(self, cmd: str):
         self.config.remove_exec_once(cmd)
-        self.config.save()
-        self.load_apps()
+        self.store.commit(TOPIC_AUTOSTART, description=f"Remove autostart {cmd}")
         self.app.toast(f"Removed: {cmd[:30]}...")
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Hyprlock Preview
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+LOCK_PREVIEW_WIDTH = 480
+LOCK_PREVIEW_ELEMENTS = ("label", "image", "input-field")
+
+_HYPR_HEX_COLOR_RE = re.compile(r'^rgba?\(\s*([0-9a-fA-F]{6}|[0-9a-fA-F]{8})\s*\)$')
+_HYPR_FUNC_COLOR_RE = re.compile(r'^rgba?\(([^)]*)\)$')
+_HYPR_ARGB_RE = re.compile(r'^0x([0-9a-fA-F]{8})$')
+
+
+def parse_hypr_color(value: str, default: Tuple[float, float, float, float]) -> Gdk.RGBA:
+    """Parse rgba(r, g, b, a), rgba(rrggbbaa), rgb(rrggbb) and 0xAARRGGBB."""
+    r, g, b, a = default
+    value = value.strip()
+    m = _HYPR_HEX_COLOR_RE.match(value)
+    if m:
+        h = m.group(1)
+        r, g, b = (int(h[i:i + 2], 16) / 255 for i in (0, 2, 4))
+        a = int(h[6:8], 16) / 255 if len(h) == 8 else 1.0
+    elif _HYPR_FUNC_COLOR_RE.match(value):
+        try:
+            parts = [float(p) for p in _HYPR_FUNC_COLOR_RE.match(value).group(1).split(',')]
+            r, g, b = (p / 255 for p in parts[:3])
+            a = parts[3] if len(parts) > 3 else 1.0
+        except (ValueError, IndexError):
+            pass
+    elif _HYPR_ARGB_RE.match(value):
+        h = value[2:]
+        a, r, g, b = (int(h[i:i + 2], 16) / 255 for i in (0, 2, 4, 6))
+    rgba = Gdk.RGBA()
+    rgba.red, rgba.green, rgba.blue, rgba.alpha = r, g, b, a
+    return rgba
+
+
+def _hypr_length(value: str, total: float) -> float:
+    value = value.strip()
+    try:
+        if value.endswith('%'):
+            return float(value[:-1]) / 100 * total
+        return float(value.rstrip('px'))
+    except ValueError:
+        return 0.0
+
+
+def _preview_text(text: str) -> str:
+    """What a label would show, without running its commands."""
+    if text.startswith("cmd["):
+        return "⋯"
+    return (text.replace("$TIME12", time.strftime("%I:%M %p"))
+                .replace("$TIME", time.strftime("%H:%M"))
+                .replace("$USER", os.environ.get("USER", "user"))
+                .replace("$LAYOUT", "us"))
+
+
+class LockScreenPreview(Gtk.Widget):
+    """A scaled mock of the lock screen drawn from hyprlock.conf.
+    
+    Each element (background, every label, image and input field) is
+    recorded once into its own render node and cached together with the
+    values it was drawn from; an update re-records only the elements
+    whose values changed and recomposes the rest from cache. The
+    background is a downscaled screenshot taken once per preview.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.add_css_class("lock-preview")
+        self.set_overflow(Gtk.Overflow.HIDDEN)
+        self.set_halign(Gtk.Align.CENTER)
+        
+        geometry = None
+        monitors = Gdk.Display.get_default().get_monitors()
+        if monitors.get_n_items():
+            geometry = monitors.get_item(0).get_geometry()
+        self.screen_w = geometry.width if geometry else 1920
+        self.screen_h = geometry.height if geometry else 1080
+        self.scale = LOCK_PREVIEW_WIDTH / self.screen_w
+        self.width = LOCK_PREVIEW_WIDTH
+        self.height = round(self.screen_h * self.scale)
+        self.set_size_request(self.width, self.height)
+        
+        # element key -> (values it was drawn from, render node)
+        self._layers: Dict[Tuple[str, int], Tuple[Any, Any]] = {}
+        self._order: List[Tuple[str, int]] = []
+        self._config: Optional[HyprlockConfig] = None
+        self._screenshot: Optional[Gdk.Texture] = None
+        self._screenshot_state = "none"
+    
+    # ── Updates ──
+    
+    def update(self, config: "HyprlockConfig"):
+        self._config = config
+        order = [("background", 0)]
+        order += [(b.type, b.index) for b in config.blocks() if b.type in LOCK_PREVIEW_ELEMENTS]
+        
+        changed = order != self._order
+        for key in order:
+            block = config.block(*key)
+            values = tuple((k, config.get_value(key[0], k, "", key[1]))
+                           for k in sorted(block.keys)) if block else ()
+            if key[0] == "background":
+                values += (("screenshot", self._screenshot_state),)
+            elif key[0] == "label":
+                values += (("shown", _preview_text(config.get_value("label", "text", "", key[1]))),)
+            cached = self._layers.get(key)
+            if cached is None or cached[0] != values:
+                self._layers[key] = (values, self._record(key[0], dict(values)))
+                changed = True
+        for key in set(self._layers) - set(order):
+            del self._layers[key]
+        self._order = order
+        if changed:
+            self.queue_draw()
+    
+    def do_snapshot(self, snapshot):
+        for key in self._order:
+            node = self._layers[key][1]
+            if node is not None:
+                snapshot.append_node(node)
+    
+    def _record(self, element: str, values: Dict[str, str]):
+        snapshot = Gtk.Snapshot.new()
+        if element == "background":
+            self._draw_background(snapshot, values)
+        elif element == "label":
+            self._draw_label(snapshot, values)
+        elif element == "image":
+            self._draw_image(snapshot, values)
+        else:
+            self._draw_input(snapshot, values)
+        return snapshot.to_node()
+    
+    # ── Layout ──
+    
+    def _place(self, values: Dict[str, str], w: float, h: float) -> Tuple[float, float]:
+        """Top-left corner of a w×h element, following hyprlock's anchors."""
+        pos = values.get("position", "0, 0").split(',')
+        dx = _hypr_length(pos[0], self.screen_w) * self.scale if pos else 0
+        dy = _hypr_length(pos[1], self.screen_h) * self.scale if len(pos) > 1 else 0
+        halign, valign = values.get("halign", "center"), values.get("valign", "center")
+        x = {"left": 0, "right": self.width - w}.get(halign, (self.width - w) / 2)
+        y = {"top": 0, "bottom": self.height - h}.get(valign, (self.height - h) / 2)
+        # hyprlock's y axis points up
+        return x + dx, y - dy
+    
+    def _layout(self, text: str, family: str, size_px: float) -> Pango.Layout:
+        layout = self.create_pango_layout(None)
+        try:
+            Pango.parse_markup(text, -1, '\0')
+            layout.set_markup(text, -1)
+        except GLib.Error:
+            layout.set_text(text, -1)
+        font = Pango.FontDescription()
+        font.set_family(family)
+        font.set_absolute_size(max(size_px, 1) * Pango.SCALE)
+        layout.set_font_description(font)
+        layout.set_alignment(Pango.Alignment.CENTER)
+        return layout
+    
+    # ── Elements ──
+    
+    def _draw_background(self, snapshot, values: Dict[str, str]):
+        bounds = Graphene.Rect().init(0, 0, self.width, self.height)
+        snapshot.append_color(parse_hypr_color(values.get("color", ""), (0.07, 0.07, 0.1, 1.0)), bounds)
+        texture = self._background_texture(values.get("path", ""))
+        if texture is not None:
+            passes = int(_hypr_length(values.get("blur_passes", "0"), 0))
+            radius = _hypr_length(values.get("blur_size", "8"), 0) * passes * self.scale * 2
+            if passes and radius > 0:
+                snapshot.push_blur(radius)
+            # Cover the preview, cropping the longer side
+            tw, th = texture.get_width(), texture.get_height()
+            cover = max(self.width / tw, self.height / th)
+            w, h = tw * cover, th * cover
+            snapshot.append_texture(texture, Graphene.Rect().init(
+                (self.width - w) / 2, (self.height - h) / 2, w, h))
+            if passes and radius > 0:
+                snapshot.pop()
+        
+        def shade(alpha: float, level: float):
+            if alpha > 0:
+                snapshot.append_color(parse_hypr_color("", (level, level, level, min(alpha, 1.0))), bounds)
+        
+        try:
+            shade(1.0 - float(values.get("brightness", "1")), 0.0)
+            shade((1.0 - float(values.get("contrast", "1"))) / 2, 0.5)
+        except ValueError:
+            pass
+    
+    def _draw_label(self, snapshot, values: Dict[str, str]):
+        size = _hypr_length(values.get("font_size", "16"), self.screen_h) * self.scale
+        layout = self._layout(values["shown"], values.get("font_family", "Sans"), size)
+        w, h = layout.get_pixel_size()
+        x, y = self._place(values, w, h)
+        snapshot.save()
+        snapshot.translate(Graphene.Point().init(x, y))
+        snapshot.append_layout(layout, parse_hypr_color(values.get("color", ""), (1, 1, 1, 1)))
+        snapshot.restore()
+    
+    def _draw_image(self, snapshot, values: Dict[str, str]):
+        size = max(_hypr_length(values.get("size", "150"), self.screen_h) * self.scale, 1)
+        x, y = self._place(values, size, size)
+        rounding = _hypr_length(values.get("rounding", "-1"), 0) * self.scale
+        radius = size / 2 if rounding < 0 else rounding
+        box = Graphene.Rect().init(x, y, size, size)
+        clip = Gsk.RoundedRect().init_from_rect(box, radius)
+        
+        texture = None
+        path = Path(os.path.expanduser(values.get("path", "")))
+        if path.is_file():
+            try:
+                texture = Gdk.Texture.new_for_pixbuf(GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                    str(path), max(int(size * 2), 1), -1, True))
+            except GLib.Error:
+                pass
+        
+        snapshot.push_rounded_clip(clip)
+        if texture is not None:
+            snapshot.append_texture(texture, box)
+        else:
+            snapshot.append_color(parse_hypr_color("", (0.5, 0.5, 0.55, 0.6)), box)
+        snapshot.pop()
+        border = _hypr_length(values.get("border_size", "4"), 0) * self.scale
+        if border > 0:
+            color = parse_hypr_color(values.get("border_color", ""), (0.87, 0.87, 0.87, 1))
+            snapshot.append_border(clip, [border] * 4, [color] * 4)
+    
+    def _draw_input(self, snapshot, values: Dict[str, str]):
+        dims = values.get("size", "400, 90").split(',')
+        w = _hypr_length(dims[0], self.screen_w) * self.scale
+        h = _hypr_length(dims[1] if len(dims) > 1 else "90", self.screen_h) * self.scale
+        x, y = self._place(values, w, h)
+        rounding = _hypr_length(values.get("rounding", "-1"), 0) * self.scale
+        box = Graphene.Rect().init(x, y, w, h)
+        clip = Gsk.RoundedRect().init_from_rect(box, h / 2 if rounding < 0 else rounding)
+        
+        snapshot.push_rounded_clip(clip)
+        snapshot.append_color(parse_hypr_color(values.get("inner_color", ""), (0.78, 0.78, 0.78, 1)), box)
+        snapshot.pop()
+        outline = _hypr_length(values.get("outline_thickness", "3"), 0) * self.scale
+        if outline > 0:
+            color = parse_hypr_color(values.get("outer_color", ""), (0.07, 0.07, 0.07, 1))
+            snapshot.append_border(clip, [outline] * 4, [color] * 4)
+        
+        placeholder = values.get("placeholder_text", "<i>Input Password...</i>")
+        layout = self._layout(placeholder, values.get("font_family", "Sans"), h * 0.35)
+        tw, th = layout.get_pixel_size()
+        color = parse_hypr_color(values.get("font_color", ""), (0.04, 0.04, 0.04, 1))
+        color.alpha *= 0.6
+        snapshot.save()
+        snapshot.translate(Graphene.Point().init(x + (w - tw) / 2, y + (h - th) / 2))
+        snapshot.append_layout(layout, color)
+        snapshot.restore()
+    
+    # ── Background Source ──
+    
+    def _background_texture(self, path: str) -> Optional[Gdk.Texture]:
+        if path and path != "screenshot":
+            image = Path(os.path.expanduser(path))
+            if image.is_file():
+                try:
+                    return Gdk.Texture.new_for_pixbuf(GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                        str(image), self.width, self.height, True))
+                except GLib.Error:
+                    return None
+            return None
+        if self._screenshot_state == "none":
+            self._take_screenshot()
+        return self._screenshot
+    
+    def _take_screenshot(self):
+        """Grab the screen once, already downscaled to preview size, off the main thread."""
+        if not shutil.which("grim"):
+            self._screenshot_state = "unavailable"
+            return
+        self._screenshot_state = "pending"
+        
+        def worker():
+            try:
+                png = subprocess.run(["grim", "-s", f"{self.scale:.4f}", "-"],
+                                     capture_output=True, timeout=5).stdout
+            except (OSError, subprocess.SubprocessError):
+                png = b""
+            GLib.idle_add(self._on_screenshot, png)
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _on_screenshot(self, png: bytes):
+        try:
+            self._screenshot = Gdk.Texture.new_from_bytes(GLib.Bytes.new(png)) if png else None
+        except GLib.Error:
+            self._screenshot = None
+        self._screenshot_state = "ready" if self._screenshot else "unavailable"
+        if self._config is not None:
+            self.update(self._config)
+        return False
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 #  Hyprlock Page — Fixed
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+# Fields editable per block on the Hyprlock page, and what new blocks start with.
+HYPRLOCK_BLOCK_FIELDS = {
+    "label": [("text", "Text"), ("font_family", "Font Family"), ("font_size", "Font Size"),
+              ("color", "Color"), ("position", "Position"),
+              ("halign", "Horizontal Align"), ("valign", "Vertical Align")],
+    "image": [("path", "Path"), ("size", "Size"), ("rounding", "Rounding"),
+              ("border_size", "Border Size"), ("position", "Position"),
+              ("halign", "Horizontal Align"), ("valign", "Vertical Align")],
+}
+HYPRLOCK_BLOCK_DEFAULTS = {
+    "label": {"text": "Hello", "font_size": "24", "position": "0, 0",
+              "halign": "center", "valign": "center"},
+    "image": {"path": "~/.face", "size": "120", "position": "0, 200",
+              "halign": "center", "valign": "center"},
+}
+
+
 class HyprlockPage(Gtk.Box):
     def __init__(self, app):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.app = app
-        self.config = None
+        self.store = ConfigStore.get(HYPRLOCK_CONF, HyprlockConfig)
+        self.config = self.store.config
         self._loading = True
         
         scroll = Gtk.ScrolledWindow()
@@ -1538,6 +1788,15 @@ class HyprlockPage(Gtk.Box):
         self.font_preview.set_halign(Gtk.Align.CENTER)
         preview_box.append(self.font_preview)
         
+        # One provider for the sample, reloaded in place on every edit
+        self.font_css = Gtk.CssProvider()
+        self.font_preview.get_style_context().add_provider(
+            self.font_css, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        
+        self.lock_preview = LockScreenPreview()
+        self.lock_preview.set_margin_top(8)
+        preview_box.append(self.lock_preview)
+        
         # ── Input Field Group ──
         input_group = Adw.PreferencesGroup(title="Password Input",
                                            description="Password field appearance")
@@ -1562,6 +1821,23 @@ class HyprlockPage(Gtk.Box):
         self.spin_outline.connect("notify::value", self._on_setting_changed)
         input_group.add(self.spin_outline)
         
+        # ── Labels & Images ──
+        self.blocks_group = Adw.PreferencesGroup(title="Labels & Images",
+                                                 description="Every label and image block on the lock screen")
+        self.blocks_group.set_margin_top(24)
+        content.append(self.blocks_group)
+        
+        add_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        for block_type in HYPRLOCK_BLOCK_FIELDS:
+            btn = Gtk.Button(label=f"Add {block_type.title()}")
+            btn.add_css_class("md3-text-button")
+            btn.connect("clicked", lambda b, t=block_type: self._add_block(t))
+            add_box.append(btn)
+        self.blocks_group.set_header_suffix(add_box)
+        
+        # (block type, expander, {key: entry row}) in file order
+        self._block_rows: List[Tuple[str, Adw.ExpanderRow, Dict[str, Adw.EntryRow]]] = []
+        
         # ── Actions ──
         action_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
         action_box.set_margin_top(32)
@@ -1573,11 +1849,11 @@ class HyprlockPage(Gtk.Box):
         btn_test.connect("clicked", self._test_lock)
         action_box.append(btn_test)
         
+        self.store.subscribe({TOPIC_OPTIONS}, lambda topics: self.load_config(), owner=self)
         self.load_config()
     
     def load_config(self):
         self._loading = True
-        self.config = HyprlockConfig(HYPRLOCK_CONF)
         
         # Background
         self.spin_blur_passes.set_value(self.config.get_int("background", "blur_passes", 3))
@@ -1601,23 +1877,88 @@ class HyprlockPage(Gtk.Box):
         
         self.spin_outline.set_value(self.config.get_int("input-field", "outline_thickness", 3))
         
+        self._sync_block_rows()
         self._update_font_preview()
+        self.lock_preview.update(self.config)
         self._loading = False
     
+    def _sync_block_rows(self):
+        """Mirror the label and image blocks into the expander rows.
+        
+        Rows are only rebuilt when blocks were added or removed; otherwise
+        their text is updated in place so a focused entry keeps its cursor.
+        """
+        blocks = [b for b in self.config.blocks() if b.type in HYPRLOCK_BLOCK_FIELDS]
+        if [b.type for b in blocks] != [t for t, _, _ in self._block_rows]:
+            for _, expander, _ in self._block_rows:
+                self.blocks_group.remove(expander)
+            self._block_rows = [self._build_block_row(b.type, b.index) for b in blocks]
+        
+        for block_type, expander, rows in self._block_rows:
+            index = self._block_index(expander)
+            for key, row in rows.items():
+                value = self.config.get_value(block_type, key, "", index)
+                if row.get_text() != value:
+                    row.set_text(value)
+            main_key = HYPRLOCK_BLOCK_FIELDS[block_type][0][0]
+            expander.set_subtitle(GLib.markup_escape_text(
+                self.config.get_value(block_type, main_key, "", index)))
+    
+    def _block_index(self, expander: Adw.ExpanderRow) -> int:
+        """Index of a row's block among blocks of its type, in file order."""
+        block_type = next(t for t, e, _ in self._block_rows if e is expander)
+        same = [e for t, e, _ in self._block_rows if t == block_type]
+        return same.index(expander)
+    
+    def _build_block_row(self, block_type: str, index: int):
+        expander = Adw.ExpanderRow(title=f"{block_type.title()} {index + 1}")
+        
+        btn_remove = Gtk.Button(icon_name="user-trash-symbolic")
+        btn_remove.add_css_class("flat")
+        btn_remove.set_valign(Gtk.Align.CENTER)
+        btn_remove.set_tooltip_text(f"Remove this {block_type}")
+        btn_remove.connect("clicked", lambda b: self._remove_block(block_type, self._block_index(expander)))
+        expander.add_suffix(btn_remove)
+        
+        rows: Dict[str, Adw.EntryRow] = {}
+        for key, title in HYPRLOCK_BLOCK_FIELDS[block_type]:
+            row = Adw.EntryRow(title=title)
+            row.set_show_apply_button(True)
+            row.connect("apply", lambda r, k=key: self._on_block_field_applied(
+                block_type, self._block_index(expander), k, r.get_text().strip()))
+            expander.add_row(row)
+            rows[key] = row
+        
+        self.blocks_group.add(expander)
+        return block_type, expander, rows
+    
+    def _on_block_field_applied(self, block_type: str, index: int, key: str, value: str):
+        if self._loading or not value:
+            return
+        self.config.set_value(block_type, key, value, index)
+        # No origin: the Time Display group shows label 1 and must follow.
+        self.store.commit(TOPIC_OPTIONS, description=f"Lock screen {block_type} {index + 1}")
+    
+    def _add_block(self, block_type: str):
+        index = self.config.add_block(block_type, HYPRLOCK_BLOCK_DEFAULTS[block_type])
+        self.store.commit(TOPIC_OPTIONS, description=f"Add lock screen {block_type}")
+        self.app.toast(f"Added {block_type} {index + 1}")
+    
+    def _remove_block(self, block_type: str, index: int):
+        if self.config.remove_block(block_type, index):
+            self.store.commit(TOPIC_OPTIONS, description=f"Remove lock screen {block_type} {index + 1}")
+            self.app.toast(f"Removed {block_type} {index + 1}")
+    
     def _update_font_preview(self):
-        font = self.font_entry.get_text()
+        font = self.font_entry.get_text().replace("\\", "").replace("'", "")
         size = min(int(self.spin_font_size.get_value()), 72)
         
-        provider = Gtk.CssProvider()
-        provider.load_from_string(f"""
+        self.font_css.load_from_string(f"""
             .font-preview {{
                 font-family: '{font}', sans-serif;
                 font-size: {size}px;
             }}
         """)
-        
-        ctx = self.font_preview.get_style_context()
-        ctx.add_provider(provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
     
     def _on_setting_changed(self, widget, param):
         if self._loading or not self.config:
@@ -1648,7 +1989,11 @@ class HyprlockPage(Gtk.Box):
         self.config.set_value("input-field", "size", f"{w}, {h}")
         self.config.set_value("input-field", "outline_thickness", str(int(self.spin_outline.get_value())))
         
-        self.config.save()
+        self.store.commit(TOPIC_OPTIONS, origin=self, description="Lock screen settings")
+        self._loading = True
+        self._sync_block_rows()
+        self._loading = False
+        self.lock_preview.update(self.config)
     
     def _test_lock(self, btn):
         subprocess.Popen(["hyprlock"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -1658,11 +2003,58 @@ class HyprlockPage(Gtk.Box):
 #  Keybinds Page
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+_BIND_TOKEN_RE = re.compile(r'[\s,+_$]+')
+
+BIND_SORT_MODES = [
+    ("file", "File order"),
+    ("mods", "Modifiers"),
+    ("key", "Key"),
+    ("dispatcher", "Dispatcher"),
+]
+
+
+def _bind_tokens(text: str) -> List[str]:
+    return [t for t in _BIND_TOKEN_RE.split(text.lower()) if t]
+
+
+class BindItem(GObject.Object):
+    """One keybind in the list model, with its search and sort keys precomputed."""
+    
+    def __init__(self, index: int, entry: Keybind):
+        super().__init__()
+        bind_type, mods, key, action = entry[:4]
+        self.index = index
+        self.entry = entry
+        self.bind_type = bind_type
+        self.mods = mods
+        self.key = key
+        self.action = action
+        
+        dispatcher, _, args = action.partition(',')
+        self.dispatcher = dispatcher.strip()
+        self.keys_label = f"{mods} + {key}" if mods else key
+        
+        mod_tokens = _bind_tokens(mods)
+        self.tokens = tuple(dict.fromkeys(
+            mod_tokens + [key.lower(), self.dispatcher.lower()] + _bind_tokens(args)))
+        self.sort_keys = {
+            "file": (index,),
+            "mods": (" ".join(sorted(mod_tokens)), key.lower(), index),
+            "key": (key.lower(), " ".join(sorted(mod_tokens)), index),
+            "dispatcher": (self.dispatcher.lower(), args.strip().lower(), index),
+        }
+    
+    def matches(self, terms: List[str]) -> bool:
+        """Every query term must prefix one of the bind's tokens."""
+        return all(any(tok.startswith(term) for tok in self.tokens) for term in terms)
+
+
 class KeybindsPage(Gtk.Box):
     def __init__(self, app):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.app = app
-        self.config = None
+        self.store = ConfigStore.get(HYPRLAND_CONF)
+        self.config = self.store.config
         
         scroll = Gtk.ScrolledWindow()
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
@@ -1703,68 +2095,89 @@ class KeybindsPage(Gtk.Box):
         btn_add.connect("clicked", self._show_add_dialog)
         header.append(btn_add)
         
-        # Search
+        # Search & sort
+        search_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        search_box.set_margin_bottom(16)
+        content.append(search_box)
+        
         self.search = Gtk.SearchEntry()
         self.search.set_placeholder_text("Search keybinds...")
         self.search.add_css_class("md3-search")
-        self.search.set_margin_bottom(16)
+        self.search.set_hexpand(True)
         self.search.connect("search-changed", self._filter_binds)
-        content.append(self.search)
+        search_box.append(self.search)
+        
+        self.sort_combo = Gtk.DropDown.new_from_strings([label for _, label in BIND_SORT_MODES])
+        self.sort_combo.set_valign(Gtk.Align.CENTER)
+        self.sort_combo.set_tooltip_text("Sort by")
+        self.sort_combo.connect("notify::selected", self._on_sort_changed)
+        search_box.append(self.sort_combo)
+        
+        # Binds list: store -> filter -> sort -> recycled ListView rows
+        self._terms: List[str] = []
+        self._sort_mode = "file"
+        
+        self.bind_store = Gio.ListStore.new(BindItem)
+        self.bind_filter = Gtk.CustomFilter.new(lambda item: item.matches(self._terms))
+        filtered = Gtk.FilterListModel.new(self.bind_store, self.bind_filter)
+        self.bind_sorter = Gtk.CustomSorter.new(self._compare_binds)
+        self.bind_model = Gtk.SortListModel.new(filtered, self.bind_sorter)
+        self.bind_model.connect("items-changed", self._on_binds_changed)
+        
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._setup_bind_row)
+        factory.connect("bind", self._bind_bind_row)
+        
+        self.bind_list = Gtk.ListView.new(Gtk.NoSelection.new(self.bind_model), factory)
+        self.bind_list.add_css_class("bind-list")
         
-        # Binds list
         binds_scroll = Gtk.ScrolledWindow()
         binds_scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         binds_scroll.set_vexpand(True)
         binds_scroll.set_min_content_height(400)
-        content.append(binds_scroll)
+        binds_scroll.set_child(self.bind_list)
+        
+        empty = Gtk.Label(label="No keybinds found")
+        empty.add_css_class("dim-label")
+        empty.add_css_class("md3-body-large")
+        empty.set_valign(Gtk.Align.START)
+        empty.set_margin_top(40)
         
-        self.binds_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
-        binds_scroll.set_child(self.binds_box)
+        self.binds_stack = Gtk.Stack()
+        self.binds_stack.add_named(binds_scroll, "list")
+        self.binds_stack.add_named(empty, "empty")
+        content.append(self.binds_stack)
         
-        self.all_binds = []
+        self.store.subscribe({TOPIC_BINDS}, lambda topics: self.load_binds(), owner=self)
         self.load_binds()
     
     def load_binds(self):
-        while child := self.binds_box.get_first_child():
-            self.binds_box.remove(child)
-        
-        self.config = HyprlandConfig(HYPRLAND_CONF)
-        self.all_binds = self.config.get_binds()
-        self._display_binds(self.all_binds)
+        self.chord_index = ChordIndex(self.config)
+        items = [BindItem(i, bind) for i, bind in enumerate(self.config.iter_binds())]
+        self.bind_store.splice(0, self.bind_store.get_n_items(), items)
+        # Splicing nothing into an empty store emits no items-changed
+        self._on_binds_changed(self.bind_model, 0, 0, 0)
     
-    def _display_binds(self, binds):
-        while child := self.binds_box.get_first_child():
-            self.binds_box.remove(child)
-        
-        if not binds:
-            empty = Gtk.Label(label="No keybinds found")
-            empty.add_css_class("dim-label")
-            empty.add_css_class("md3-body-large")
-            empty.set_margin_top(40)
-            self.binds_box.append(empty)
-            return
-        
-        for bind_type, mods, key, action in binds:
-            row = self._create_bind_row(bind_type, mods, key, action)
-            self.binds_box.append(row)
+    def _on_binds_changed(self, model, position, removed, added):
+        self.binds_stack.set_visible_child_name("list" if model.get_n_items() else "empty")
     
-    def _create_bind_row(self, bind_type: str, mods: str, key: str, action: str) -> Gtk.Box:
+    def _setup_bind_row(self, factory, list_item):
         row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
         row.add_css_class("bind-row")
         
-        type_lbl = Gtk.Label(label=bind_type)
+        type_lbl = Gtk.Label()
         type_lbl.add_css_class("bind-type")
         type_lbl.set_size_request(70, -1)
         row.append(type_lbl)
         
-        keys_str = f"{mods} + {key}" if mods else key
-        keys_lbl = Gtk.Label(label=keys_str)
+        keys_lbl = Gtk.Label()
         keys_lbl.add_css_class("bind-keys")
         keys_lbl.set_size_request(180, -1)
         keys_lbl.set_halign(Gtk.Align.START)
+        keys_lbl.set_xalign(0)
         row.append(keys_lbl)
         
-        action_lbl = Gtk.Label(label=action)
+        action_lbl = Gtk.Label()
         action_lbl.add_css_class("bind-action")
         action_lbl.set_hexpand(True)
         action_lbl.set_halign(Gtk.Align.START)
@@ -1776,19 +2189,43 @@ class KeybindsPage(Gtk.Box):
         btn_remove.add_css_class("md3-icon-button")
         btn_remove.set_icon_name("user-trash-symbolic")
         btn_remove.set_tooltip_text("Remove")
-        btn_remove.connect("clicked", lambda b: self._remove_bind(mods, key))
+        btn_remove.connect("clicked", lambda b: self._remove_bind_item(list_item.get_item()))
         row.append(btn_remove)
         
-        return row
+        list_item.set_child(row)
+        list_item.set_activatable(False)
+    
+    def _bind_bind_row(self, factory, list_item):
+        item = list_item.get_item()
+        type_lbl = list_item.get_child().get_first_child()
+        keys_lbl = type_lbl.get_next_sibling()
+        action_lbl = keys_lbl.get_next_sibling()
+        
+        type_lbl.set_label(item.bind_type)
+        keys_lbl.set_label(item.keys_label)
+        action_lbl.set_label(item.action)
+    
+    def _compare_binds(self, a, b, *args):
+        ka, kb = a.sort_keys[self._sort_mode], b.sort_keys[self._sort_mode]
+        return (ka > kb) - (ka < kb)
+    
+    def _on_sort_changed(self, combo, param):
+        self._sort_mode = BIND_SORT_MODES[combo.get_selected()][0]
+        self.bind_sorter.changed(Gtk.SorterChange.DIFFERENT)
     
     def _filter_binds(self, entry):
-        search = entry.get_text().lower()
-        if not search:
-            self._display_binds(self.all_binds)
+        old = " ".join(self._terms)
+        self._terms = _bind_tokens(entry.get_text())
+        new = " ".join(self._terms)
+        
+        # Narrowing a query only needs to re-check the rows still shown.
+        if old and new.startswith(old):
+            change = Gtk.FilterChange.MORE_STRICT
+        elif new and old.startswith(new):
+            change = Gtk.FilterChange.LESS_STRICT
         else:
-            filtered = [(t, m, k, a) for t, m, k, a in self.all_binds
-                       if search in m.lower() or search in k.lower() or search in a.lower()]
-            self._display_binds(filtered)
+            change = Gtk.FilterChange.DIFFERENT
+        self.bind_filter.changed(change)
     
     def _show_add_dialog(self, btn):
         dialog = Adw.MessageDialog(transient_for=self.app.win)
@@ -1825,11 +2262,39 @@ class KeybindsPage(Gtk.Box):
         action_entry.set_text("exec, kitty")
         box.append(action_entry)
         
+        conflict_lbl = Gtk.Label()
+        conflict_lbl.add_css_class("status-warning")
+        conflict_lbl.add_css_class("md3-body-medium")
+        conflict_lbl.set_halign(Gtk.Align.START)
+        conflict_lbl.set_wrap(True)
+        conflict_lbl.set_xalign(0)
+        conflict_lbl.set_visible(False)
+        box.append(conflict_lbl)
+        
         dialog.set_extra_child(box)
         dialog.add_response("cancel", "Cancel")
         dialog.add_response("add", "Add")
         dialog.set_response_appearance("add", Adw.ResponseAppearance.SUGGESTED)
         
+        def check_conflicts(*args):
+            conflicts = self.chord_index.lookup(mods_entry.get_text(), key_entry.get_text())
+            if conflicts:
+                lines = [f"{b.bind_type} = {b.mods}, {b.key}, {b.action}  ({b.path.name}:{b.line})"
+                         for b in conflicts[:4]]
+                if len(conflicts) > 4:
+                    lines.append(f"… and {len(conflicts) - 4} more")
+                conflict_lbl.set_label("⚠ Already bound:\n" + "\n".join(lines))
+                dialog.set_response_label("add", "Add Anyway")
+                dialog.set_response_appearance("add", Adw.ResponseAppearance.DESTRUCTIVE)
+            else:
+                dialog.set_response_label("add", "Add")
+                dialog.set_response_appearance("add", Adw.ResponseAppearance.SUGGESTED)
+            conflict_lbl.set_visible(bool(conflicts))
+        
+        mods_entry.connect("changed", check_conflicts)
+        key_entry.connect("changed", check_conflicts)
+        check_conflicts()
+        
         def on_response(d, response):
             if response == "add":
                 bind_type = type_model.get_string(type_combo.get_selected())
@@ -1839,18 +2304,354 @@ class KeybindsPage(Gtk.Box):
                 
                 if key and action:
                     self.config.add_bind(bind_type, mods, key, action)
-                    self.config.save()
-                    self.load_binds()
+                    self.store.commit(TOPIC_BINDS, description=f"Add keybind {mods} + {key}")
                     self.app.toast(f"Added: {mods} + {key}")
         
         dialog.connect("response", on_response)
         dialog.present()
     
-    def _remove_bind(self, mods: str, key: str):
-        self.config.remove_bind(mods, key)
-        self.config.save()
-        self.load_binds()
-        self.app.toast(f"Removed: {mods} + {key}")
+    def _remove_bind_item(self, item: Optional[BindItem]):
+        if item is None:
+            return
+        if self.config.remove_bind(item.entry):
+            self.store.commit(TOPIC_BINDS, description=f"Remove keybind {item.keys_label}")
+            self.app.toast(f"Removed: {item.keys_label}")
+        else:
+            self.app.toast(f"Keybind no longer in {self.config.path.name}", error=True)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Wallpaper Thumbnails
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+WALLPAPER_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+THUMBNAIL_SIZE = 256
+TEXTURE_CACHE_BUDGET = 64 * 1024 * 1024
+ENUMERATE_BATCH = 200
+
+
+class TextureCache:
+    """Least-recently-used thumbnail textures, bounded by decoded size in bytes."""
+    
+    def __init__(self, budget: int = TEXTURE_CACHE_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self._items: "OrderedDict[Path, Gdk.Texture]" = OrderedDict()
+    
+    @staticmethod
+    def _cost(texture: Gdk.Texture) -> int:
+        return texture.get_width() * texture.get_height() * 4
+    
+    def get(self, key: Path) -> Optional[Gdk.Texture]:
+        texture = self._items.get(key)
+        if texture is not None:
+            self._items.move_to_end(key)
+        return texture
+    
+    def put(self, key: Path, texture: Gdk.Texture):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.used -= self._cost(old)
+        self._items[key] = texture
+        self.used += self._cost(texture)
+        while self.used > self.budget and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self.used -= self._cost(evicted)
+    
+    def clear(self):
+        self._items.clear()
+        self.used = 0
+
+
+class ThumbnailLoader:
+    """Decode wallpaper thumbnails on a worker pool.
+
+    Images are decoded straight to thumbnail size (libjpeg and friends
+    scale while decoding) and stored in the freedesktop thumbnail cache,
+    validated against the source's mtime and size, so file managers share
+    them and later launches skip decoding entirely.
+    """
+    
+    def __init__(self, workers: Optional[int] = None):
+        self._pool = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 2),
+                                        thread_name_prefix="thumbnails")
+        self._generation = 0
+        self._futures: Dict[Path, Any] = {}
+    
+    @staticmethod
+    def cache_path(path: Path) -> Path:
+        uri = path.resolve().as_uri()
+        return THUMBNAIL_DIR / f"{hashlib.md5(uri.encode()).hexdigest()}.png"
+    
+    def load(self, path: Path) -> Optional[GdkPixbuf.Pixbuf]:
+        """Return a thumbnail pixbuf for `path`. Safe to call off the main thread."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        mtime, size = str(int(st.st_mtime)), str(st.st_size)
+        thumb = self.cache_path(path)
+        
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(str(thumb))
+            if (pixbuf.get_option("tEXt::Thumb::MTime") == mtime
+                    and pixbuf.get_option("tEXt::Thumb::Size") in (None, size)):
+                return pixbuf
+        except GLib.Error:
+            pass
+        
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                str(path), THUMBNAIL_SIZE, THUMBNAIL_SIZE, True)
+            pixbuf = pixbuf.apply_embedded_orientation() or pixbuf
+        except GLib.Error:
+            return None
+        
+        try:
+            THUMBNAIL_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp = thumb.with_name(f"{thumb.stem}.{os.getpid()}.{threading.get_ident()}.png")
+            pixbuf.savev(str(tmp), "png",
+                         ["tEXt::Thumb::URI", "tEXt::Thumb::MTime", "tEXt::Thumb::Size"],
+                         [path.resolve().as_uri(), mtime, size])
+            os.replace(tmp, thumb)
+        except (GLib.Error, OSError):
+            pass
+        return pixbuf
+    
+    def request(self, paths: List[Path], callback):
+        """Queue `paths` in order; `callback(path, texture)` runs on the main thread."""
+        generation = self._generation
+        for path in paths:
+            if path in self._futures:
+                continue
+            future = self._pool.submit(self._work, path, generation)
+            self._futures[path] = future
+            future.add_done_callback(
+                lambda f, p=path: GLib.idle_add(self._deliver, f, p, generation, callback))
+    
+    def _work(self, path: Path, generation: int):
+        if generation != self._generation:
+            return None
+        return self.load(path)
+    
+    def _deliver(self, future, path: Path, generation: int, callback):
+        if generation != self._generation or future.cancelled():
+            return False
+        if self._futures.get(path) is future:
+            del self._futures[path]
+        pixbuf = future.result()
+        if pixbuf is not None:
+            callback(path, Gdk.Texture.new_for_pixbuf(pixbuf))
+        return False
+    
+    def discard(self, path: Path):
+        """Forget a queued request whose cell scrolled out of view."""
+        future = self._futures.pop(path, None)
+        if future is not None:
+            future.cancel()
+    
+    def cancel(self):
+        """Drop queued work; results of jobs already running are discarded."""
+        self._generation += 1
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+
+
+class WallpaperItem(GObject.Object):
+    """One image file in the wallpaper directory."""
+    
+    name = GObject.Property(type=str, default="")
+    
+    def __init__(self, path: Path):
+        super().__init__(name=path.name)
+        self.path = path
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Wallpaper Import
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+IMPORT_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
+COPY_CHUNK = 1024 * 1024
+PROGRESS_INTERVAL = 0.1
+
+
+class ImportProgress(NamedTuple):
+    done: int
+    total: int
+    bytes_done: int
+    bytes_total: int
+    rate: float
+    current: str
+
+
+class ImportResult(NamedTuple):
+    moved: int
+    duplicates: int
+    renamed: int
+    failed: List[Tuple[str, str]]
+    cancelled: bool
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def unique_destination(dst: Path, name: str) -> Path:
+    """Return `dst/name`, or `dst/stem (n).ext` if that name is taken."""
+    target = dst / name
+    stem, suffix = Path(name).stem, Path(name).suffix
+    n = 1
+    while target.exists():
+        target = dst / f"{stem} ({n}){suffix}"
+        n += 1
+    return target
+
+
+class WallpaperImportJob:
+    """Move image files from one folder into another on a worker thread.
+    
+    Files are renamed when both folders share a filesystem and copied in
+    chunks otherwise, so progress and cancellation stay responsive on slow
+    media. Files whose content already exists in the destination are left
+    in place, and name collisions get a numbered name instead of
+    overwriting. Callbacks run on the main thread.
+    """
+    
+    def __init__(self, src: Path, dst: Path, on_progress, on_done):
+        self.src = src
+        self.dst = dst
+        self._on_progress = on_progress
+        self._on_done = on_done
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._bytes_done = 0
+        self._started = self._last_report = 0.0
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="wallpaper-import")
+        self._thread.start()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _run(self):
+        result = self.run()
+        GLib.idle_add(self._on_done, result)
+    
+    def run(self) -> ImportResult:
+        """Do the import synchronously and return its result."""
+        failed: List[Tuple[str, str]] = []
+        try:
+            self.dst.mkdir(parents=True, exist_ok=True)
+            files = [(f, f.stat().st_size) for f in sorted(self.src.iterdir())
+                     if f.suffix.lower() in IMPORT_EXTENSIONS and f.is_file()]
+            same_fs = self.src.stat().st_dev == self.dst.stat().st_dev
+        except OSError as e:
+            return ImportResult(0, 0, 0, [(str(self.src), e.strerror or str(e))], False)
+        
+        # Only destination files sharing a size with some source file can
+        # be duplicates, so hash those lazily instead of the whole folder.
+        by_size: Dict[int, List[Path]] = {}
+        for existing in self.dst.iterdir():
+            try:
+                if existing.is_file():
+                    by_size.setdefault(existing.stat().st_size, []).append(existing)
+            except OSError:
+                continue
+        digests: Dict[Path, str] = {}
+        
+        def digest(path: Path) -> Optional[str]:
+            if path not in digests:
+                try:
+                    digests[path] = _file_digest(path)
+                except OSError:
+                    return None
+            return digests[path]
+        
+        total_bytes = sum(size for _, size in files)
+        moved = duplicates = renamed = 0
+        self._bytes_done = 0
+        self._started = self._last_report = time.monotonic()
+        
+        for done, (path, size) in enumerate(files):
+            if self._cancel.is_set():
+                break
+            self._report(done, len(files), total_bytes, path.name, force=True)
+            try:
+                same_size = by_size.get(size, [])
+                if same_size:
+                    source_digest = digest(path)
+                    if source_digest and any(digest(p) == source_digest for p in same_size):
+                        duplicates += 1
+                        self._bytes_done += size
+                        continue
+                
+                target = unique_destination(self.dst, path.name)
+                if target.name != path.name:
+                    renamed += 1
+                if same_fs:
+                    os.rename(path, target)
+                    self._bytes_done += size
+                elif not self._copy(path, target, done, len(files), total_bytes):
+                    break
+                else:
+                    path.unlink()
+                
+                by_size.setdefault(size, []).append(target)
+                if path in digests:
+                    digests[target] = digests.pop(path)
+                moved += 1
+            except OSError as e:
+                failed.append((path.name, e.strerror or str(e)))
+        
+        self._report(moved + duplicates + len(failed), len(files), total_bytes, "", force=True)
+        return ImportResult(moved, duplicates, renamed, failed, self._cancel.is_set())
+    
+    def _copy(self, path: Path, target: Path, done: int, total: int, total_bytes: int) -> bool:
+        """Copy `path` to `target` in chunks. Returns False if cancelled."""
+        tmp = target.with_name(f".{target.name}.part")
+        try:
+            with open(path, 'rb') as fin, open(tmp, 'wb') as fout:
+                while True:
+                    if self._cancel.is_set():
+                        raise InterruptedError
+                    chunk = fin.read(COPY_CHUNK)
+                    if not chunk:
+                        break
+                    fout.write(chunk)
+                    self._bytes_done += len(chunk)
+                    self._report(done, total, total_bytes, path.name)
+                fout.flush()
+                os.fsync(fout.fileno())
+            shutil.copystat(path, tmp)
+            os.replace(tmp, target)
+            return True
+        except InterruptedError:
+            tmp.unlink(missing_ok=True)
+            return False
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
+    
+    def _report(self, done: int, total: int, total_bytes: int, current: str, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        elapsed = now - self._started
+        rate = self._bytes_done / elapsed if elapsed > 0 else 0.0
+        GLib.idle_add(self._on_progress,
+                      ImportProgress(done, total, self._bytes_done, total_bytes, rate, current))
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -1892,7 +2693,7 @@ class WallpaperPage(Gtk.Box):
         content.append(actions_group)
         
         set_row = Adw.ActionRow(title="Set Wallpaper",
-                                subtitle="Run wallpaper selection script")
+                                subtitle="Apply the selected image, or pick one from the script")
         set_row.set_activatable(True)
         set_btn = Gtk.Button(label="Select")
         set_btn.add_css_class("md3-filled-tonal-button")
@@ -1901,6 +2702,16 @@ class WallpaperPage(Gtk.Box):
         set_row.add_suffix(set_btn)
         actions_group.add(set_row)
         
+        if palette:
+            self.palette_row = Adw.ActionRow(title="Precompute Palettes",
+                                             subtitle="Cache Material You colors for every wallpaper")
+            self.palette_btn = Gtk.Button(label="Run")
+            self.palette_btn.add_css_class("md3-outlined-button")
+            self.palette_btn.set_valign(Gtk.Align.CENTER)
+            self.palette_btn.connect("clicked", self._precompute_palettes)
+            self.palette_row.add_suffix(self.palette_btn)
+            actions_group.add(self.palette_row)
+        
         edit_row = Adw.ActionRow(title="Edit Wallpaper Script",
                                  subtitle=str(WAL_SCRIPT))
         edit_row.set_activatable(True)
@@ -1940,11 +2751,27 @@ class WallpaperPage(Gtk.Box):
         move_btn_row.set_halign(Gtk.Align.END)
         content.append(move_btn_row)
         
-        move_btn = Gtk.Button(label="Move Image Files")
-        move_btn.add_css_class("suggested-action")
-        move_btn.add_css_class("md3-filled-button")
-        move_btn.connect("clicked", self._move_wallpapers)
-        move_btn_row.append(move_btn)
+        self.move_btn = Gtk.Button(label="Move Image Files")
+        self.move_btn.add_css_class("suggested-action")
+        self.move_btn.add_css_class("md3-filled-button")
+        self.move_btn.connect("clicked", self._move_wallpapers)
+        move_btn_row.append(self.move_btn)
+        
+        self.import_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.import_box.set_margin_top(12)
+        self.import_box.set_visible(False)
+        content.append(self.import_box)
+        
+        self.import_bar = Gtk.ProgressBar()
+        self.import_bar.add_css_class("md3-progress-linear")
+        self.import_box.append(self.import_bar)
+        
+        self.import_label = Gtk.Label()
+        self.import_label.add_css_class("md3-body-small")
+        self.import_label.set_halign(Gtk.Align.START)
+        self.import_label.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        self.import_box.append(self.import_label)
+        self.import_job: Optional[WallpaperImportJob] = None
         
         # Gallery
         gallery_label = Gtk.Label(label="WALLPAPER GALLERY")
@@ -1954,24 +2781,82 @@ class WallpaperPage(Gtk.Box):
         gallery_label.set_margin_bottom(12)
         content.append(gallery_label)
         
-        self.gallery_flow = Gtk.FlowBox()
-        self.gallery_flow.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.gallery_flow.set_max_children_per_line(5)
-        self.gallery_flow.set_min_children_per_line(2)
-        self.gallery_flow.set_column_spacing(12)
-        self.gallery_flow.set_row_spacing(12)
-        self.gallery_flow.set_homogeneous(True)
-        content.append(self.gallery_flow)
+        # Gallery: file entries -> name-sorted model -> recycled GridView cells
+        self.gallery_store = Gio.ListStore.new(WallpaperItem)
+        sorter = Gtk.StringSorter.new(Gtk.PropertyExpression.new(WallpaperItem, None, "name"))
+        sorted_model = Gtk.SortListModel.new(self.gallery_store, sorter)
+        selection = Gtk.SingleSelection.new(sorted_model)
+        selection.set_autoselect(False)
+        selection.set_can_unselect(True)
+        self.gallery_selection = selection
+        
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._setup_gallery_cell)
+        factory.connect("bind", self._bind_gallery_cell)
+        factory.connect("unbind", self._unbind_gallery_cell)
+        
+        self.gallery_grid = Gtk.GridView.new(selection, factory)
+        self.gallery_grid.set_max_columns(5)
+        self.gallery_grid.set_min_columns(2)
+        self.gallery_grid.add_css_class("wallpaper-grid")
+        
+        gallery_scroll = Gtk.ScrolledWindow()
+        gallery_scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        gallery_scroll.set_min_content_height(420)
+        gallery_scroll.set_vexpand(True)
+        gallery_scroll.set_child(self.gallery_grid)
+        content.append(gallery_scroll)
+        
+        self.thumbnails = ThumbnailLoader()
+        self.textures = TextureCache()
+        self._visible_pictures: Dict[Path, Gtk.Picture] = {}
+        self._enumerate_cancellable: Optional[Gio.Cancellable] = None
+        self.connect("map", self._on_map)
+        self.connect("unmap", self._on_unmap)
         
         self._load_gallery()
     
     def _set_wallpaper(self, btn):
-        if WAL_SCRIPT.exists():
+        if not WAL_SCRIPT.exists():
+            self.app.toast("Wallpaper script not found", error=True)
+            return
+        
+        item = self.gallery_selection.get_selected_item()
+        if item is None:
             subprocess.Popen(["bash", str(WAL_SCRIPT)], 
                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             self.app.toast("Wallpaper script executed")
-        else:
-            self.app.toast("Wallpaper script not found", error=True)
+            return
+        
+        # wal.sh themes through palette.py, which reuses cached palettes
+        subprocess.Popen(["bash", str(WAL_SCRIPT), str(item.path)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.app.toast(f"Applying {item.name}")
+    
+    def _precompute_palettes(self, btn):
+        btn.set_sensitive(False)
+        self.palette_row.set_subtitle("Scanning wallpapers…")
+        
+        def on_progress(done, total):
+            GLib.idle_add(self.palette_row.set_subtitle, f"Extracting {done}/{total}")
+        
+        def on_done(computed, cached, failures):
+            btn.set_sensitive(True)
+            self.palette_row.set_subtitle("Cache Material You colors for every wallpaper")
+            self.app.toast(f"{computed} palette(s) computed, {cached} already cached")
+            if failures:
+                name, error = failures[0]
+                self.app.toast(f"{len(failures)} failed — {name}: {error}", error=True)
+            return False
+        
+        def work():
+            try:
+                result = palette.precompute(WALLPAPER_DIR, progress=on_progress)
+            except Exception as e:
+                result = (0, 0, [("palette cache", str(e))])
+            GLib.idle_add(on_done, *result)
+        
+        threading.Thread(target=work, daemon=True).start()
     
     def _edit_script(self, btn):
         editor = os.environ.get("EDITOR", "vim")
@@ -1993,53 +2878,146 @@ class WallpaperPage(Gtk.Box):
         dialog.select_folder(self.app.win, None, on_folder)
     
     def _move_wallpapers(self, btn):
-        src = Path(self.src_entry.get_text())
-        dst = Path(self.dst_entry.get_text())
-        
-        if not src.exists():
-            self.app.toast("Source folder not found", error=True)
+        if self.import_job and self.import_job.running:
+            self.import_job.cancel()
+            self.move_btn.set_sensitive(False)
             return
         
-        dst.mkdir(parents=True, exist_ok=True)
+        src = Path(self.src_entry.get_text()).expanduser()
+        dst = Path(self.dst_entry.get_text()).expanduser()
         
-        extensions = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
-        moved = 0
-        
-        for f in src.iterdir():
-            if f.suffix.lower() in extensions:
-                try:
-                    shutil.move(str(f), str(dst / f.name))
-                    moved += 1
-                except Exception:
-                    pass
+        if not src.is_dir():
+            self.app.toast("Source folder not found", error=True)
+            return
         
-        self.app.toast(f"Moved {moved} image(s)")
-        self._load_gallery()
+        self.import_job = WallpaperImportJob(src, dst, self._on_import_progress,
+                                             self._on_import_done)
+        self.move_btn.set_label("Cancel")
+        self.move_btn.remove_css_class("suggested-action")
+        self.import_bar.set_fraction(0)
+        self.import_label.set_text("Scanning…")
+        self.import_box.set_visible(True)
+        self.import_job.start()
+    
+    def _on_import_progress(self, progress: ImportProgress):
+        if progress.bytes_total:
+            self.import_bar.set_fraction(progress.bytes_done / progress.bytes_total)
+        status = f"{progress.done}/{progress.total} · {progress.rate / 1048576:.1f} MB/s"
+        if progress.current:
+            status += f" · {progress.current}"
+        self.import_label.set_text(status)
+        return False
+    
+    def _on_import_done(self, result: ImportResult):
+        self.import_job = None
+        self.import_box.set_visible(False)
+        self.move_btn.set_label("Move Image Files")
+        self.move_btn.add_css_class("suggested-action")
+        self.move_btn.set_sensitive(True)
+        
+        parts = [f"Moved {result.moved} image(s)"]
+        if result.duplicates:
+            parts.append(f"skipped {result.duplicates} duplicate(s)")
+        if result.renamed:
+            parts.append(f"renamed {result.renamed}")
+        if result.cancelled:
+            parts.append("cancelled")
+        self.app.toast(", ".join(parts))
+        
+        if result.failed:
+            name, reason = result.failed[0]
+            more = f" (+{len(result.failed) - 1} more)" if len(result.failed) > 1 else ""
+            self.app.toast(f"Failed to move {name}: {reason}{more}", error=True)
+        
+        if result.moved:
+            self._load_gallery()
+        return False
     
     def _load_gallery(self):
-        while child := self.gallery_flow.get_first_child():
-            self.gallery_flow.remove(child)
+        if self._enumerate_cancellable:
+            self._enumerate_cancellable.cancel()
+        self.thumbnails.cancel()
+        self.gallery_store.remove_all()
         
         if not WALLPAPER_DIR.exists():
             return
         
-        extensions = {'.jpg', '.jpeg', '.png', '.webp'}
-        images = sorted([f for f in WALLPAPER_DIR.iterdir()
-                        if f.suffix.lower() in extensions])[:20]
+        # Enumerate in batches so the first cells show up before the
+        # whole directory has been read.
+        cancellable = Gio.Cancellable()
+        self._enumerate_cancellable = cancellable
         
-        for img_path in images:
+        def on_next(enumerator, result):
             try:
-                texture = Gdk.Texture.new_from_filename(str(img_path))
-                picture = Gtk.Picture.new_for_paintable(texture)
-                picture.set_content_fit(Gtk.ContentFit.COVER)
-                picture.set_size_request(140, 90)
-                picture.add_css_class("wallpaper-thumb")
-                
-                frame = Gtk.Frame()
-                frame.set_child(picture)
-                self.gallery_flow.append(frame)
-            except Exception:
-                pass
+                infos = enumerator.next_files_finish(result)
+            except GLib.Error:
+                return
+            if cancellable.is_cancelled():
+                return
+            if not infos:
+                enumerator.close_async(GLib.PRIORITY_LOW, None, None, None)
+                return
+            batch = [WallpaperItem(WALLPAPER_DIR / info.get_name()) for info in infos
+                     if info.get_file_type() == Gio.FileType.REGULAR
+                     and Path(info.get_name()).suffix.lower() in WALLPAPER_EXTENSIONS]
+            if batch:
+                self.gallery_store.splice(self.gallery_store.get_n_items(), 0, batch)
+            enumerator.next_files_async(ENUMERATE_BATCH, GLib.PRIORITY_LOW,
+                                        cancellable, on_next)
+        
+        def on_enumerate(directory, result):
+            try:
+                enumerator = directory.enumerate_children_finish(result)
+            except GLib.Error:
+                return
+            enumerator.next_files_async(ENUMERATE_BATCH, GLib.PRIORITY_LOW,
+                                        cancellable, on_next)
+        
+        Gio.File.new_for_path(str(WALLPAPER_DIR)).enumerate_children_async(
+            "standard::name,standard::type", Gio.FileQueryInfoFlags.NONE,
+            GLib.PRIORITY_LOW, cancellable, on_enumerate)
+    
+    def _setup_gallery_cell(self, factory, list_item):
+        picture = Gtk.Picture()
+        picture.set_content_fit(Gtk.ContentFit.COVER)
+        picture.set_size_request(140, 90)
+        picture.add_css_class("wallpaper-thumb")
+        
+        frame = Gtk.Frame()
+        frame.set_child(picture)
+        list_item.set_child(frame)
+    
+    def _bind_gallery_cell(self, factory, list_item):
+        item = list_item.get_item()
+        picture = list_item.get_child().get_child()
+        picture.set_tooltip_text(item.name)
+        self._visible_pictures[item.path] = picture
+        
+        # Only cells GTK actually binds (the visible ones) ask for a thumbnail.
+        texture = self.textures.get(item.path)
+        picture.set_paintable(texture)
+        if texture is None and self.get_mapped():
+            self.thumbnails.request([item.path], self._on_thumbnail)
+    
+    def _unbind_gallery_cell(self, factory, list_item):
+        item = list_item.get_item()
+        if self._visible_pictures.get(item.path) is list_item.get_child().get_child():
+            del self._visible_pictures[item.path]
+            self.thumbnails.discard(item.path)
+    
+    def _on_thumbnail(self, path: Path, texture: Gdk.Texture):
+        self.textures.put(path, texture)
+        picture = self._visible_pictures.get(path)
+        if picture is not None:
+            picture.set_paintable(texture)
+    
+    def _on_map(self, widget):
+        pending = [path for path, picture in self._visible_pictures.items()
+                   if picture.get_paintable() is None]
+        self.thumbnails.request(pending, self._on_thumbnail)
+    
+    def _on_unmap(self, widget):
+        self.thumbnails.cancel()
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -2050,7 +3028,8 @@ class ShellPage(Gtk.Box):
     def __init__(self, app):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.app = app
-        self.kitty_config = None
+        self.store = ConfigStore.get(KITTY_CONF, KittyConfig)
+        self.kitty_config = self.store.config
         self._loading = True
         
         scroll = Gtk.ScrolledWindow()
@@ -2140,11 +3119,11 @@ class ShellPage(Gtk.Box):
             row.add_suffix(status)
             zsh_group.add(row)
         
+        self.store.subscribe({TOPIC_OPTIONS}, lambda topics: self.load_config(), owner=self)
         self.load_config()
     
     def load_config(self):
         self._loading = True
-        self.kitty_config = KittyConfig(KITTY_CONF)
         
         current = self.kitty_config.get_shell()
         if not current:
@@ -2173,7 +3152,7 @@ class ShellPage(Gtk.Box):
         elif idx == 3:
             self.kitty_config.set_shell("/usr/bin/fish")
         
-        self.kitty_config.save()
+        self.store.commit(TOPIC_OPTIONS, origin=self, description="Terminal shell")
         self.app.toast("Shell configuration updated")
     
     def _on_zsh_toggle(self, row, param):
@@ -2189,13 +3168,55 @@ class ShellPage(Gtk.Box):
 #  Downloads Page — Enhanced Terminal & Animations
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+INSTALL_MERGE_MS = 800
+RESULT_PAGE_SIZE = 100
+
+PACKAGE_SORT_MODES = [
+    ("relevance", "Relevance"),
+    ("name", "Name"),
+    ("repo", "Repository"),
+    ("popularity", "Popularity"),
+]
+
+
+class PackageItem(GObject.Object):
+    """One search result; install progress lives here so recycled rows follow it."""
+    
+    install_state = GObject.Property(type=str, default="")
+    
+    def __init__(self, index: int, pkg: Dict):
+        super().__init__()
+        self.index = index
+        self.pkg = pkg
+        self.name = pkg["name"]
+        popularity = pkg.get("popularity")
+        self.sort_keys = {
+            "relevance": (index,),
+            "name": (self.name.lower(), index),
+            "repo": (pkg["repo"] == "AUR", pkg["repo"], index),
+            # Official packages carry no popularity; list them after rated AUR ones
+            "popularity": (popularity is None, -(popularity or 0), index),
+        }
+
+
 class DownloadsPage(Gtk.Box):
     def __init__(self, app):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         self.app = app
-        self.search_results = []
-        self.installing = False
-        self.current_install_btn = None
+        self._sort_mode = "relevance"
+        self.install_pending: List[PackageItem] = []
+        self.install_txn: Optional[List[PackageItem]] = None
+        self._install_merge_id = None
+        self._install_progress_id = None
+        
+        # Read the sync databases once up front so the first search is instant
+        self.sync_index = pkgdb.SyncIndex() if pkgdb else None
+        self.local_index = pkgdb.LocalIndex() if pkgdb else None
+        self.searcher = pkgdb.PackageSearch(self.sync_index,
+                                            local=self.local_index) if pkgdb else None
+        self.search_job = None
+        if self.sync_index:
+            threading.Thread(target=self.sync_index.refresh, daemon=True).start()
         
         # Main content
         content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
@@ -2239,6 +3260,7 @@ class DownloadsPage(Gtk.Box):
         self.search_entry.add_css_class("md3-search")
         self.search_entry.set_hexpand(True)
         self.search_entry.connect("activate", self._do_search)
+        self.search_entry.connect("search-changed", self._on_search_changed)
         search_box.append(self.search_entry)
         
         self.btn_search = Gtk.Button(label="Search")
@@ -2247,6 +3269,12 @@ class DownloadsPage(Gtk.Box):
         self.btn_search.connect("clicked", self._do_search)
         search_box.append(self.btn_search)
         
+        self.sort_combo = Gtk.DropDown.new_from_strings([label for _, label in PACKAGE_SORT_MODES])
+        self.sort_combo.set_valign(Gtk.Align.CENTER)
+        self.sort_combo.set_tooltip_text("Sort by")
+        self.sort_combo.connect("notify::selected", self._on_sort_changed)
+        search_box.append(self.sort_combo)
+        
         # Progress & Status
         status_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
         status_box.set_margin_bottom(12)
@@ -2263,16 +3291,29 @@ class DownloadsPage(Gtk.Box):
         self.status_label.set_halign(Gtk.Align.START)
         content.append(self.status_label)
         
-        # Results (scrollable, limited height)
+        # Results: every hit in a store -> sorted -> slice that grows as the
+        # list is scrolled -> recycled ListView rows
+        self.result_store = Gio.ListStore.new(PackageItem)
+        self.result_sorter = Gtk.CustomSorter.new(self._compare_packages)
+        sorted_results = Gtk.SortListModel.new(self.result_store, self.result_sorter)
+        self.result_slice = Gtk.SliceListModel.new(sorted_results, 0, RESULT_PAGE_SIZE)
+        
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._setup_package_row)
+        factory.connect("bind", self._bind_package_row)
+        factory.connect("unbind", self._unbind_package_row)
+        
+        self.result_list = Gtk.ListView.new(Gtk.NoSelection.new(self.result_slice), factory)
+        self.result_list.add_css_class("package-list")
+        
         results_scroll = Gtk.ScrolledWindow()
         results_scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         results_scroll.set_min_content_height(200)
         results_scroll.set_max_content_height(280)
+        results_scroll.set_child(self.result_list)
+        results_scroll.get_vadjustment().connect("value-changed", self._on_results_scrolled)
         content.append(results_scroll)
         
-        self.results_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
-        results_scroll.set_child(self.results_box)
-        
         # Terminal section - LARGER
         term_header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
         term_header.set_margin_top(20)
@@ -2319,8 +3360,17 @@ class DownloadsPage(Gtk.Box):
             term_scroll.set_vexpand(True)
             term_container.append(term_scroll)
             
-            # Spawn initial shell
-            self._spawn_shell()
+            self.terminal.connect("child-exited", self._on_child_exited)
+            self.terminal.connect("contents-changed", self._on_terminal_output)
+            
+            # The shell starts the first time the terminal is focused;
+            # installs spawn their own child and don't need it.
+            self._shell_running = False
+            self._shell_wanted = False
+            focus = Gtk.EventControllerFocus()
+            focus.connect("enter", self._on_terminal_focus)
+            self.terminal.add_controller(focus)
+            self.terminal.feed("Click here to open a shell.\r\n".encode())
             
         except Exception as e:
             self.terminal = None
@@ -2329,9 +3379,16 @@ class DownloadsPage(Gtk.Box):
             lbl.set_vexpand(True)
             term_container.append(lbl)
     
+    def _on_terminal_focus(self, controller):
+        self._shell_wanted = True
+        if not self._shell_running and self.install_txn is None:
+            self._spawn_shell()
+    
     def _spawn_shell(self):
         """Spawn a shell in the terminal."""
         if self.terminal:
+            self._shell_running = True
+            debug("downloads: spawning terminal shell")
             self.terminal.spawn_async(
                 Vte.PtyFlags.DEFAULT,
                 str(HOME),
@@ -2351,12 +3408,19 @@ class DownloadsPage(Gtk.Box):
         self.search_entry.set_sensitive(enabled)
         self.btn_search.set_sensitive(enabled)
     
+    def _on_search_changed(self, entry):
+        # SearchEntry already debounces; each new query supersedes the last
+        if len(entry.get_text().strip()) >= 2:
+            self._do_search(entry)
+    
     def _do_search(self, widget):
         if not self.sw_enable.get_active():
             return
         
         query = self.search_entry.get_text().strip()
-        if not query:
+        if not query or not self.searcher:
+            return
+        if self.search_job and self.search_job.query == query and not self.search_job.cancelled:
             return
         
         self.status_label.set_label("🔍 Searching...")
@@ -2365,88 +3429,64 @@ class DownloadsPage(Gtk.Box):
         self.progress.set_visible(True)
         
         # Pulse animation
-        self._pulse_id = GLib.timeout_add(100, self._pulse_progress)
+        if not getattr(self, '_pulse_id', None):
+            self._pulse_id = GLib.timeout_add(100, self._pulse_progress)
         
-        while child := self.results_box.get_first_child():
-            self.results_box.remove(child)
+        self.result_store.remove_all()
+        self.result_slice.set_size(RESULT_PAGE_SIZE)
         
-        def search_thread():
-            results = []
-            
-            # Pacman
-            try:
-                out = subprocess.check_output(["pacman", "-Ss", query],
-                                             stderr=subprocess.DEVNULL, text=True)
-                results.extend(self._parse_output(out, "pacman"))
-            except Exception:
-                pass
-            
-            # AUR (yay)
-            try:
-                out = subprocess.check_output(["yay", "-Ss", "--aur", query],
-                                             stderr=subprocess.DEVNULL, text=True)
-                results.extend(self._parse_output(out, "AUR"))
-            except Exception:
-                pass
-            
-            GLib.idle_add(self._show_results, results)
-        
-        threading.Thread(target=search_thread, daemon=True).start()
+        self.search_job = self.searcher.search(
+            query, lambda job, backend, results:
+                GLib.idle_add(self._on_search_results, job, backend, results))
     
     def _pulse_progress(self):
         if self.progress.get_visible():
             self.progress.pulse()
             return True
+        self._pulse_id = None
         return False
     
-    def _parse_output(self, output: str, repo: str) -> List[Dict]:
-        results = []
-        lines = output.strip().split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i].strip()
-            if '/' in line and not line.startswith(' '):
-                parts = line.split()
-                if len(parts) >= 2:
-                    name_full = parts[0]
-                    version = parts[1] if len(parts) > 1 else ""
-                    name = name_full.split('/')[-1] if '/' in name_full else name_full
-                    
-                    desc = ""
-                    if i + 1 < len(lines):
-                        desc = lines[i + 1].strip()
-                        i += 1
-                    
-                    results.append({
-                        "name": name,
-                        "version": version,
-                        "description": desc,
-                        "repo": repo
-                    })
-            i += 1
-        
-        return results[:30]
-    
-    def _show_results(self, results: List[Dict]):
-        if hasattr(self, '_pulse_id'):
-            GLib.source_remove(self._pulse_id)
-        self.progress.set_visible(False)
-        self.search_results = results
+    def _on_search_results(self, job, backend: str, results: List[Dict]):
+        if job is not self.search_job:
+            return False
+        # Counted here, in delivery order, so the last callback is the one that finishes
+        done = job.finish_backend()
         
-        if not results:
-            self.status_label.set_label("❌ No packages found")
-            self.status_label.add_css_class("status-error")
-            return
+        # Repository hits rank above AUR ones in relevance order
+        offset = 0 if backend == "repo" else 1_000_000
+        items = [PackageItem(offset + i, pkg) for i, pkg in enumerate(results)]
+        self.result_store.splice(self.result_store.get_n_items(), 0, items)
         
-        self.status_label.set_label(f"✓ Found {len(results)} package(s)")
-        self.status_label.add_css_class("status-success")
+        count = self.result_store.get_n_items()
+        if not done:
+            self.status_label.set_label(f"🔍 Found {count} package(s), still searching...")
+            return False
         
-        for pkg in results:
-            row = self._create_package_row(pkg)
-            self.results_box.append(row)
+        self.progress.set_visible(False)
+        if not count:
+            self.status_label.set_label("❌ No packages found")
+            self.status_label.add_css_class("status-error")
+        else:
+            self.status_label.set_label(f"✓ Found {count} package(s)")
+            self.status_label.add_css_class("status-success")
+        return False
     
-    def _create_package_row(self, pkg: Dict) -> Gtk.Box:
+    def _on_results_scrolled(self, adj):
+        # Show another page once the view is within a screen of the slice's end
+        if adj.get_value() + 2 * adj.get_page_size() >= adj.get_upper():
+            size = self.result_slice.get_size()
+            if size < self.result_store.get_n_items():
+                self.result_slice.set_size(size + RESULT_PAGE_SIZE)
+    
+    def _on_sort_changed(self, combo, param):
+        self._sort_mode = PACKAGE_SORT_MODES[combo.get_selected()][0]
+        self.result_sorter.changed(Gtk.SorterChange.DIFFERENT)
+    
+    def _compare_packages(self, a, b, *args):
+        ka, kb = a.sort_keys[self._sort_mode], b.sort_keys[self._sort_mode]
+        return (ka > kb) - (ka < kb)
+    
+    def _setup_package_row(self, factory, list_item):
         row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=16)
         row.add_css_class("package-row")
         
@@ -2457,113 +3497,229 @@ class DownloadsPage(Gtk.Box):
         name_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
         info_box.append(name_row)
         
-        name_lbl = Gtk.Label(label=pkg["name"])
-        name_lbl.add_css_class("package-name")
-        name_lbl.set_halign(Gtk.Align.START)
-        name_row.append(name_lbl)
+        row.name_lbl = Gtk.Label()
+        row.name_lbl.add_css_class("package-name")
+        row.name_lbl.set_halign(Gtk.Align.START)
+        name_row.append(row.name_lbl)
         
-        ver_lbl = Gtk.Label(label=pkg["version"])
-        ver_lbl.add_css_class("package-version")
-        name_row.append(ver_lbl)
+        row.ver_lbl = Gtk.Label()
+        row.ver_lbl.add_css_class("package-version")
+        name_row.append(row.ver_lbl)
         
-        repo_lbl = Gtk.Label(label=pkg["repo"])
-        repo_lbl.add_css_class("package-repo")
-        name_row.append(repo_lbl)
+        row.repo_lbl = Gtk.Label()
+        row.repo_lbl.add_css_class("package-repo")
+        name_row.append(row.repo_lbl)
         
-        desc_lbl = Gtk.Label(label=pkg["description"])
-        desc_lbl.add_css_class("package-desc")
-        desc_lbl.set_halign(Gtk.Align.START)
-        desc_lbl.set_ellipsize(Pango.EllipsizeMode.END)
-        desc_lbl.set_max_width_chars(50)
-        info_box.append(desc_lbl)
+        row.desc_lbl = Gtk.Label()
+        row.desc_lbl.add_css_class("package-desc")
+        row.desc_lbl.set_halign(Gtk.Align.START)
+        row.desc_lbl.set_ellipsize(Pango.EllipsizeMode.END)
+        row.desc_lbl.set_max_width_chars(50)
+        info_box.append(row.desc_lbl)
         
         btn_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
         btn_box.set_valign(Gtk.Align.CENTER)
         row.append(btn_box)
         
-        btn_install = Gtk.Button(label="Install")
-        btn_install.add_css_class("install-button")
-        btn_install.connect("clicked", lambda b, p=pkg: self._install_package(p, b))
-        btn_box.append(btn_install)
+        row.btn_install = Gtk.Button(label="Install")
+        row.btn_install.add_css_class("install-button")
+        row.btn_install.connect("clicked", lambda b: self._install_package(list_item.get_item()))
+        btn_box.append(row.btn_install)
         
         btn_ignore = Gtk.Button(label="Ignore")
         btn_ignore.add_css_class("md3-text-button")
-        btn_ignore.connect("clicked", lambda b: row.set_visible(False))
+        btn_ignore.connect("clicked", lambda b: self._ignore_package(list_item.get_item()))
         btn_box.append(btn_ignore)
         
-        return row
-    
-    def _install_package(self, pkg: Dict, btn: Gtk.Button):
-        if self.installing:
-            self.app.toast("Installation already in progress", error=True)
+        row.state_handler = None
+        list_item.set_child(row)
+        list_item.set_activatable(False)
+    
+    def _bind_package_row(self, factory, list_item):
+        item = list_item.get_item()
+        row = list_item.get_child()
+        pkg = item.pkg
+        
+        version = pkg["version"]
+        if pkg.get("state") == "outdated":
+            version = f'{pkg["installed_version"]} → {pkg["version"]}'
+        row.name_lbl.set_label(pkg["name"])
+        row.ver_lbl.set_label(version)
+        row.repo_lbl.set_label(pkg["repo"])
+        row.desc_lbl.set_label(pkg["description"])
+        
+        handler = item.connect("notify::install-state",
+                               lambda i, p: self._update_install_button(row.btn_install, i))
+        row.state_handler = (item, handler)
+        self._update_install_button(row.btn_install, item)
+    
+    def _unbind_package_row(self, factory, list_item):
+        row = list_item.get_child()
+        if row.state_handler:
+            item, handler = row.state_handler
+            item.disconnect(handler)
+            row.state_handler = None
+    
+    def _update_install_button(self, btn: Gtk.Button, item: PackageItem):
+        state = item.install_state or item.pkg.get("state", "")
+        label, sensitive, css = {
+            "queued": ("Queued", False, "installing"),
+            "installing": ("Installing...", False, "installing"),
+            "done": ("✓ Installed", False, "suggested-action"),
+            "failed": ("✗ Failed", True, "destructive-action"),
+            "installed": ("✓ Installed", False, None),
+            "outdated": ("Update", True, None),
+        }.get(state, ("Install", True, None))
+        for cls in ("installing", "suggested-action", "destructive-action"):
+            btn.remove_css_class(cls)
+        if css:
+            btn.add_css_class(css)
+        btn.set_label(label)
+        btn.set_sensitive(sensitive)
+    
+    def _ignore_package(self, item: PackageItem):
+        found, position = self.result_store.find(item)
+        if found:
+            self.result_store.remove(position)
+    
+    def _install_package(self, item: PackageItem):
+        queued = self.install_pending + (self.install_txn or [])
+        if any(i.name == item.name for i in queued):
+            self.app.toast(f"{item.name} is already queued", error=True)
             return
         
-        self.installing = True
-        self.current_install_btn = btn
-        name = pkg["name"]
-        repo = pkg["repo"]
-        
-        # Update button state
-        btn.set_label("Installing...")
-        btn.add_css_class("installing")
-        btn.set_sensitive(False)
+        self.install_pending.append(item)
+        item.install_state = "queued"
+        
+        if self.install_txn is None:
+            self.term_status.set_label(f"{len(self.install_pending)} package(s) queued")
+            self.term_status.set_visible(True)
+            # Give quick successive clicks a moment to land in one transaction
+            if not self._install_merge_id:
+                self._install_merge_id = GLib.timeout_add(INSTALL_MERGE_MS,
+                                                          self._start_transaction)
+    
+    def _start_transaction(self) -> bool:
+        """Install every pending package from one source in a single transaction."""
+        self._install_merge_id = None
+        if self.install_txn is not None or not self.install_pending:
+            return False
         
-        # Show terminal status
-        self.term_status.set_label(f"Installing {name}...")
+        aur = self.install_pending[0].pkg["repo"] == "AUR"
+        batch = [i for i in self.install_pending if (i.pkg["repo"] == "AUR") == aur]
+        self.install_pending = [i for i in self.install_pending if i not in batch]
+        self.install_txn = batch
+        names = [item.name for item in batch]
+        argv = pkgdb.install_command(names, aur)
+        
+        for item in batch:
+            item.install_state = "installing"
+        self.term_status.set_label(f"Installing {', '.join(names)}...")
+        self.term_status.remove_css_class("status-success")
+        self.term_status.remove_css_class("status-error")
+        self.term_status.add_css_class("status-installing")
         self.term_status.set_visible(True)
+        self.progress.set_fraction(0)
+        self.progress.set_visible(True)
         
         if self.terminal:
-            # Build command
-            if repo == "AUR":
-                cmd = f"yay -S {name} --noconfirm && echo '\\n✓ Installation complete!' || echo '\\n✗ Installation failed!'\n"
-            else:
-                cmd = f"sudo pacman -S {name} --noconfirm && echo '\\n✓ Installation complete!' || echo '\\n✗ Installation failed!'\n"
-            
-            # Feed command to terminal
-            self.terminal.feed_child(cmd.encode())
-            
-            # Monitor for completion (simple timer-based check)
-            GLib.timeout_add(1000, self._check_install_complete, name, btn)
+            # The transaction replaces the idle shell as the terminal's child,
+            # so child-exited reports its real exit status.
+            self._shell_running = False
+            self.terminal.spawn_async(
+                Vte.PtyFlags.DEFAULT, str(HOME), argv, None,
+                GLib.SpawnFlags.SEARCH_PATH, None, None, -1, None,
+                self._on_transaction_spawned, None)
         else:
-            # Fallback
-            def install_thread():
-                try:
-                    if repo == "AUR":
-                        subprocess.run(["yay", "-S", name, "--noconfirm"], check=True)
-                    else:
-                        subprocess.run(["sudo", "pacman", "-S", name, "--noconfirm"], check=True)
-                    GLib.idle_add(self._on_install_success, name, btn)
-                except Exception as e:
-                    GLib.idle_add(self._on_install_error, name, btn, str(e))
-            
-            threading.Thread(target=install_thread, daemon=True).start()
+            threading.Thread(target=self._run_transaction, args=(argv,), daemon=True).start()
+        return False
     
-    def _check_install_complete(self, name: str, btn: Gtk.Button) -> bool:
-        """Simple completion check - timeout after 60 seconds."""
-        if not self.installing:
+    def _on_transaction_spawned(self, terminal, pid, error, *args):
+        if error or pid == -1:
+            self._on_transaction_done(False, str(error) if error else "spawn failed")
+    
+    def _run_transaction(self, argv: List[str]):
+        """Fallback without a terminal: run the transaction on a pipe."""
+        try:
+            proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    stdin=subprocess.DEVNULL)
+        except OSError as e:
+            GLib.idle_add(self._on_transaction_done, False, str(e))
+            return
+        buf = b""
+        while chunk := proc.stdout.read1(4096):
+            *lines, buf = re.split(rb'[\r\n]', buf + chunk)
+            for line in reversed(lines):
+                progress = pkgdb.parse_install_progress(line.decode(errors='replace'))
+                if progress:
+                    GLib.idle_add(self._show_install_progress, progress)
+                    break
+        code = proc.wait()
+        GLib.idle_add(self._on_transaction_done, code == 0, f"exit status {code}")
+    
+    def _on_terminal_output(self, terminal):
+        if self.install_txn is not None and not self._install_progress_id:
+            self._install_progress_id = GLib.timeout_add(100, self._read_terminal_progress)
+    
+    def _read_terminal_progress(self) -> bool:
+        self._install_progress_id = None
+        if self.install_txn is None:
             return False
-        
-        # After some time, assume it's done and reset
-        if not hasattr(self, '_install_timer'):
-            self._install_timer = 0
-        
-        self._install_timer += 1
-        
-        # Auto-complete after 60 seconds or check terminal output
-        if self._install_timer > 60:
-            self._install_timer = 0
-            self._on_install_success(name, btn)
+        _, row = self.terminal.get_cursor_position()
+        # pacman redraws its progress bar in place; the newest line is at the cursor
+        for r in (row, row - 1):
+            try:
+                text, _ = self.terminal.get_text_range_format(
+                    Vte.Format.TEXT, r, 0, r, self.terminal.get_column_count())
+            except (AttributeError, TypeError):
+                return False
+            progress = pkgdb.parse_install_progress(text or "")
+            if progress:
+                self._show_install_progress(progress)
+                break
+        return False
+    
+    def _show_install_progress(self, progress) -> bool:
+        if self.install_txn is None:
             return False
-        
-        return True
+        fraction = (progress.step - 1 + (progress.percent or 0) / 100) / max(progress.steps, 1)
+        self.progress.set_fraction(min(fraction, 1.0))
+        self.term_status.set_label(f"({progress.step}/{progress.steps}) {progress.message}")
+        return False
     
-    def _on_install_success(self, name: str, btn: Gtk.Button):
-        self.installing = False
-        self._install_timer = 0
+    def _on_child_exited(self, terminal, status: int):
+        if self.install_txn is None:
+            self._shell_running = False
+            return
+        ok = os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        if os.WIFEXITED(status):
+            detail = f"exit status {os.WEXITSTATUS(status)}"
+        else:
+            detail = "interrupted"
+        self._on_transaction_done(ok, detail)
+    
+    def _on_transaction_done(self, ok: bool, detail: str) -> bool:
+        batch, self.install_txn = self.install_txn or [], None
+        names = [item.name for item in batch]
+        if self.local_index:
+            self.local_index.refresh(force=True)
         
-        btn.set_label("✓ Installed")
-        btn.remove_css_class("installing")
-        btn.add_css_class("suggested-action")
+        if ok:
+            self._on_install_success(names, batch)
+        else:
+            self._on_install_error(names, batch, detail)
+        
+        if self.install_pending:
+            self._start_transaction()
+        else:
+            self.progress.set_visible(False)
+            if self.terminal and self._shell_wanted:
+                self._spawn_shell()
+        return False
+    
+    def _on_install_success(self, names: List[str], items: List[PackageItem]):
+        for item in items:
+            item.install_state = "done"
         
         self.term_status.set_label("✓ Complete")
         self.term_status.remove_css_class("status-installing")
@@ -2572,29 +3728,25 @@ class DownloadsPage(Gtk.Box):
         # Notification
         subprocess.Popen([
             "notify-send", "-a", "CarmonyOS Settings",
-            "Package Installed", f"{name} has been installed successfully",
+            "Package Installed", f"{', '.join(names)} installed successfully",
             "-i", "package-x-generic"
         ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         
-        self.app.toast(f"✓ {name} installed successfully")
+        self.app.toast(f"✓ {', '.join(names)} installed successfully")
         
         # Hide status after delay
-        GLib.timeout_add(3000, lambda: self.term_status.set_visible(False) or False)
+        GLib.timeout_add(3000, lambda: self.install_txn is None
+                         and self.term_status.set_visible(False) or False)
     
-    def _on_install_error(self, name: str, btn: Gtk.Button, error: str):
-        self.installing = False
-        self._install_timer = 0
+    def _on_install_error(self, names: List[str], items: List[PackageItem], error: str):
+        for item in items:
+            item.install_state = "failed"
         
-        btn.set_label("✗ Failed")
-        btn.remove_css_class("installing")
-        btn.add_css_class("destructive-action")
-        btn.set_sensitive(True)
-        
-        self.term_status.set_label("✗ Failed")
+        self.term_status.set_label(f"✗ Failed ({error})")
         self.term_status.remove_css_class("status-installing")
         self.term_status.add_css_class("status-error")
         
-        self.app.toast(f"Failed to install {name}", error=True)
+        self.app.toast(f"Failed to install {', '.join(names)}", error=True)
 
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -2671,12 +3823,26 @@ class AboutPage(Gtk.Box):
 #  Main Application
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+PAGE_TYPES = {
+    "hyprland": HyprlandPage,
+    "autostart": AutostartPage,
+    "hyprlock": HyprlockPage,
+    "keybinds": KeybindsPage,
+    "wallpaper": WallpaperPage,
+    "shell": ShellPage,
+    "downloads": DownloadsPage,
+    "about": AboutPage,
+}
+INITIAL_PAGE = "hyprland"
+
+
 class CarmonySettingsApp(Adw.Application):
     def __init__(self):
         super().__init__(application_id="com.carmonyos.settings")
         self.connect("activate", self.on_activate)
     
     def on_activate(self, app):
+        debug("activate")
         sm = Adw.StyleManager.get_default()
         sm.set_color_scheme(Adw.ColorScheme.PREFER_DARK)
         
@@ -2690,6 +3856,7 @@ class CarmonySettingsApp(Adw.Application):
         Gtk.StyleContext.add_provider_for_display(
             Gdk.Display.get_default(), css,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+        debug("stylesheet loaded")
         
         self.toast_overlay = Adw.ToastOverlay()
         self.win.set_content(self.toast_overlay)
@@ -2753,6 +3920,13 @@ class CarmonySettingsApp(Adw.Application):
         spacer.set_vexpand(True)
         rail.append(spacer)
         
+        # Undo / redo act on the config file of the visible page
+        self.undo_btn = self._rail_button("↶", "Undo", lambda b: self._step_history(-1))
+        self.redo_btn = self._rail_button("↷", "Redo", lambda b: self._step_history(1))
+        rail.append(self.undo_btn)
+        rail.append(self.redo_btn)
+        ConfigStore.watch_history(lambda store: self._update_history_buttons())
+        
         about_btn = Gtk.Button()
         about_btn.add_css_class("flat")
         about_btn.add_css_class("md3-nav-rail-item")
@@ -2780,35 +3954,98 @@ class CarmonySettingsApp(Adw.Application):
         self.stack.set_vexpand(True)
         root.append(self.stack)
         
-        self.stack.add_named(HyprlandPage(self), "hyprland")
-        self.stack.add_named(AutostartPage(self), "autostart")
-        self.stack.add_named(HyprlockPage(self), "hyprlock")
-        self.stack.add_named(KeybindsPage(self), "keybinds")
-        self.stack.add_named(WallpaperPage(self), "wallpaper")
-        self.stack.add_named(ShellPage(self), "shell")
-        self.stack.add_named(DownloadsPage(self), "downloads")
-        self.stack.add_named(AboutPage(self), "about")
-        
-        self._nav_to("hyprland")
+        # Pages are built the first time they are shown; only the initial
+        # one is paid for before the window appears.
+        self.pages: Dict[str, Gtk.Widget] = {}
+        self._nav_to(INITIAL_PAGE)
         
         kc = Gtk.EventControllerKey()
         kc.connect("key-pressed", self._on_key)
         self.win.add_controller(kc)
         
+        if DEBUG:
+            self.win.connect("realize", self._watch_first_frame)
         self.win.present()
+        debug("window presented")
+    
+    def _watch_first_frame(self, win):
+        clock = win.get_frame_clock()
+        handler = None
+        
+        def on_paint(clock):
+            clock.disconnect(handler)
+            debug("first frame painted")
+        
+        handler = clock.connect("after-paint", on_paint)
+    
+    def _page(self, tab_id: str) -> Gtk.Widget:
+        page = self.pages.get(tab_id)
+        if page is None:
+            start = time.perf_counter()
+            page = PAGE_TYPES[tab_id](self)
+            self.pages[tab_id] = page
+            self.stack.add_named(page, tab_id)
+            debug(f"built {tab_id} page in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return page
     
     def _nav_to(self, tab_id):
-        self.stack.set_visible_child_name(tab_id)
+        self.stack.set_visible_child(self._page(tab_id))
+        self._update_history_buttons()
         for tid, btn in self.nav_btns.items():
             if tid == tab_id:
                 btn.add_css_class("md3-nav-indicator")
             else:
                 btn.remove_css_class("md3-nav-indicator")
     
+    def _rail_button(self, icon: str, label: str, callback) -> Gtk.Button:
+        btn = Gtk.Button()
+        btn.add_css_class("flat")
+        btn.add_css_class("md3-nav-rail-item")
+        inner = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        inner.set_halign(Gtk.Align.CENTER)
+        ic = Gtk.Label(label=icon)
+        ic.add_css_class("md3-nav-icon")
+        inner.append(ic)
+        lb = Gtk.Label(label=label)
+        lb.add_css_class("md3-nav-label")
+        inner.append(lb)
+        btn.set_child(inner)
+        btn.connect("clicked", callback)
+        return btn
+    
+    def _visible_store(self) -> Optional[ConfigStore]:
+        return getattr(self.stack.get_visible_child(), "store", None)
+    
+    def _update_history_buttons(self):
+        store = self._visible_store()
+        undo = store.undo_description() if store else None
+        redo = store.redo_description() if store else None
+        self.undo_btn.set_sensitive(undo is not None)
+        self.redo_btn.set_sensitive(redo is not None)
+        self.undo_btn.set_tooltip_text(f"Undo: {undo}" if undo else None)
+        self.redo_btn.set_tooltip_text(f"Redo: {redo}" if redo else None)
+    
+    def _step_history(self, delta: int):
+        store = self._visible_store()
+        if store is None:
+            return
+        try:
+            description = store.undo() if delta < 0 else store.redo()
+        except OSError as e:
+            self.toast(f"Could not restore {store.path.name}: {e}", error=True)
+            return
+        if description is not None:
+            self.toast(f"{'Undone' if delta < 0 else 'Redone'}: {description}")
+    
     def _on_key(self, ctrl, keyval, keycode, state):
         if keyval == Gdk.KEY_q and state & Gdk.ModifierType.CONTROL_MASK:
             self.quit()
             return True
+        # Text fields see these first and keep their own undo.
+        if state & Gdk.ModifierType.CONTROL_MASK and keyval in (Gdk.KEY_z, Gdk.KEY_Z, Gdk.KEY_y):
+            redo = keyval == Gdk.KEY_y or bool(state & Gdk.ModifierType.SHIFT_MASK)
+            self._step_history(1 if redo else -1)
+            return True
         return False
     
     def toast(self, message: str, error: bool = False):
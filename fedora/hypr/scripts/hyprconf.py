@@ -0,0 +1,1074 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS Config Parsers
+Hyprland, hyprlock and kitty config files, without GTK
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple, NamedTuple, Iterator
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration Paths
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+HYPR_DIR = Path.home() / ".config" / "hypr"
+HYPRLAND_CONF = HYPR_DIR / "hyprland.conf"
+HYPRLOCK_CONF = HYPR_DIR / "hyprlock.conf"
+KITTY_CONF = Path.home() / ".config" / "kitty" / "kitty.conf"
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Snapshots
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_snapshot_store = None
+
+
+def snapshot_store():
+    """The shared config history, or None without snapshots.py."""
+    global _snapshot_store
+    if _snapshot_store is None:
+        # Imported on first write so read-only CLI calls stay fast
+        try:
+            import snapshots
+        except ImportError:
+            return None
+        _snapshot_store = snapshots.SnapshotStore()
+    return _snapshot_store
+
+
+def write_config(path: Path, content: str, description: str = ""):
+    """Write a config file, recording the versions before and after."""
+    store = snapshot_store()
+    if store is not None:
+        try:
+            previous = path.read_text() if path.exists() else None
+            store.record(path, content, description, previous)
+        except OSError as e:
+            print(f"snapshot of {path} failed: {e}", file=sys.stderr)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Hyprland Config Parser
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_BIND_LINE_RE = re.compile(r'^\s*(bind[a-z]*)\s*=\s*([^,]*),\s*([^,]+),\s*(.+?)\s*$')
+_SECTION_OPEN_RE = re.compile(r'^\s*([\w.:-]+)\s*\{\s*$')
+# indent, key, value; [ \t] so an empty value never runs into the next line
+_ASSIGNMENT_RE = re.compile(r'([ \t]*)([\w.:$-]+)[ \t]*=[ \t]*(.*?)[ \t]*$')
+
+
+class Keybind(NamedTuple):
+    """A single bind line and where it lives."""
+    bind_type: str
+    mods: str
+    key: str
+    action: str
+    path: Path
+    line: int
+
+
+def iter_binds(content: str, path: Path) -> List[Keybind]:
+    binds = []
+    for lineno, line in enumerate(content.splitlines(), 1):
+        match = _BIND_LINE_RE.match(line)
+        if match:
+            binds.append(Keybind(match.group(1), match.group(2).strip(),
+                                 match.group(3).strip(), match.group(4).strip(),
+                                 path, lineno))
+    return binds
+
+
+def find_sources(content: str, path: Path) -> List[Path]:
+    """Files pulled in with `source = ...`, globs expanded."""
+    sources = []
+    for raw in re.findall(r'^\s*source\s*=\s*(.+?)\s*$', content, re.MULTILINE):
+        pattern = os.path.expanduser(raw)
+        if not os.path.isabs(pattern):
+            pattern = str(path.parent / pattern)
+        if any(c in pattern for c in '*?['):
+            sources.extend(Path(p) for p in sorted(glob.glob(pattern)))
+        else:
+            sources.append(Path(pattern))
+    return sources
+
+
+def iter_assignments(content: str) -> Iterator[Tuple[str, int, "re.Match"]]:
+    """(full path, line offset, match) for every `key = value` line.
+
+    Open sections are tracked line by line, so a key only matches in its
+    own block, not in a child block, and `a:b:key = value` written flat
+    lands on the same path as the nested form. The match runs over the
+    line without its comment: group 3 is the value, group 2 the key as
+    written.
+    """
+    stack: List[str] = []
+    pos = 0
+    for line in content.split('\n'):
+        # `##` escapes a literal # in values
+        hash_at = line.replace('##', '\0\0').find('#')
+        code = line[:hash_at] if hash_at >= 0 else line
+        m = _SECTION_OPEN_RE.match(code)
+        if m:
+            stack.append(m.group(1))
+        elif code.strip() == '}':
+            if stack:
+                stack.pop()
+        else:
+            m = _ASSIGNMENT_RE.match(code)
+            if m:
+                yield ":".join(stack + [m.group(2)]), pos, m
+        pos += len(line) + 1
+
+
+class HyprlandConfig:
+    """Parse and modify Hyprland configuration files."""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.content = ""
+        self._options_source: Optional[str] = None
+        self._options: Dict[str, str] = {}
+        self.load()
+    
+    def load(self):
+        if self.path.exists():
+            self.content = self.path.read_text()
+        else:
+            self.content = ""
+    
+    def save(self, description: str = ""):
+        write_config(self.path, self.content, description)
+    
+    def _find_section_content(self, section: str) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+        """Find section content, handling nested sections like 'decoration:blur'; None if missing."""
+        parts = section.split(':')
+        
+        if len(parts) == 1:
+            # Simple section like 'decoration'
+            pattern = rf'{section}\s*\{{\s*'
+            match = re.search(pattern, self.content)
+            if not match:
+                return None, None, None
+            
+            start = match.end()
+            depth = 1
+            end = start
+            
+            while end < len(self.content) and depth > 0:
+                if self.content[end] == '{':
+                    depth += 1
+                elif self.content[end] == '}':
+                    depth -= 1
+                end += 1
+            
+            return start, end - 1, self.content[start:end - 1]
+        else:
+            # Nested section like 'decoration:blur'
+            parent = parts[0]
+            child = parts[1]
+            
+            p_start, p_end, p_content = self._find_section_content(parent)
+            if p_content is None:
+                return None, None, None
+            
+            # Find child within parent
+            pattern = rf'{child}\s*\{{\s*'
+            match = re.search(pattern, p_content)
+            if not match:
+                return None, None, None
+            
+            c_start = match.end()
+            depth = 1
+            c_end = c_start
+            
+            while c_end < len(p_content) and depth > 0:
+                if p_content[c_end] == '{':
+                    depth += 1
+                elif p_content[c_end] == '}':
+                    depth -= 1
+                c_end += 1
+            
+            # Adjust to absolute positions
+            abs_start = p_start + c_start
+            abs_end = p_start + c_end - 1
+            
+            return abs_start, abs_end, p_content[c_start:c_end - 1]
+    
+    def _matches(self, section: str, key: str) -> List[Tuple[int, "re.Match"]]:
+        """The lines that assign section:key, with their offsets."""
+        path = f"{section}:{key}" if section else key
+        return [(pos, m) for p, pos, m in iter_assignments(self.content) if p == path]
+    
+    def options(self) -> Dict[str, str]:
+        """scan_options() of the content, re-run only when the text changed."""
+        if self.content is not self._options_source:
+            self._options = scan_options(self.content)
+            self._options_source = self.content
+        return self._options
+    
+    def get_value(self, section: str, key: str, default: str = "") -> str:
+        """Get a value from config."""
+        return self.options().get(f"{section}:{key}" if section else key, default)
+    
+    def set_value(self, section: str, key: str, value: str):
+        """Set a value in config."""
+        value = value.replace('#', '##')
+        matches = self._matches(section, key)
+        # Rewrite every assignment, so the last one, which is what
+        # scan_options() and Hyprland read, is the new value too.
+        # Trailing comments are kept.
+        for pos, m in reversed(matches):
+            line = f'{m.group(1)}{m.group(2)} = {value}'
+            self.content = self.content[:pos] + line + self.content[pos + m.end(3):]
+        if matches:
+            return
+        if section:
+            start, end, content = self._find_section_content(section)
+            
+            if content is not None:
+                new_content = content.rstrip() + f'\n    {key} = {value}\n'
+                self.content = self.content[:start] + new_content + self.content[end:]
+            else:
+                # Create section(s)
+                parts = section.split(':')
+                if len(parts) == 1:
+                    self.content += f'\n{section} {{\n    {key} = {value}\n}}\n'
+                else:
+                    parent, child = parts[0], parts[1]
+                    p_start, p_end, p_content = self._find_section_content(parent)
+                    if p_content is not None:
+                        new_p = p_content.rstrip() + f'\n    {child} {{\n        {key} = {value}\n    }}\n'
+                        self.content = self.content[:p_start] + new_p + self.content[p_end:]
+                    else:
+                        self.content += f'\n{parent} {{\n    {child} {{\n        {key} = {value}\n    }}\n}}\n'
+        else:
+            self.content += f'\n{key} = {value}\n'
+    
+    def get_bool(self, section: str, key: str, default: bool = False) -> bool:
+        val = self.get_value(section, key, str(default).lower())
+        return val.lower() in ('true', 'yes', '1', 'on')
+    
+    def set_bool(self, section: str, key: str, value: bool):
+        self.set_value(section, key, 'true' if value else 'false')
+    
+    def get_int(self, section: str, key: str, default: int = 0) -> int:
+        try:
+            return int(self.get_value(section, key, str(default)))
+        except ValueError:
+            return default
+    
+    def get_float(self, section: str, key: str, default: float = 0.0) -> float:
+        try:
+            return float(self.get_value(section, key, str(default)))
+        except ValueError:
+            return default
+    
+    def get_exec_once_list(self) -> List[str]:
+        pattern = r'^\s*exec-once\s*=\s*(.+?)\s*$'
+        return re.findall(pattern, self.content, re.MULTILINE)
+    
+    def add_exec_once(self, command: str):
+        self.content += f'\nexec-once = {command}\n'
+    
+    def remove_exec_once(self, command: str):
+        pattern = rf'^\s*exec-once\s*=\s*{re.escape(command)}\s*$\n?'
+        self.content = re.sub(pattern, '', self.content, flags=re.MULTILINE)
+    
+    def get_binds(self) -> List[Tuple[str, str, str, str]]:
+        return [bind[:4] for bind in self.iter_binds()]
+    
+    def iter_binds(self) -> List[Keybind]:
+        return iter_binds(self.content, self.path)
+    
+    def get_sources(self) -> List[Path]:
+        return find_sources(self.content, self.path)
+    
+    def add_bind(self, bind_type: str, mods: str, key: str, action: str):
+        self.content += f'\n{bind_type} = {mods}, {key}, {action}\n'
+    
+    def remove_bind(self, bind: Keybind) -> bool:
+        """Remove exactly one bind line, leaving other binds on the same chord alone."""
+        if bind.path != self.path:
+            return False
+        
+        lines = self.content.splitlines(keepends=True)
+        wanted = bind[:4]
+        
+        def same(line: str) -> bool:
+            match = _BIND_LINE_RE.match(line.rstrip('\n'))
+            return bool(match) and (match.group(1), match.group(2).strip(),
+                                    match.group(3).strip(), match.group(4).strip()) == wanted
+        
+        # The file may have moved under us; fall back to the first identical line.
+        index = bind.line - 1
+        if not (0 <= index < len(lines) and same(lines[index])):
+            index = next((i for i, line in enumerate(lines) if same(line)), -1)
+            if index < 0:
+                return False
+        
+        del lines[index]
+        self.content = ''.join(lines)
+        return True
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Keybind Chord Index
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+MOD_ALIASES = {
+    "SUPER": "SUPER", "WIN": "SUPER", "LOGO": "SUPER", "MOD4": "SUPER", "META": "SUPER",
+    "CTRL": "CTRL", "CONTROL": "CTRL",
+    "ALT": "ALT", "MOD1": "ALT",
+    "SHIFT": "SHIFT",
+    "CAPS": "CAPS",
+    "MOD2": "MOD2", "MOD3": "MOD3", "MOD5": "MOD5",
+}
+MOD_ORDER = ["SUPER", "CTRL", "ALT", "SHIFT", "CAPS", "MOD2", "MOD3", "MOD5"]
+
+_VAR_DEF_RE = re.compile(r'^\s*\$([A-Za-z0-9_]+)\s*=\s*(.*?)\s*$', re.MULTILINE)
+
+
+class ChordIndex:
+    """Map normalized (modifiers, key) chords to every bind that uses them.
+
+    Modifier order and aliases are canonicalized, `$variables` are expanded
+    the way Hyprland does it (longest name first) and key names are
+    case-folded, so `$mainMod SHIFT, Q` and `shift super, q` collide.
+    Binds from `source = ...` files are indexed too.
+    """
+    
+    def __init__(self, config: HyprlandConfig):
+        self.variables: Dict[str, str] = {}
+        self.binds: List[Keybind] = []
+        self.chords: Dict[Tuple[Tuple[str, ...], str], List[Keybind]] = {}
+        
+        seen = set()
+        self._collect(config.path, config.content, seen)
+        for path in config.get_sources():
+            self._collect_file(path, seen)
+        
+        self._var_names = sorted(self.variables, key=len, reverse=True)
+        for bind in self.binds:
+            self.chords.setdefault(self.normalize(bind.mods, bind.key), []).append(bind)
+    
+    def _collect_file(self, path: Path, seen: set):
+        try:
+            content = path.read_text()
+        except OSError:
+            return
+        if self._collect(path, content, seen):
+            for sub in find_sources(content, path):
+                self._collect_file(sub, seen)
+    
+    def _collect(self, path: Path, content: str, seen: set) -> bool:
+        key = path.resolve()
+        if key in seen:
+            return False
+        seen.add(key)
+        for name, value in _VAR_DEF_RE.findall(content):
+            self.variables[name] = value
+        self.binds.extend(iter_binds(content, path))
+        return True
+    
+    def expand(self, text: str) -> str:
+        for _ in range(8):
+            if '$' not in text:
+                break
+            expanded = text
+            for name in self._var_names:
+                expanded = expanded.replace(f'${name}', self.variables[name])
+            if expanded == text:
+                break
+            text = expanded
+        return text
+    
+    def normalize(self, mods: str, key: str) -> Tuple[Tuple[str, ...], str]:
+        found = set()
+        for token in re.split(r'[\s_+]+', self.expand(mods).upper()):
+            if token in MOD_ALIASES:
+                found.add(MOD_ALIASES[token])
+        canonical = tuple(m for m in MOD_ORDER if m in found)
+        return canonical, self.expand(key).strip().casefold()
+    
+    def lookup(self, mods: str, key: str) -> List[Keybind]:
+        if not key.strip():
+            return []
+        return list(self.chords.get(self.normalize(mods, key), []))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Hyprlock Config Parser
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_HYPRLOCK_OPEN_RE = re.compile(r'^\s*([A-Za-z][\w-]*)\s*\{\s*(?:#.*)?$')
+_HYPRLOCK_KEY_RE = re.compile(r'^(\s*)([\w.:-]+)\s*=\s*(.*?)\s*$')
+
+
+class HyprlockBlock:
+    """One top-level `type { ... }` block, as line numbers into its file."""
+    
+    __slots__ = ("type", "index", "open", "close", "keys")
+    
+    def __init__(self, block_type: str, index: int, open_line: int):
+        self.type = block_type
+        self.index = index
+        self.open = open_line
+        self.close = open_line
+        self.keys: Dict[str, int] = {}
+
+
+class HyprlockConfig:
+    """Parse and modify Hyprlock configuration.
+    
+    The file is kept as its list of lines and indexed once into blocks
+    addressable by type and index (the N-th `label`). Edits replace only
+    the lines they touch, so everything else round-trips byte for byte.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._lines: List[str] = []
+        self._text: Optional[str] = ""
+        self._blocks: Optional[Dict[str, List[HyprlockBlock]]] = None
+        self.load()
+    
+    def load(self):
+        if self.path.exists():
+            self.content = self.path.read_text()
+        else:
+            # Create default config
+            self.content = """
+background {
+    path = screenshot
+    blur_passes = 3
+    blur_size = 8
+    noise = 0.0117
+    contrast = 0.8916
+    brightness = 0.8172
+    vibrancy = 0.1696
+    vibrancy_darkness = 0.0
+}
+
+input-field {
+    size = 250, 50
+    outline_thickness = 3
+    dots_size = 0.2
+    dots_spacing = 0.64
+    dots_center = true
+    fade_on_empty = true
+    placeholder_text = <i>Password...</i>
+    hide_input = false
+    position = 0, -20
+    halign = center
+    valign = center
+}
+
+label {
+    text = $TIME
+    font_size = 64
+    font_family = Google Sans Display
+    position = 0, 150
+    halign = center
+    valign = center
+}
+
+label {
+    text = cmd[update:1000] echo "$(date '+%A, %B %d')"
+    font_size = 18
+    font_family = Google Sans
+    position = 0, 80
+    halign = center
+    valign = center
+}
+"""
+    
+    def save(self, description: str = ""):
+        write_config(self.path, self.content, description)
+    
+    @property
+    def content(self) -> str:
+        if self._text is None:
+            self._text = ''.join(self._lines)
+        return self._text
+    
+    @content.setter
+    def content(self, text: str):
+        self._text = text
+        self._lines = text.splitlines(keepends=True)
+        self._blocks = None
+    
+    def _index(self) -> Dict[str, List[HyprlockBlock]]:
+        """Top-level blocks by type, parsed once per content change."""
+        if self._blocks is not None:
+            return self._blocks
+        blocks: Dict[str, List[HyprlockBlock]] = {}
+        current: Optional[HyprlockBlock] = None
+        depth = 0
+        for i, line in enumerate(self._lines):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            m = _HYPRLOCK_OPEN_RE.match(line)
+            if m:
+                depth += 1
+                if depth == 1:
+                    kind = m.group(1)
+                    current = HyprlockBlock(kind, len(blocks.get(kind, ())), i)
+                continue
+            if stripped.startswith('}'):
+                if depth == 1 and current is not None:
+                    current.close = i
+                    blocks.setdefault(current.type, []).append(current)
+                    current = None
+                depth = max(0, depth - 1)
+                continue
+            if depth == 1 and current is not None:
+                m = _HYPRLOCK_KEY_RE.match(line)
+                if m:
+                    current.keys.setdefault(m.group(2), i)
+        if current is not None:
+            # Unterminated block: treat end of file as its closing brace.
+            current.close = len(self._lines)
+            blocks.setdefault(current.type, []).append(current)
+        self._blocks = blocks
+        return blocks
+    
+    def _changed(self, reindex: bool = False):
+        self._text = None
+        if reindex:
+            self._blocks = None
+    
+    def blocks(self, block_type: Optional[str] = None) -> List[HyprlockBlock]:
+        """Blocks in file order, optionally only those of one type."""
+        index = self._index()
+        if block_type is not None:
+            return list(index.get(block_type, ()))
+        return sorted((b for bs in index.values() for b in bs), key=lambda b: b.open)
+    
+    def count(self, block_type: str) -> int:
+        return len(self._index().get(block_type, ()))
+    
+    def block(self, block_type: str, index: int = 0) -> Optional[HyprlockBlock]:
+        blocks = self._index().get(block_type, ())
+        return blocks[index] if 0 <= index < len(blocks) else None
+    
+    def get_value(self, block: str, key: str, default: str = "", index: int = 0) -> str:
+        b = self.block(block, index)
+        if b is not None and key in b.keys:
+            return _HYPRLOCK_KEY_RE.match(self._lines[b.keys[key]]).group(3) or default
+        return default
+    
+    def set_value(self, block: str, key: str, value: str, index: int = 0):
+        b = self.block(block, index)
+        if b is None:
+            self.add_block(block, {key: value})
+            return
+        
+        if key in b.keys:
+            # Rewrite just this line, keeping its indentation and line ending.
+            line = self._lines[b.keys[key]]
+            indent = _HYPRLOCK_KEY_RE.match(line).group(1)
+            body = line.rstrip('\r\n')
+            new = f'{indent}{key} = {value}{line[len(body):]}'
+            if new != line:
+                self._lines[b.keys[key]] = new
+                self._changed()
+            return
+        
+        indent = "    "
+        if b.keys:
+            indent = _HYPRLOCK_KEY_RE.match(self._lines[next(iter(b.keys.values()))]).group(1)
+        if b.close > 0 and not self._lines[b.close - 1].endswith('\n'):
+            self._lines[b.close - 1] += '\n'
+        self._lines.insert(b.close, f'{indent}{key} = {value}\n')
+        self._changed(reindex=True)
+    
+    def add_block(self, block_type: str, values: Dict[str, str]) -> int:
+        """Append a new block and return its index among blocks of its type."""
+        if self._lines and not self._lines[-1].endswith('\n'):
+            self._lines[-1] += '\n'
+        self._lines.append('\n')
+        self._lines.append(f'{block_type} {{\n')
+        self._lines.extend(f'    {key} = {value}\n' for key, value in values.items())
+        self._lines.append('}\n')
+        self._changed(reindex=True)
+        return self.count(block_type) - 1
+    
+    def remove_block(self, block_type: str, index: int) -> bool:
+        b = self.block(block_type, index)
+        if b is None:
+            return False
+        start, end = b.open, b.close + 1
+        # Take one surrounding blank line along so gaps don't pile up.
+        if start > 0 and not self._lines[start - 1].strip():
+            start -= 1
+        del self._lines[start:end]
+        self._changed(reindex=True)
+        return True
+    
+    def get_int(self, block: str, key: str, default: int = 0, index: int = 0) -> int:
+        try:
+            return int(self.get_value(block, key, str(default), index))
+        except ValueError:
+            return default
+    
+    def get_float(self, block: str, key: str, default: float = 0.0, index: int = 0) -> float:
+        try:
+            return float(self.get_value(block, key, str(default), index))
+        except ValueError:
+            return default
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Kitty Config Parser
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class KittyConfig:
+    def __init__(self, path: Path):
+        self.path = path
+        self.content = ""
+        self.load()
+    
+    def load(self):
+        if self.path.exists():
+            self.content = self.path.read_text()
+        else:
+            self.content = ""
+    
+    def save(self, description: str = ""):
+        write_config(self.path, self.content, description)
+    
+    def get_shell(self) -> str:
+        pattern = r'^\s*shell\s+(\S+)'
+        match = re.search(pattern, self.content, re.MULTILINE)
+        return match.group(1) if match else ""
+    
+    def set_shell(self, shell: str):
+        pattern = r'^\s*shell\s+\S+.*$'
+        if re.search(pattern, self.content, re.MULTILINE):
+            self.content = re.sub(pattern, f'shell {shell}', self.content, flags=re.MULTILINE)
+        else:
+            self.content += f'\nshell {shell}\n'
+    
+    def remove_shell_setting(self):
+        pattern = r'^\s*shell\s+.*$\n?'
+        self.content = re.sub(pattern, '', self.content, flags=re.MULTILINE)
+    
+    def get_value(self, key: str, default: str = "") -> str:
+        match = re.search(rf'^\s*{re.escape(key)}\s+(.+?)\s*$', self.content, re.MULTILINE)
+        return match.group(1) if match else default
+    
+    def set_value(self, key: str, value: str):
+        pattern = rf'^(\s*){re.escape(key)}\s+.*$'
+        if re.search(pattern, self.content, re.MULTILINE):
+            self.content = re.sub(pattern, lambda m: f'{m.group(1)}{key} {value}',
+                                  self.content, count=1, flags=re.MULTILINE)
+        else:
+            self.content += f'\n{key} {value}\n'
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Option Registry
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class ConfigError(Exception):
+    pass
+
+
+TRUE_WORDS = ('true', 'yes', '1', 'on')
+FALSE_WORDS = ('false', 'no', '0', 'off')
+
+
+def scan_options(content: str) -> Dict[str, str]:
+    """Every `key = value` in a Hyprland config, keyed by its full path.
+
+    Built on iter_assignments(), the same walk set_value() edits with, so
+    `decoration { blur { size = 8 } }` and `decoration:blur:size = 8`
+    both land on "decoration:blur:size". As in Hyprland, the last
+    assignment wins.
+    """
+    return {path: m.group(3).replace('##', '#') for path, _, m in iter_assignments(content)}
+
+
+class Option(NamedTuple):
+    """A typed Hyprland option as shown in Settings."""
+    section: str
+    key: str
+    type: type
+    default: Any
+    title: str
+    description: str = ""
+    group: str = ""
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    step: float = 1
+    digits: int = 0
+
+    @property
+    def path(self) -> str:
+        return f"{self.section}:{self.key}" if self.section else self.key
+
+    def parse(self, text: Optional[str]) -> Any:
+        """Typed value of `text` as found in a config, or the default."""
+        if text is None:
+            return self.default
+        try:
+            return self._convert(text)
+        except ConfigError:
+            return self.default
+
+    def coerce(self, value: Any) -> Any:
+        """Convert and range-check a value; raises ConfigError."""
+        value = self._convert(value)
+        if self.type in (int, float) and (
+                self.minimum is not None and value < self.minimum
+                or self.maximum is not None and value > self.maximum):
+            raise ConfigError(f"{self.path}: {value} is outside {self.minimum}..{self.maximum}")
+        return value
+
+    def _convert(self, value: Any) -> Any:
+        if self.type is bool:
+            if isinstance(value, bool):
+                return value
+            word = str(value).strip().lower()
+            if word in TRUE_WORDS or word in FALSE_WORDS:
+                return word in TRUE_WORDS
+            raise ConfigError(f"{self.path}: expected true or false, not {value!r}")
+        if self.type in (int, float):
+            try:
+                return self.type(value.strip() if isinstance(value, str) else value)
+            except (TypeError, ValueError):
+                raise ConfigError(f"{self.path}: expected a number, not {value!r}")
+        return str(value)
+
+    def format(self, value: Any) -> str:
+        if self.type is bool:
+            return 'true' if value else 'false'
+        if self.type is int:
+            return str(int(value))
+        if self.type is float:
+            return f"{float(value):.{self.digits}f}"
+        return str(value)
+
+
+class OptionRegistry:
+    """A set of options with typed values cached per config content."""
+
+    def __init__(self, groups: List[Tuple[str, str]], options: List[Option]):
+        self.groups = groups
+        self.options = options
+        self.by_path = {opt.path: opt for opt in options}
+        self._source: Optional[str] = None
+        self._values: Dict[str, Any] = {}
+
+    def in_group(self, group: str) -> List[Option]:
+        return [opt for opt in self.options if opt.group == group]
+
+    def read(self, config: "HyprlandConfig") -> Dict[str, Any]:
+        """Typed values of every option; re-parsed only when the text changed."""
+        if config.content is not self._source:
+            raw = config.options()
+            self._values = {opt.path: opt.parse(raw.get(opt.path)) for opt in self.options}
+            self._source = config.content
+        return self._values
+
+    def write(self, config: "HyprlandConfig", option: Option, value: Any):
+        """Set an option where read() finds it, appending it if it isn't set."""
+        config.set_value(option.section, option.key, option.format(option.coerce(value)))
+
+
+HYPRLAND_GROUPS = [
+    ("Decoration", "Visual effects and appearance"),
+    ("Layout", "Gaps and borders between windows"),
+    ("Animations", "Window and workspace animations"),
+    ("Miscellaneous", "Performance and behavior tweaks"),
+]
+
+HYPRLAND_OPTIONS = OptionRegistry(HYPRLAND_GROUPS, [
+    Option("decoration:blur", "enabled", bool, True, "Enable Blur",
+           "Blur behind transparent windows", "Decoration"),
+    Option("decoration:blur", "size", int, 8, "Blur Size",
+           "Blur radius strength", "Decoration", 1, 20),
+    Option("decoration:blur", "passes", int, 2, "Blur Passes",
+           "Number of blur iterations", "Decoration", 1, 10),
+    Option("decoration", "active_opacity", float, 1.0, "Active Window Opacity",
+           "Transparency of focused windows", "Decoration", 0.1, 1.0, 0.05, 2),
+    Option("decoration", "inactive_opacity", float, 1.0, "Inactive Window Opacity",
+           "Transparency of unfocused windows", "Decoration", 0.1, 1.0, 0.05, 2),
+    Option("decoration", "rounding", int, 10, "Corner Rounding",
+           "Window corner radius in pixels", "Decoration", 0, 30),
+    Option("general", "gaps_in", int, 5, "Inner Gaps",
+           "Space between windows in pixels", "Layout", 0, 50),
+    Option("general", "gaps_out", int, 20, "Outer Gaps",
+           "Space between windows and screen edges", "Layout", 0, 100),
+    Option("general", "border_size", int, 1, "Border Size",
+           "Window border width in pixels", "Layout", 0, 10),
+    Option("animations", "enabled", bool, True, "Enable Animations",
+           "Animated transitions and effects", "Animations"),
+    Option("misc", "vfr", bool, True, "Variable Frame Rate (VFR)",
+           "Reduce GPU usage when idle", "Miscellaneous"),
+    Option("misc", "animate_mouse_windowdragging", bool, True, "Animate Mouse Dragging",
+           "Smooth window movement while dragging", "Miscellaneous"),
+    Option("misc", "animate_manual_resizes", bool, False, "Animate Manual Resizes",
+           "Smooth resizing animations", "Miscellaneous"),
+])
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Batched Get / Set
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+CONFIG_FILES = {
+    "hyprland": (HYPRLAND_CONF, HyprlandConfig),
+    "hyprlock": (HYPRLOCK_CONF, HyprlockConfig),
+    "kitty": (KITTY_CONF, KittyConfig),
+}
+
+_BLOCK_INDEX_RE = re.compile(r'^([\w-]+)\[(\d+)\]$')
+
+
+class ConfigPath(NamedTuple):
+    """`file/key`, `file/section/key` or, for hyprlock, `hyprlock/label[1]/key`."""
+    file: str
+    section: str
+    index: int
+    key: str
+
+    @classmethod
+    def parse(cls, text: str) -> "ConfigPath":
+        parts = text.strip().strip('/').split('/')
+        if len(parts) == 2:
+            (file, key), section = parts, ""
+        elif len(parts) == 3:
+            file, section, key = parts
+        else:
+            raise ConfigError(f"bad path {text!r}: expected file/[section/]key")
+        if file not in CONFIG_FILES:
+            raise ConfigError(f"unknown file {file!r} in {text!r} (one of {', '.join(CONFIG_FILES)})")
+        index = 0
+        m = _BLOCK_INDEX_RE.match(section)
+        if m and file == "hyprlock":
+            section, index = m.group(1), int(m.group(2))
+        if file == "kitty" and section:
+            raise ConfigError(f"kitty options have no section: {text!r}")
+        if file == "hyprlock" and not section:
+            raise ConfigError(f"hyprlock options live in a block: {text!r}")
+        if not key:
+            raise ConfigError(f"missing key in {text!r}")
+        return cls(file, section, index, key)
+
+    def __str__(self) -> str:
+        section = f"{self.section}[{self.index}]" if self.file == "hyprlock" else self.section
+        return "/".join(p for p in (self.file, section, self.key) if p)
+
+
+class Batch:
+    """Get/set operations applied in one read-modify-write per file.
+
+    Files are parsed on first use and written at most once, by commit(),
+    and only if their content changed. Nothing is written when any
+    operation fails.
+    """
+
+    def __init__(self, paths: Optional[Dict[str, Path]] = None):
+        self.paths = {name: path for name, (path, _) in CONFIG_FILES.items()}
+        self.paths.update(paths or {})
+        self._configs: Dict[str, Any] = {}
+        self._original: Dict[str, str] = {}
+        self.sets: List[Tuple[ConfigPath, str]] = []
+
+    def config(self, name: str):
+        if name not in self._configs:
+            cfg = CONFIG_FILES[name][1](self.paths[name])
+            self._configs[name] = cfg
+            self._original[name] = cfg.content
+        return self._configs[name]
+
+    def get(self, path: ConfigPath) -> Optional[str]:
+        cfg = self.config(path.file)
+        if path.file == "hyprlock":
+            return cfg.get_value(path.section, path.key, None, path.index)
+        if path.file == "kitty":
+            return cfg.get_value(path.key, None)
+        # The same view of the file as the Settings pages, via scan_options()
+        return cfg.options().get(f"{path.section}:{path.key}" if path.section else path.key)
+
+    def set(self, path: ConfigPath, value: str):
+        value = str(value)
+        if '\n' in value:
+            raise ConfigError(f"{path}: values must be a single line")
+        cfg = self.config(path.file)
+        if path.file == "hyprlock":
+            if cfg.block(path.section, path.index) is None and path.index != cfg.count(path.section):
+                raise ConfigError(f"{path}: hyprlock.conf has {cfg.count(path.section)} {path.section} block(s)")
+            cfg.set_value(path.section, path.key, value, path.index)
+        elif path.file == "kitty":
+            cfg.set_value(path.key, value)
+        else:
+            option = HYPRLAND_OPTIONS.by_path.get(f"{path.section}:{path.key}" if path.section else path.key)
+            if option is not None:
+                value = option.format(option.coerce(value))
+            cfg.set_value(path.section, path.key, value)
+        self.sets.append((path, value))
+
+    def apply(self, ops: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """Run JSON-patch style operations; returns the values read.
+
+        Each op is {"op": "get"|"set"|"replace"|"add"|"test", "path": ...,
+        "value": ...}. A failing "test" aborts the whole batch.
+        """
+        results: Dict[str, Optional[str]] = {}
+        for i, op in enumerate(ops):
+            if not isinstance(op, dict) or "op" not in op or "path" not in op:
+                raise ConfigError(f"operation {i}: expected an object with 'op' and 'path'")
+            path = ConfigPath.parse(op["path"])
+            kind = op["op"]
+            if kind == "get":
+                results[str(path)] = self.get(path)
+            elif kind in ("set", "replace", "add"):
+                if "value" not in op:
+                    raise ConfigError(f"operation {i}: {kind} needs a value")
+                self.set(path, op["value"])
+            elif kind == "test":
+                current = self.get(path)
+                if current != str(op.get("value")):
+                    raise ConfigError(f"test failed: {path} is {current!r}, not {op.get('value')!r}")
+            else:
+                raise ConfigError(f"operation {i}: unknown op {kind!r}")
+        return results
+
+    def changed(self) -> List[str]:
+        return [name for name, cfg in self._configs.items()
+                if cfg.content != self._original[name]]
+
+    def commit(self, description: str = "") -> List[str]:
+        """Write every changed file once; returns their names."""
+        changed = self.changed()
+        if not description and self.sets:
+            description = "hyprconf: " + ", ".join(str(p) for p, _ in self.sets[:4])
+            if len(self.sets) > 4:
+                description += f" and {len(self.sets) - 4} more"
+        for name in changed:
+            self._configs[name].save(description)
+        return changed
+
+    def live_commands(self) -> List[str]:
+        """hyprctl keyword commands for the Hyprland options that were set."""
+        commands = []
+        for path, value in self.sets:
+            if path.file != "hyprland" or path.key.startswith('$'):
+                continue
+            keyword = f"{path.section}:{path.key}" if path.section else path.key
+            commands.append(f"keyword {keyword} {value}")
+        return commands
+
+
+def push_live(commands: List[str]):
+    """Send keyword commands to the running compositor in one IPC batch."""
+    import subprocess
+    if not commands:
+        return
+    try:
+        result = subprocess.run(["hyprctl", "--batch", " ; ".join(commands)],
+                                capture_output=True, text=True, timeout=5)
+    except subprocess.TimeoutExpired:
+        raise ConfigError("hyprctl did not answer")
+    replies = [r for r in result.stdout.split() if r != "ok"]
+    if result.returncode != 0 or replies:
+        raise ConfigError(f"hyprctl: {(result.stderr or result.stdout).strip()}")
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Command Line
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Get and set Hyprland, hyprlock and kitty options without the Settings app",
+        epilog="Paths look like hyprland/decoration:blur/size, hyprland/gaps_in "
+               "(top level), hyprlock/label[1]/font_size or kitty/font_size.")
+    parser.add_argument("--file", action="append", default=[], metavar="NAME=PATH",
+                        help="use another file for hyprland, hyprlock or kitty")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_get = sub.add_parser("get", help="print option values")
+    p_get.add_argument("paths", nargs="+")
+    p_get.add_argument("--json", action="store_true")
+
+    p_set = sub.add_parser("set", help="set options, one write per file")
+    p_set.add_argument("assignments", nargs="+", metavar="PATH=VALUE")
+
+    p_patch = sub.add_parser("patch", help="apply a JSON list of operations")
+    p_patch.add_argument("patch", help="JSON file, or - for stdin")
+
+    for p in (p_set, p_patch):
+        p.add_argument("--live", action="store_true",
+                       help="also apply Hyprland options to the running session")
+        p.add_argument("-n", "--dry-run", action="store_true", help="don't write anything")
+
+    args = parser.parse_args(argv)
+    try:
+        paths = {}
+        for spec in args.file:
+            name, sep, value = spec.partition('=')
+            if not sep or name not in CONFIG_FILES:
+                raise ConfigError(f"bad --file {spec!r}")
+            paths[name] = Path(value).expanduser()
+        batch = Batch(paths)
+
+        if args.command == "get":
+            ops = [{"op": "get", "path": p} for p in args.paths]
+        elif args.command == "set":
+            ops = []
+            for assignment in args.assignments:
+                path, sep, value = assignment.partition('=')
+                if not sep:
+                    raise ConfigError(f"expected PATH=VALUE, got {assignment!r}")
+                ops.append({"op": "set", "path": path, "value": value})
+        else:
+            text = sys.stdin.read() if args.patch == "-" else Path(args.patch).read_text()
+            try:
+                ops = json.loads(text)
+            except ValueError as e:
+                raise ConfigError(f"invalid JSON patch: {e}")
+            if not isinstance(ops, list):
+                raise ConfigError("a patch is a JSON list of operations")
+
+        results = batch.apply(ops)
+
+        if args.command == "get" and not args.json and len(results) == 1:
+            value = next(iter(results.values()))
+            if value is None:
+                return 1
+            print(value)
+        elif getattr(args, "json", False) or (args.command == "patch" and results):
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        else:
+            for path, value in results.items():
+                print(f"{path} = {'' if value is None else value}")
+
+        if args.command != "get":
+            if args.dry_run:
+                for name in batch.changed():
+                    print(f"would write {batch.paths[name]}", file=sys.stderr)
+                return 0
+            batch.commit()
+            if args.live:
+                push_live(batch.live_commands())
+    except (ConfigError, OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS Palette Cache
+Material You colour extraction with a persistent per-image cache
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration Paths
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+HOME = Path.home()
+WALLPAPER_DIR = Path(os.environ.get("WALLPAPER_DIR", HOME / "Pictures" / "Wallpapers"))
+PALETTE_CACHE_DIR = HOME / ".cache" / "carmonyos" / "palettes"
+MATUGEN_CONFIG = HOME / ".config" / "matugen" / "config.toml"
+
+DEFAULT_SCHEME = "scheme-tonal-spot"
+DEFAULT_MODE = "dark"
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+READ_CHUNK = 1024 * 1024
+
+
+class PaletteError(Exception):
+    pass
+
+
+class TemplateError(PaletteError):
+    pass
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Helpers
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def write_atomic(path: Path, data: str):
+    """Write `data` to `path` via a temporary file and rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def normalize_palette(data: dict) -> Dict[str, Dict[str, str]]:
+    """Reduce `matugen --json hex` output to {mode: {role: '#rrggbb'}}.
+
+    Older matugen releases emit colors.<mode>.<role>, newer ones
+    colors.<role>.<mode>; both end up in the same shape.
+    """
+    colors = data.get("colors", {})
+    if "dark" in colors and isinstance(colors["dark"], dict):
+        return {mode: dict(roles) for mode, roles in colors.items() if isinstance(roles, dict)}
+
+    palette: Dict[str, Dict[str, str]] = {}
+    for role, modes in colors.items():
+        if not isinstance(modes, dict):
+            continue
+        for mode, value in modes.items():
+            if mode == "default":
+                continue
+            palette.setdefault(mode, {})[role] = value
+    return palette
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Palette Cache
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class PaletteCache:
+    """Palettes on disk, keyed by image content hash and scheme.
+
+    Hashing a large wallpaper costs more than reading a small JSON file,
+    so digests are remembered per path together with the file's size and
+    mtime and only recomputed when either changes.
+    """
+
+    def __init__(self, cache_dir: Path = PALETTE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = cache_dir / "index.json"
+        self._index: Optional[Dict[str, list]] = None
+        self._dirty = False
+
+    def _load_index(self) -> Dict[str, list]:
+        if self._index is None:
+            try:
+                self._index = json.loads(self.index_path.read_text())
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def save_index(self):
+        if self._dirty and self._index is not None:
+            write_atomic(self.index_path, json.dumps(self._index))
+            self._dirty = False
+
+    def digest(self, image: Path) -> str:
+        image = image.resolve()
+        st = image.stat()
+        index = self._load_index()
+        entry = index.get(str(image))
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        digest = file_digest(image)
+        index[str(image)] = [st.st_size, st.st_mtime_ns, digest]
+        self._dirty = True
+        return digest
+
+    def path_for(self, digest: str, scheme: str) -> Path:
+        return self.cache_dir / f"{digest}.{scheme}.json"
+
+    def lookup(self, image: Path, scheme: str = DEFAULT_SCHEME) -> Optional[dict]:
+        try:
+            return json.loads(self.path_for(self.digest(image), scheme).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def store(self, image: Path, scheme: str, palette: dict):
+        write_atomic(self.path_for(self.digest(image), scheme), json.dumps(palette))
+
+    def get(self, image: Path, scheme: str = DEFAULT_SCHEME) -> Tuple[dict, bool]:
+        """Return (palette, was_cached), running matugen on a miss."""
+        palette = self.lookup(image, scheme)
+        if palette is not None:
+            self.save_index()
+            return palette, True
+        palette = extract_palette(image, scheme)
+        self.store(image, scheme, palette)
+        self.save_index()
+        return palette, False
+
+    def prune(self, keep: List[Path]) -> int:
+        """Drop digests and palettes of images no longer in `keep`."""
+        index = self._load_index()
+        keep_paths = {str(p.resolve()) for p in keep}
+        for path in [p for p in index if p not in keep_paths]:
+            del index[path]
+            self._dirty = True
+        live = {entry[2] for entry in index.values()}
+        removed = 0
+        for cached in self.cache_dir.glob("*.json"):
+            if cached != self.index_path and cached.name.split('.', 1)[0] not in live:
+                cached.unlink(missing_ok=True)
+                removed += 1
+        self.save_index()
+        return removed
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Templates
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+_TEMPLATE_TOKEN_RE = re.compile(r'\{\{\s*(.*?)\s*\}\}|<\*\s*(.*?)\s*\*>', re.S)
+_FOR_RE = re.compile(r'for\s+(\w+)\s*,\s*(\w+)\s+in\s+colors$')
+
+
+def format_color(value: str, fmt: str) -> str:
+    h = value.lstrip('#')
+    if fmt == "hex":
+        return f"#{h}"
+    if fmt == "hex_stripped":
+        return h
+    r, g, b = (int(h[i:i + 2], 16) for i in (0, 2, 4))
+    if fmt == "rgb":
+        return f"rgb({r}, {g}, {b})"
+    if fmt == "rgba":
+        return f"rgba({r}, {g}, {b}, 1)"
+    if fmt in ("red", "green", "blue"):
+        return str({"red": r, "green": g, "blue": b}[fmt])
+    raise TemplateError(f"unsupported color format '{fmt}'")
+
+
+class Template:
+    """A matugen template compiled once into text, lookup and loop nodes.
+
+    Covers the subset the bundled templates use: {{colors.<role>.<mode>.<fmt>}},
+    {{image}}, and <* for name, value in colors *> loops. Anything else
+    raises TemplateError so the caller can hand the job back to matugen.
+    """
+
+    def __init__(self, source: str, name: str = "template"):
+        self.name = name
+        self.nodes = self._parse(source)
+
+    def _parse(self, source: str) -> list:
+        root: list = []
+        stack = [root]
+        pos = 0
+        for m in _TEMPLATE_TOKEN_RE.finditer(source):
+            if m.start() > pos:
+                stack[-1].append(source[pos:m.start()])
+            pos = m.end()
+            if m.group(1) is not None:
+                stack[-1].append(("expr", m.group(1).split('.')))
+                continue
+            stmt = m.group(2)
+            loop = _FOR_RE.match(stmt)
+            if loop:
+                body: list = []
+                stack[-1].append(("for", loop.group(1), loop.group(2), body))
+                stack.append(body)
+            elif stmt == "endfor" and len(stack) > 1:
+                stack.pop()
+            else:
+                raise TemplateError(f"{self.name}: unsupported statement '<* {stmt} *>'")
+        if len(stack) > 1:
+            raise TemplateError(f"{self.name}: unterminated for loop")
+        root.append(source[pos:])
+        return root
+
+    def render(self, colors: Dict[str, Dict[str, str]], mode: str, image: str = "") -> str:
+        """Render with `colors` as {mode: {role: hex}}; 'default' means `mode`."""
+        out: List[str] = []
+        self._render(self.nodes, colors, mode, image, {}, out)
+        return "".join(out)
+
+    def _render(self, nodes: list, colors, mode, image, scope, out):
+        for node in nodes:
+            if isinstance(node, str):
+                out.append(node)
+            elif node[0] == "for":
+                _, key_var, value_var, body = node
+                for role in sorted(colors[mode]):
+                    self._render(body, colors, mode, image,
+                                 {key_var: role, value_var: role}, out)
+            else:
+                out.append(self._lookup(node[1], colors, mode, image, scope))
+
+    def _lookup(self, path: List[str], colors, mode, image, scope) -> str:
+        head = path[0]
+        if head == "image" and len(path) == 1:
+            return image
+        if head in scope and len(path) == 1:
+            return scope[head]
+        if head in scope and len(path) == 3:
+            role, variant, fmt = scope[head], path[1], path[2]
+        elif head == "colors" and len(path) == 4:
+            role, variant, fmt = path[1:]
+        else:
+            raise TemplateError(f"{self.name}: cannot resolve '{{{{{'.'.join(path)}}}}}'")
+        try:
+            value = colors[mode if variant == "default" else variant][role]
+        except KeyError:
+            raise TemplateError(f"{self.name}: no color '{role}' in '{variant}'")
+        return format_color(value, fmt)
+
+
+def load_templates(config: Path = MATUGEN_CONFIG) -> List[Tuple[str, Template, Path, Optional[str]]]:
+    """Read matugen's config and compile every template it lists.
+
+    Returns (name, template, output_path, post_hook) tuples. Templates
+    shared by several outputs are compiled once.
+    """
+    if tomllib is None:
+        raise TemplateError("tomllib unavailable (Python 3.11+ required)")
+    try:
+        with open(config, 'rb') as f:
+            data = tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise TemplateError(f"cannot read {config}: {e}")
+
+    compiled: Dict[Path, Template] = {}
+    templates = []
+    for name, entry in data.get("templates", {}).items():
+        source = Path(entry["input_path"]).expanduser()
+        if source not in compiled:
+            try:
+                compiled[source] = Template(source.read_text(), name)
+            except OSError as e:
+                raise TemplateError(f"{name}: {e}")
+        templates.append((name, compiled[source], Path(entry["output_path"]).expanduser(),
+                          entry.get("post_hook")))
+    return templates
+
+
+def render_templates(palette: dict, mode: str = DEFAULT_MODE,
+                     config: Path = MATUGEN_CONFIG) -> List[str]:
+    """Render every template from `palette` and return the names that changed.
+
+    Each distinct template is rendered once. Outputs whose content is
+    already on disk are left untouched (mtime included), so file watchers
+    and the post hooks only fire for files that really changed.
+    """
+    colors = palette.get("colors", {})
+    if not colors.get(mode):
+        raise TemplateError(f"palette has no '{mode}' colors")
+    image = palette.get("image", "")
+
+    rendered: Dict[int, str] = {}
+    changed: List[str] = []
+    hooks: List[str] = []
+    for name, template, output, post_hook in load_templates(config):
+        text = rendered.get(id(template))
+        if text is None:
+            text = rendered[id(template)] = template.render(colors, mode, image)
+        try:
+            if output.read_text() == text:
+                continue
+        except (OSError, UnicodeDecodeError):
+            pass
+        write_atomic(output, text)
+        changed.append(name)
+        if post_hook and post_hook not in hooks:
+            hooks.append(post_hook)
+
+    for hook in hooks:
+        subprocess.Popen(hook, shell=True, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+    return changed
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Matugen
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def extract_palette(image: Path, scheme: str = DEFAULT_SCHEME) -> dict:
+    """Run matugen on `image` without touching templates or the wallpaper."""
+    if not shutil.which("matugen"):
+        raise PaletteError("matugen not found")
+    result = subprocess.run(
+        ["matugen", "image", str(image), "--json", "hex", "--dry-run", "-t", scheme],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        raise PaletteError(result.stderr.strip() or f"matugen failed on {image.name}")
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        raise PaletteError("matugen returned invalid JSON")
+
+    palette = {"image": str(image), "scheme": scheme, "colors": normalize_palette(data)}
+    source = palette["colors"].get(DEFAULT_MODE, {}).get("source_color")
+    if source:
+        palette["source_color"] = source
+    return palette
+
+
+def apply_palette(image: Path, scheme: str = DEFAULT_SCHEME, mode: str = DEFAULT_MODE,
+                  cache: Optional[PaletteCache] = None) -> Tuple[bool, List[str]]:
+    """Theme the desktop from `image`.
+
+    Returns (was_cached, changed_template_names). The templates are
+    rendered in-process from the palette; only if they use something the
+    renderer does not cover is matugen asked to render them from the
+    palette's source colour, in which case every template counts as changed.
+    """
+    cache = cache or PaletteCache()
+    palette, cached = cache.get(image, scheme)
+    palette = dict(palette, image=str(image.resolve()))
+    try:
+        return cached, render_templates(palette, mode)
+    except TemplateError as e:
+        print(f"  {e}; rendering with matugen", file=sys.stderr)
+
+    source = palette.get("source_color")
+    if source:
+        args = ["matugen", "color", "hex", source]
+    else:
+        args = ["matugen", "image", str(image)]
+    result = subprocess.run(args + ["-t", scheme, "-m", mode],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise PaletteError(result.stderr.strip() or "matugen failed")
+    return cached, ["*"]
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Precompute
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def _precompute_one(image: str, scheme: str, digest: str, cache_dir: str) -> Tuple[str, str, Optional[str]]:
+    try:
+        palette = extract_palette(Path(image), scheme)
+        write_atomic(Path(cache_dir) / f"{digest}.{scheme}.json", json.dumps(palette))
+        return image, digest, None
+    except (PaletteError, OSError) as e:
+        return image, digest, str(e)
+
+
+def wallpaper_images(directory: Path = WALLPAPER_DIR) -> List[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir()
+                  if p.suffix.lower() in IMAGE_EXTENSIONS and p.is_file())
+
+
+def precompute(directory: Path = WALLPAPER_DIR, scheme: str = DEFAULT_SCHEME,
+               workers: Optional[int] = None, progress=None) -> Tuple[int, int, List[Tuple[str, str]]]:
+    """Fill the cache for every image in `directory` on a process pool.
+
+    Returns (computed, already_cached, failures). `progress(done, total)`
+    is called from the calling thread as results arrive.
+    """
+    cache = PaletteCache()
+    pending = []
+    cached = 0
+    failures: List[Tuple[str, str]] = []
+    for image in wallpaper_images(directory):
+        try:
+            digest = cache.digest(image)
+        except OSError as e:
+            failures.append((image.name, str(e)))
+            continue
+        if cache.path_for(digest, scheme).exists():
+            cached += 1
+        else:
+            pending.append((image, digest))
+    cache.save_index()
+
+    # Identical files share one digest; extract each palette once.
+    unique = {digest: image for image, digest in pending}
+    computed = 0
+    if unique:
+        workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_precompute_one, str(image), scheme, digest, str(cache.cache_dir))
+                       for digest, image in unique.items()]
+            for done, future in enumerate(as_completed(futures), 1):
+                image, _, error = future.result()
+                if error:
+                    failures.append((Path(image).name, error))
+                else:
+                    computed += 1
+                if progress:
+                    progress(done, len(futures))
+    return computed, cached, failures
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Command Line
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Material You palette cache")
+    parser.add_argument("-t", "--scheme", default=DEFAULT_SCHEME)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_apply = sub.add_parser("apply", help="theme the desktop from an image")
+    p_apply.add_argument("image", type=Path)
+    p_apply.add_argument("-m", "--mode", default=DEFAULT_MODE)
+
+    p_get = sub.add_parser("get", help="print the palette of an image as JSON")
+    p_get.add_argument("image", type=Path)
+
+    p_pre = sub.add_parser("precompute", help="cache palettes for a wallpaper folder")
+    p_pre.add_argument("directory", type=Path, nargs="?", default=WALLPAPER_DIR)
+    p_pre.add_argument("-j", "--jobs", type=int)
+
+    p_render = sub.add_parser("render", help="render the matugen templates from an image's palette")
+    p_render.add_argument("image", type=Path)
+    p_render.add_argument("-m", "--mode", default=DEFAULT_MODE)
+
+    sub.add_parser("prune", help="drop palettes of deleted wallpapers")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "apply":
+            cached, changed = apply_palette(args.image, args.scheme, args.mode)
+            print(f"  Palette {'cache hit' if cached else 'extracted'}: {args.image.name}",
+                  file=sys.stderr)
+            # Changed template names on stdout, one per line, for wal.sh
+            for name in changed:
+                print(name)
+        elif args.command == "get":
+            palette, _ = PaletteCache().get(args.image, args.scheme)
+            json.dump(palette, sys.stdout, indent=2)
+            print()
+        elif args.command == "precompute":
+            computed, cached, failures = precompute(args.directory, args.scheme, args.jobs)
+            print(f"{computed} computed, {cached} already cached, {len(failures)} failed")
+            for name, error in failures:
+                print(f"  {name}: {error}", file=sys.stderr)
+        elif args.command == "render":
+            palette, _ = PaletteCache().get(args.image, args.scheme)
+            palette = dict(palette, image=str(args.image.resolve()))
+            for name in render_templates(palette, args.mode):
+                print(name)
+        elif args.command == "prune":
+            removed = PaletteCache().prune(wallpaper_images())
+            print(f"{removed} stale palette(s) removed")
+    except (PaletteError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,14 +8,159 @@ Version 3.2 - Shadow Bug Fixed
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Gdk, Gio, GLib
+from gi.repository import Gtk, Adw, Gdk, Gio, GLib, GObject
 import sys
 import re
 import subprocess
+import threading
 from pathlib import Path
 import json
 import os
 
+_CONF_TOKEN_RE = re.compile(r'([^{}]*)([{}]|$)')
+_CONF_ASSIGN_RE = re.compile(r'^([\w.:$-]+)\s*=\s*(.*)$')
+
+TRUE_WORDS = ('true', 'yes', 'on', '1')
+
+
+class HyprConfNode:
+    """One block of a Hyprland config: its values and nested blocks.
+
+    Repeated blocks are merged and the last assignment of a key wins, as
+    in Hyprland itself. `decoration:blur:size = 7` written flat lands in
+    the same place as the nested form.
+    """
+
+    __slots__ = ('name', 'values', 'children')
+
+    def __init__(self, name=""):
+        self.name = name
+        self.values = {}
+        self.children = {}
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = HyprConfNode(name)
+        return node
+
+    def assign(self, key, value):
+        node = self
+        *blocks, key = key.split(':')
+        for name in blocks:
+            node = node.child(name)
+        node.values[key] = value
+
+    def block(self, path):
+        node = self
+        for name in path.split(':') if path else ():
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def get(self, path, default=None):
+        section, _, key = path.rpartition(':')
+        node = self.block(section)
+        if node is None:
+            return default
+        return node.values.get(key, default)
+
+
+def parse_hyprconf(text):
+    """Parse Hyprland config text into a HyprConfNode tree in one pass."""
+    root = HyprConfNode()
+    stack = [root]
+    for line in text.splitlines():
+        if '#' in line:
+            # `##` is an escaped '#', anything after a single '#' is a comment
+            hash_at = line.replace('##', '\0\0').find('#')
+            if hash_at >= 0:
+                line = line[:hash_at]
+        line = line.strip()
+        if not line:
+            continue
+        if '{' not in line and '}' not in line:
+            key, eq, value = line.partition('=')
+            if eq:
+                stack[-1].assign(key.strip(), value.strip().replace('##', '#'))
+            continue
+        for match in _CONF_TOKEN_RE.finditer(line):
+            text_part, brace = match.group(1).strip(), match.group(2)
+            if brace == '{':
+                stack.append(stack[-1].child(text_part))
+                continue
+            if text_part:
+                assign = _CONF_ASSIGN_RE.match(text_part)
+                if assign:
+                    stack[-1].assign(assign.group(1), assign.group(2).strip().replace('##', '#'))
+            if brace == '}' and len(stack) > 1:
+                stack.pop()
+    return root
+
+
+_TREE_CACHE = {}
+
+
+def load_hyprconf(path):
+    """Parsed tree of a config file, re-read only when its mtime or size change.
+
+    Returns None when the file doesn't exist.
+    """
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        _TREE_CACHE.pop(path, None)
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _TREE_CACHE.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = _TREE_CACHE[path] = (stamp, parse_hyprconf(path.read_text()))
+    return cached[1]
+
+
+# (setting name, option path, type) read by OmarchyConfigParser
+DECORATION_OPTIONS = [
+    ('blur_enabled', 'decoration:blur:enabled', bool),
+    ('blur_size', 'decoration:blur:size', int),
+    ('blur_passes', 'decoration:blur:passes', int),
+    ('blur_noise', 'decoration:blur:noise', float),
+    ('blur_contrast', 'decoration:blur:contrast', float),
+    ('blur_brightness', 'decoration:blur:brightness', float),
+    ('blur_vibrancy', 'decoration:blur:vibrancy', float),
+    ('blur_vibrancy_darkness', 'decoration:blur:vibrancy_darkness', float),
+    ('blur_xray', 'decoration:blur:xray', bool),
+    ('blur_new_optimizations', 'decoration:blur:new_optimizations', bool),
+    ('rounding', 'decoration:rounding', int),
+    ('shadow_enabled', 'decoration:shadow:enabled', bool),
+    ('shadow_range', 'decoration:shadow:range', int),
+    ('shadow_power', 'decoration:shadow:render_power', int),
+]
+
+GENERAL_OPTIONS = [
+    ('gaps_in', 'general:gaps_in', int),
+    ('gaps_out', 'general:gaps_out', int),
+    ('border_size', 'general:border_size', int),
+]
+
+INPUT_OPTIONS = [
+    ('kb_layout', 'input:kb_layout', str),
+    ('kb_variant', 'input:kb_variant', str),
+    ('kb_options', 'input:kb_options', str),
+    ('repeat_rate', 'input:repeat_rate', int),
+    ('repeat_delay', 'input:repeat_delay', int),
+    ('numlock_by_default', 'input:numlock_by_default', bool),
+    ('sensitivity', 'input:sensitivity', float),
+    ('touchpad_natural_scroll', 'input:touchpad:natural_scroll', bool),
+    ('touchpad_scroll_factor', 'input:touchpad:scroll_factor', float),
+]
+
+ANIMATIONS_OPTIONS = [
+    ('animations_enabled', 'animations:enabled', bool),
+]
+
+
 class OmarchyConfigParser:
     """Parse Omarchy/Hyprland configuration files"""
     
@@ -24,169 +169,50 @@ class OmarchyConfigParser:
         self.looknfeel_path = self.config_dir / "looknfeel.conf"
         self.input_path = self.config_dir / "input.conf"
         self.bindings_path = self.config_dir / "bindings.conf"
-        
+    
+    def _read_options(self, path, options, defaults, what):
+        """Typed values of `options` found in `path`; missing keys are left out."""
+        try:
+            tree = load_hyprconf(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error parsing {what}: {e}")
+            return defaults()
+        if tree is None:
+            return defaults()
+        
+        settings = {}
+        for name, option, kind in options:
+            raw = tree.get(option)
+            if raw is None:
+                continue
+            if kind is bool:
+                settings[name] = raw.lower() in TRUE_WORDS
+            else:
+                try:
+                    settings[name] = kind(raw)
+                except ValueError:
+                    print(f"Ignoring {option} = {raw!r} in {path.name}: not a {kind.__name__}")
+        return settings
+    
     def parse_decoration_settings(self):
         """Parse decoration block from looknfeel.conf"""
-        if not self.looknfeel_path.exists():
-            return self._default_decoration_settings()
-        
-        try:
-            content = self.looknfeel_path.read_text()
-            settings = {}
-            
-            blur_match = re.search(r'blur\s*{([^}]+)}', content, re.DOTALL)
-            if blur_match:
-                blur_content = blur_match.group(1)
-                settings['blur_enabled'] = 'enabled = true' in blur_content.lower() or 'enabled=true' in blur_content.lower()
-                
-                for key, pattern in [
-                    ('blur_size', r'size\s*=\s*(\d+)'),
-                    ('blur_passes', r'passes\s*=\s*(\d+)'),
-                ]:
-                    match = re.search(pattern, blur_content)
-                    if match:
-                        settings[key] = int(match.group(1))
-                
-                for key, pattern in [
-                    ('blur_noise', r'noise\s*=\s*([\d.]+)'),
-                    ('blur_contrast', r'contrast\s*=\s*([\d.]+)'),
-                    ('blur_brightness', r'brightness\s*=\s*([\d.]+)'),
-                    ('blur_vibrancy', r'vibrancy\s*=\s*([\d.]+)'),
-                    ('blur_vibrancy_darkness', r'vibrancy_darkness\s*=\s*([\d.]+)'),
-                ]:
-                    match = re.search(pattern, blur_content)
-                    if match:
-                        settings[key] = float(match.group(1))
-                
-                xray_match = re.search(r'xray\s*=\s*(true|false)', blur_content)
-                if xray_match:
-                    settings['blur_xray'] = xray_match.group(1) == 'true'
-                    
-                new_opt_match = re.search(r'new_optimizations\s*=\s*(true|false)', blur_content)
-                if new_opt_match:
-                    settings['blur_new_optimizations'] = new_opt_match.group(1) == 'true'
-            
-            rounding_match = re.search(r'rounding\s*=\s*(\d+)', content)
-            if rounding_match:
-                settings['rounding'] = int(rounding_match.group(1))
-                
-            shadow_match = re.search(r'shadow\s*{([^}]+)}', content, re.DOTALL)
-            if shadow_match:
-                shadow_content = shadow_match.group(1)
-                settings['shadow_enabled'] = 'enabled = true' in shadow_content.lower()
-                
-                range_match = re.search(r'range\s*=\s*(\d+)', shadow_content)
-                if range_match:
-                    settings['shadow_range'] = int(range_match.group(1))
-                    
-                power_match = re.search(r'render_power\s*=\s*(\d+)', shadow_content)
-                if power_match:
-                    settings['shadow_power'] = int(power_match.group(1))
-            
-            return settings
-        except Exception as e:
-            print(f"Error parsing decoration settings: {e}")
-            return self._default_decoration_settings()
+        return self._read_options(self.looknfeel_path, DECORATION_OPTIONS,
+                                  self._default_decoration_settings, "decoration settings")
     
     def parse_general_settings(self):
         """Parse general block"""
-        if not self.looknfeel_path.exists():
-            return self._default_general_settings()
-        
-        try:
-            content = self.looknfeel_path.read_text()
-            settings = {}
-            
-            general_match = re.search(r'general\s*{([^}]+)}', content, re.DOTALL)
-            if general_match:
-                general_content = general_match.group(1)
-                
-                for key, pattern in [
-                    ('gaps_in', r'gaps_in\s*=\s*(\d+)'),
-                    ('gaps_out', r'gaps_out\s*=\s*(\d+)'),
-                    ('border_size', r'border_size\s*=\s*(\d+)'),
-                ]:
-                    match = re.search(pattern, general_content)
-                    if match:
-                        settings[key] = int(match.group(1))
-            
-            return settings
-        except Exception as e:
-            print(f"Error parsing general settings: {e}")
-            return self._default_general_settings()
+        return self._read_options(self.looknfeel_path, GENERAL_OPTIONS,
+                                  self._default_general_settings, "general settings")
     
     def parse_input_settings(self):
         """Parse input configuration"""
-        if not self.input_path.exists():
-            return self._default_input_settings()
-        
-        try:
-            content = self.input_path.read_text()
-            settings = {}
-            
-            input_match = re.search(r'input\s*{([^}]+)}', content, re.DOTALL)
-            if input_match:
-                input_content = input_match.group(1)
-                
-                kb_layout_match = re.search(r'kb_layout\s*=\s*([^\n]+)', input_content)
-                if kb_layout_match:
-                    layouts = kb_layout_match.group(1).strip()
-                    settings['kb_layout'] = layouts
-                
-                kb_options_match = re.search(r'kb_options\s*=\s*([^\n]+)', input_content)
-                if kb_options_match:
-                    settings['kb_options'] = kb_options_match.group(1).strip()
-                
-                repeat_rate_match = re.search(r'repeat_rate\s*=\s*(\d+)', input_content)
-                if repeat_rate_match:
-                    settings['repeat_rate'] = int(repeat_rate_match.group(1))
-                repeat_delay_match = re.search(r'repeat_delay\s*=\s*(\d+)', input_content)
-                if repeat_delay_match:
-                    settings['repeat_delay'] = int(repeat_delay_match.group(1))
-                
-                numlock_match = re.search(r'numlock_by_default\s*=\s*(true|false)', input_content)
-                if numlock_match:
-                    settings['numlock_by_default'] = numlock_match.group(1) == 'true'
-                
-                sensitivity_match = re.search(r'sensitivity\s*=\s*([-\d.]+)', input_content)
-                if sensitivity_match:
-                    settings['sensitivity'] = float(sensitivity_match.group(1))
-                
-                touchpad_match = re.search(r'touchpad\s*{([^}]+)}', input_content, re.DOTALL)
-                if touchpad_match:
-                    touchpad_content = touchpad_match.group(1)
-                    
-                    natural_scroll_match = re.search(r'natural_scroll\s*=\s*(true|false)', touchpad_content)
-                    if natural_scroll_match:
-                        settings['touchpad_natural_scroll'] = natural_scroll_match.group(1) == 'true'
-                    
-                    scroll_factor_match = re.search(r'scroll_factor\s*=\s*([\d.]+)', touchpad_content)
-                    if scroll_factor_match:
-                        settings['touchpad_scroll_factor'] = float(scroll_factor_match.group(1))
-            
-            return settings
-        except Exception as e:
-            print(f"Error parsing input settings: {e}")
-            return self._default_input_settings()
+        return self._read_options(self.input_path, INPUT_OPTIONS,
+                                  self._default_input_settings, "input settings")
     
     def parse_animations_settings(self):
         """Parse animations block"""
-        if not self.looknfeel_path.exists():
-            return self._default_animations_settings()
-        
-        try:
-            content = self.looknfeel_path.read_text()
-            settings = {}
-            
-            animations_match = re.search(r'animations\s*{([^}]+)}', content, re.DOTALL)
-            if animations_match:
-                anim_content = animations_match.group(1)
-                settings['animations_enabled'] = 'enabled = true' in anim_content.lower()
-            
-            return settings
-        except Exception as e:
-            print(f"Error parsing animations: {e}")
-            return self._default_animations_settings()
+        return self._read_options(self.looknfeel_path, ANIMATIONS_OPTIONS,
+                                  self._default_animations_settings, "animations")
     
     def _default_decoration_settings(self):
         return {
@@ -216,6 +242,7 @@ class OmarchyConfigParser:
     def _default_input_settings(self):
         return {
             'kb_layout': 'us,ara',
+            'kb_variant': '',
             'kb_options': 'grp:alt_shift_toggle',
             'repeat_rate': 40,
             'repeat_delay': 600,
@@ -232,169 +259,245 @@ class OmarchyConfigParser:
 
 
 
+class HyprConfSpans:
+    """Where things are in a config's text, for editing it in place
+    
+    `values` maps the paths of options named in `keys` to the (start,
+    end) offsets of their last assigned value; `blocks` maps block paths
+    to [offset of the last closing brace, the block's indent, end of its
+    opening line]. Only lines with a brace or one of `keys` are looked
+    at, so the rules and binds that make up most of a config are
+    skipped without any Python work per line.
+    """
+    
+    __slots__ = ('values', 'blocks')
+    
+    def __init__(self, text, keys):
+        self.values = {}
+        self.blocks = {}
+        stack = []
+        for start in _candidate_lines(text, keys):
+            end = text.find('\n', start)
+            if end < 0:
+                end = len(text)
+            body = text[start:end]
+            if '#' in body:
+                hash_at = body.replace('##', '\0\0').find('#')
+                if hash_at >= 0:
+                    body = body[:hash_at]
+            stripped = body.strip()
+            indent = body[:len(body) - len(body.lstrip())]
+            
+            # The usual shapes first: `key = value`, `name {` and `}`
+            if '{' not in stripped and '}' not in stripped:
+                key, eq, value = stripped.partition('=')
+                key = key.strip()
+                if eq and key.rpartition(':')[2] in keys:
+                    after = body.index('=') + 1
+                    value = body[after:]
+                    v_start = start + after + len(value) - len(value.lstrip())
+                    self.values[':'.join(stack + [key])] = (v_start, v_start + len(value.strip()))
+                continue
+            if stripped == '}':
+                if stack:
+                    self.blocks[':'.join(stack)][0] = start + body.index('}')
+                    stack.pop()
+                continue
+            if stripped.endswith('{') and stripped.count('{') == 1 and '}' not in stripped \
+                    and '=' not in stripped:
+                stack.append(stripped[:-1].strip())
+                self.blocks[':'.join(stack)] = [None, indent, end]
+                continue
+            
+            for match in _CONF_TOKEN_RE.finditer(body):
+                text_part, brace = match.group(1), match.group(2)
+                if brace == '{':
+                    stack.append(text_part.strip())
+                    self.blocks[':'.join(stack)] = [None, indent, end]
+                    continue
+                part = text_part.strip()
+                assign = _CONF_ASSIGN_RE.match(part) if part else None
+                if assign and assign.group(1).rpartition(':')[2] in keys:
+                    lead = len(text_part) - len(text_part.lstrip())
+                    v_start = start + match.start(1) + lead + assign.start(2)
+                    self.values[':'.join(stack + [assign.group(1)])] = (
+                        v_start, v_start + len(assign.group(2).rstrip()))
+                if brace == '}' and stack:
+                    self.blocks[':'.join(stack)][0] = start + match.start(2)
+                    stack.pop()
+    
+    def inner_indent(self, text, path):
+        """Indent of the first line inside a block, comments included"""
+        close, indent, open_end = self.blocks[path]
+        for line in text[open_end:close].splitlines():
+            if line.strip():
+                inner = line[:len(line) - len(line.lstrip())]
+                if len(inner) > len(indent):
+                    return inner
+                break
+        return indent + '    '
+
+
+def _candidate_lines(text, keys):
+    """Sorted start offsets of the lines with a brace or assigning one of `keys`"""
+    starts = set()
+    for brace in '{}':
+        i = text.find(brace)
+        while i >= 0:
+            starts.add(text.rfind('\n', 0, i) + 1)
+            i = text.find(brace, i + 1)
+    if keys:
+        # Anchored on the newline so the regex engine can skip from line
+        # to line; the leading '\n' added to text makes m.start() the
+        # offset of the line itself.
+        names = '|'.join(sorted((re.escape(k) for k in keys), key=len, reverse=True))
+        key_line = re.compile(rf'\n[ \t]*(?:[\w.$-]+:)*(?:{names})[ \t]*=')
+        starts.update(m.start() for m in key_line.finditer('\n' + text))
+    return sorted(starts)
+
+
+def _format_edit_value(value):
+    return str(value).replace('#', '##')
+
+
+def apply_option_edits(text, edits):
+    """Set option paths to values in one pass over the text
+    
+    `edits` maps paths such as 'decoration:blur:size' to their new text.
+    Existing values are replaced where they stand; missing ones are
+    added at the end of their block, creating nested blocks as needed.
+    Missing options whose new value is empty are left out. Everything
+    else in the file, comments included, is kept byte for byte.
+    """
+    spans = HyprConfSpans(text, {path.rpartition(':')[2] for path in edits})
+    ops = []
+    missing = {}
+    for path, value in edits.items():
+        value = _format_edit_value(value)
+        span = spans.values.get(path)
+        if span is not None:
+            if text[span[0]:span[1]] != value:
+                # `kb_variant =` has an empty span right after the `=`
+                if span[0] == span[1] and value and text[span[0] - 1] == '=':
+                    value = ' ' + value
+                ops.append((span[0], span[1], value))
+        elif value:
+            missing[path] = value
+    
+    def closed(block):
+        entry = spans.blocks.get(block)
+        return entry is not None and entry[0] is not None
+    
+    # Group missing options under the deepest block that already exists
+    inserts = {}
+    for path, value in missing.items():
+        parts = path.split(':')
+        depth = len(parts) - 1
+        while depth > 0 and not closed(':'.join(parts[:depth])):
+            depth -= 1
+        anchor = ':'.join(parts[:depth])
+        inserts.setdefault(anchor, []).append((parts[depth:], value))
+    
+    for anchor, entries in inserts.items():
+        if anchor:
+            close, block_indent, _ = spans.blocks[anchor]
+            child_indent = spans.inner_indent(text, anchor)
+        else:
+            close, block_indent, child_indent = len(text), '', ''
+        step = child_indent[len(block_indent):] or '    '
+        lines = _render_block_lines(entries, child_indent, step)
+        
+        line_start = text.rfind('\n', 0, close) + 1
+        if anchor and text[line_start:close].strip():
+            # closing brace shares its line, e.g. `general { gaps_in = 3 }`
+            end = len(text[:close].rstrip(' \t'))
+            ops.append((end, close, '\n' + ''.join(lines) + block_indent))
+        elif anchor:
+            ops.append((line_start, line_start, ''.join(lines)))
+        else:
+            lead = '' if not text or text.endswith('\n\n') else '\n' if text.endswith('\n') else '\n\n'
+            ops.append((close, close, lead + ''.join(lines)))
+    
+    if not ops:
+        return text
+    ops.sort(key=lambda op: op[0])
+    pieces = []
+    pos = 0
+    for start, end, replacement in ops:
+        pieces.append(text[pos:start])
+        pieces.append(replacement)
+        pos = end
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+
+def _render_block_lines(entries, indent, step):
+    """Lines for `entries` [(path parts, value)], nesting shared block names"""
+    lines = []
+    groups = {}
+    for parts, value in entries:
+        if len(parts) == 1:
+            lines.append(f"{indent}{parts[0]} = {value}\n")
+        else:
+            groups.setdefault(parts[0], []).append((parts[1:], value))
+    for name, children in groups.items():
+        lines.append(f"{indent}{name} {{\n")
+        lines.extend(_render_block_lines(children, indent + step, step))
+        lines.append(f"{indent}}}\n")
+    return lines
+
+
+
 class OmarchyConfigWriter:
-    """Write settings back to Omarchy/Hyprland configuration files"""
+    """Write settings back to Omarchy/Hyprland configuration files
+    
+    The edit_* methods turn a page's settings into {option path: text};
+    ApplyTransaction merges them per file and applies them in one pass
+    with apply_option_edits.
+    """
     
     def __init__(self, config_dir):
         self.config_dir = Path(config_dir)
         self.looknfeel_path = self.config_dir / "looknfeel.conf"
         self.input_path = self.config_dir / "input.conf"
     
-    def update_blur_settings(self, settings):
-        """Update blur settings in looknfeel.conf"""
-        if not self.looknfeel_path.exists():
-            print(f"Error: {self.looknfeel_path} does not exist")
-            return False
-        
-        try:
-            content = self.looknfeel_path.read_text()
-            
-            for key, value in settings.items():
-                if key.startswith('blur_'):
-                    setting_name = key.replace('blur_', '')
-                    
-                    if isinstance(value, bool):
-                        value_str = 'true' if value else 'false'
-                    elif isinstance(value, float):
-                        value_str = f'{value:.4f}'
-                    else:
-                        value_str = str(value)
-                    
-                    pattern = rf'(blur\s*{{[^}}]*?){setting_name}\s*=\s*[^\n]+'
-                    replacement = rf'\g<1>{setting_name} = {value_str}'
-                    
-                    new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-                    if new_content != content:
-                        content = new_content
-            
-            self.looknfeel_path.write_text(content)
-            self._reload_hyprland()
-            return True
-        except Exception as e:
-            print(f"Error updating blur settings: {e}")
-            return False
+    def transaction(self):
+        return ApplyTransaction(self)
     
-    def update_decoration_settings(self, settings):
-        """Update decoration settings"""
-        if not self.looknfeel_path.exists():
-            return False
-        
-        try:
-            content = self.looknfeel_path.read_text()
-            
-            for key, value in settings.items():
-                if key == 'rounding':
-                    content = re.sub(
-                        r'rounding\s*=\s*\d+',
-                        f'rounding = {value}',
-                        content
-                    )
-                elif key.startswith('shadow_'):
-                    setting_name = key.replace('shadow_', '')
-                    if isinstance(value, bool):
-                        value_str = 'true' if value else 'false'
-                    else:
-                        value_str = str(value)
-                    
-                    pattern = rf'(shadow\s*{{[^}}]*?){setting_name}\s*=\s*[^\n]+'
-                    replacement = rf'\g<1>{setting_name} = {value_str}'
-                    content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-            
-            self.looknfeel_path.write_text(content)
-            self._reload_hyprland()
-            return True
-        except Exception as e:
-            print(f"Error updating decoration settings: {e}")
-            return False
+    def _option_edits(self, options, settings, accept, float_format=None):
+        edits = {}
+        for name, path, kind in options:
+            if name not in settings or not accept(name):
+                continue
+            value = settings[name]
+            if isinstance(value, bool):
+                edits[path] = 'true' if value else 'false'
+            elif isinstance(value, float) and float_format:
+                edits[path] = format(value, float_format)
+            else:
+                edits[path] = str(value)
+        return edits
     
-    def update_general_settings(self, settings):
-        """Update general settings"""
-        if not self.looknfeel_path.exists():
-            return False
-        
-        try:
-            content = self.looknfeel_path.read_text()
-            
-            for key, value in settings.items():
-                pattern = rf'(general\s*{{[^}}]*?){key}\s*=\s*\d+'
-                replacement = rf'\g<1>{key} = {value}'
-                content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-            
-            self.looknfeel_path.write_text(content)
-            self._reload_hyprland()
-            return True
-        except Exception as e:
-            print(f"Error updating general settings: {e}")
-            return False
+    def edit_blur(self, settings):
+        """Blur settings in looknfeel.conf"""
+        return self._option_edits(DECORATION_OPTIONS, settings,
+                                  lambda name: name.startswith('blur_'), '.4f')
     
-    def update_input_settings(self, settings):
-        """Update input settings"""
-        if not self.input_path.exists():
-            print(f"Error: {self.input_path} does not exist")
-            return False
-        
-        try:
-            content = self.input_path.read_text()
-            
-            for key, value in settings.items():
-                if key == 'kb_layout':
-                    content = re.sub(
-                        r'kb_layout\s*=\s*[^\n]+',
-                        f'kb_layout = {value}',
-                        content
-                    )
-                elif key == 'kb_options':
-                    content = re.sub(
-                        r'kb_options\s*=\s*[^\n]+',
-                        f'kb_options = {value}',
-                        content
-                    )
-                elif key in ['repeat_rate', 'repeat_delay']:
-                    content = re.sub(
-                        rf'{key}\s*=\s*\d+',
-                        f'{key} = {value}',
-                        content
-                    )
-                elif key == 'numlock_by_default':
-                    value_str = 'true' if value else 'false'
-                    content = re.sub(
-                        r'numlock_by_default\s*=\s*(true|false)',
-                        f'numlock_by_default = {value_str}',
-                        content
-                    )
-                elif key == 'sensitivity':
-                    if 'sensitivity' not in content:
-                        content = re.sub(
-                            r'(input\s*{)',
-                            rf'\g<1>\n  sensitivity = {value}',
-                            content
-                        )
-                    else:
-                        content = re.sub(
-                            r'sensitivity\s*=\s*[-\d.]+',
-                            f'sensitivity = {value}',
-                            content
-                        )
-                elif key.startswith('touchpad_'):
-                    setting_name = key.replace('touchpad_', '')
-                    if isinstance(value, bool):
-                        value_str = 'true' if value else 'false'
-                    else:
-                        value_str = str(value)
-                    
-                    pattern = rf'(touchpad\s*{{[^}}]*?){setting_name}\s*=\s*[^\n]+'
-                    replacement = rf'\g<1>{setting_name} = {value_str}'
-                    content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-            
-            self.input_path.write_text(content)
-            self._reload_hyprland()
-            return True
-        except Exception as e:
-            print(f"Error updating input settings: {e}")
-            return False
+    def edit_decoration(self, settings):
+        """Rounding and shadow settings in looknfeel.conf"""
+        return self._option_edits(DECORATION_OPTIONS, settings,
+                                  lambda name: name == 'rounding' or name.startswith('shadow_'))
+    
+    def edit_general(self, settings):
+        """Gaps and border size in looknfeel.conf"""
+        return self._option_edits(GENERAL_OPTIONS, settings, lambda name: True)
+    
+    def edit_input(self, settings):
+        """Keyboard, mouse and touchpad settings in input.conf"""
+        return self._option_edits(INPUT_OPTIONS, settings, lambda name: True)
     
     def _reload_hyprland(self):
-        """Reload Hyprland configuration"""
+        """Reload Hyprland configuration; returns (ok, message)"""
         try:
             result = subprocess.run(
                 ['hyprctl', 'reload'],
@@ -404,46 +507,198 @@ class OmarchyConfigWriter:
                 timeout=5
             )
             if result.returncode == 0:
-                print("Omarchy reloaded successfully")
-            else:
-                print(f"⚠️ Omarchy reload warning: {result.stderr}")
+                return True, "Omarchy reloaded"
+            return False, f"reload warning: {result.stderr.strip()[:50]}"
         except subprocess.TimeoutExpired:
-            print("⚠️ Omarchy reload timed out")
+            return False, "reload timed out"
         except FileNotFoundError:
-            print("⚠️ hyprctl not found - changes saved but not applied")
+            return False, "hyprctl not found - changes saved but not applied"
         except Exception as e:
-            print(f"⚠️ Could not reload Omarchy: {e}")
+            return False, f"could not reload: {e}"
+
+
+def write_atomic(path, content):
+    """Replace a file's content in one step, so Hyprland never reads half of it"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(content)
+    os.replace(tmp, path)
+
+
+class ApplyTransaction:
+    """Edits from every page, written once per file with a single reload
+    
+    add() turns each page's settings into option edits on the GTK thread;
+    run() does all file I/O and the reload, and is meant for a worker
+    thread.
+    """
+    
+    def __init__(self, writer):
+        self.writer = writer
+        self.edits = {}
+    
+    def add(self, path, edit, settings):
+        """Queue a page's edits; later edits of the same option win"""
+        self.edits.setdefault(path, {}).update(edit(settings))
+    
+    def run(self):
+        """Apply the edits; returns ([(file name, ok, message)], reload result or None)"""
+        results = []
+        changed = False
+        for path, edits in self.edits.items():
+            try:
+                original = path.read_text()
+                content = apply_option_edits(original, edits)
+                if content == original:
+                    results.append((path.name, True, "unchanged"))
+                    continue
+                write_atomic(path, content)
+                results.append((path.name, True, "saved"))
+                changed = True
+            except FileNotFoundError:
+                results.append((path.name, False, "missing"))
+            except (OSError, UnicodeDecodeError) as e:
+                results.append((path.name, False, str(e)))
+        
+        reload = self.writer._reload_hyprland() if changed else None
+        return results, reload
+
+
+
+XKB_RULES = Path("/usr/share/X11/xkb/rules/evdev.xml")
+XKB_CACHE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "omarchy-control" / "xkb-layouts.json"
+XKB_CACHE_VERSION = 1
 
+# Used when evdev.xml is missing (layout, variant, description, languages)
+FALLBACK_LAYOUTS = [
+    ('us', '', 'English (US)', 'en eng'),
+    ('ara', '', 'Arabic', 'ar ara'),
+    ('gb', '', 'English (UK)', 'en eng'),
+    ('ua', '', 'Ukrainian', 'uk ukr'),
+    ('ru', '', 'Russian', 'ru rus'),
+    ('de', '', 'German', 'de ger'),
+    ('fr', '', 'French', 'fr fre'),
+    ('es', '', 'Spanish', 'es spa'),
+    ('it', '', 'Italian', 'it ita'),
+    ('jp', '', 'Japanese', 'ja jpn'),
+    ('kr', '', 'Korean', 'ko kor'),
+    ('cn', '', 'Chinese', 'zh chi'),
+    ('tr', '', 'Turkish', 'tr tur'),
+    ('pl', '', 'Polish', 'pl pol'),
+    ('cz', '', 'Czech', 'cs cze'),
+    ('dk', '', 'Danish', 'da dan'),
+    ('no', '', 'Norwegian', 'no nor'),
+    ('se', '', 'Swedish', 'sv swe'),
+    ('fi', '', 'Finnish', 'fi fin'),
+    ('nl', '', 'Dutch', 'nl dut'),
+    ('be', '', 'Belgian', 'be'),
+    ('pt', '', 'Portuguese', 'pt por'),
+    ('br', '', 'Portuguese (Brazil)', 'pt por'),
+    ('gr', '', 'Greek', 'el gre'),
+]
+
+
+def parse_xkb_rules(path):
+    """Layouts and variants from an XKB rules XML file
+    
+    Streams the file with iterparse and drops each <layout> once read, so
+    the few hundred layouts never sit in memory as one tree. Returns
+    [(layout, variant, description, languages)] with variant '' for the
+    base layout; variants without their own language list inherit the
+    layout's.
+    """
+    from xml.etree.ElementTree import iterparse
+    
+    entries = []
+    layout = None
+    item = None
+    depth = []
+    for event, elem in iterparse(str(path), events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            depth.append(tag)
+            if tag == 'configItem' and len(depth) > 1 and depth[-2] in ('layout', 'variant'):
+                item = {'name': '', 'description': '', 'languages': []}
+            continue
+        
+        depth.pop()
+        if item is not None and depth and depth[-1] == 'configItem':
+            text = (elem.text or '').strip()
+            if tag in ('name', 'description'):
+                item[tag] = text
+            elif tag == 'shortDescription':
+                item['languages'].insert(0, text)
+        elif item is not None and tag == 'iso639Id':
+            item['languages'].append((elem.text or '').strip())
+        elif tag == 'configItem' and item is not None:
+            owner = depth[-1] if depth else ''
+            if owner == 'layout':
+                layout = item
+                entries.append((item['name'], '', item['description'], ' '.join(dict.fromkeys(item['languages']))))
+            elif owner == 'variant' and layout is not None:
+                languages = item['languages'] or layout['languages']
+                entries.append((layout['name'], item['name'], item['description'], ' '.join(dict.fromkeys(languages))))
+            item = None
+        elif tag == 'layout':
+            layout = None
+            elem.clear()
+    return entries
+
+
+def load_xkb_catalogue(rules=XKB_RULES, cache=XKB_CACHE):
+    """All XKB layouts and variants, from the cache when evdev.xml is unchanged"""
+    try:
+        st = rules.stat()
+    except OSError:
+        return list(FALLBACK_LAYOUTS)
+    stamp = [str(rules), st.st_mtime_ns, st.st_size]
+    
+    try:
+        cached = json.loads(cache.read_text())
+        if cached.get('version') == XKB_CACHE_VERSION and cached.get('source') == stamp:
+            return [tuple(entry) for entry in cached['layouts']]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    
+    try:
+        entries = parse_xkb_rules(rules)
+    except (OSError, SyntaxError) as e:
+        print(f"Error reading {rules}: {e}")
+        return list(FALLBACK_LAYOUTS)
+    
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(cache, json.dumps({
+            'version': XKB_CACHE_VERSION,
+            'source': stamp,
+            'layouts': entries,
+        }, separators=(',', ':'), ensure_ascii=False))
+    except OSError as e:
+        print(f"Could not cache keyboard layouts: {e}")
+    return entries
+
+
+def layout_key(layout, variant=''):
+    """'us' or 'us(intl)', the usual way to name a layout variant"""
+    return f"{layout}({variant})" if variant else layout
+
+
+
+class XkbLayoutItem(GObject.Object):
+    """One row of the layout picker"""
+    
+    def __init__(self, layout, variant, description, languages):
+        super().__init__()
+        self.layout = layout
+        self.variant = variant
+        self.key = layout_key(layout, variant)
+        self.description = description
+        self.search_text = f"{self.key} {description} {languages}".lower()
 
 
 class LanguageInputPage(Adw.PreferencesPage):
     """Language and input configuration page"""
     
-    AVAILABLE_LANGUAGES = {
-        'us': ' English (US)',
-        'ara': ' Arabic',
-        'uk': ' Ukrainian',
-        'ru': ' Russian',
-        'de': ' German',
-        'fr': ' French',
-        'es': ' Spanish',
-        'it': ' Italian',
-        'jp': ' Japanese',
-        'kr': ' Korean',
-        'cn': ' Chinese',
-        'tr': ' Turkish',
-        'pl': ' Polish',
-        'cz': ' Czech',
-        'dk': ' Danish',
-        'no': ' Norwegian',
-        'se': ' Swedish',
-        'fi': ' Finnish',
-        'nl': ' Dutch',
-        'be': ' Belgian',
-        'pt': ' Portuguese',
-        'br': ' Brazilian',
-        'gr': ' Greek',
-    }
+    MAX_LAYOUTS = 4
     
     SWITCH_METHODS = {
         'grp:alt_shift_toggle': 'Alt + Shift',
@@ -464,11 +719,40 @@ class LanguageInputPage(Adw.PreferencesPage):
         
         self.settings = parser.parse_input_settings()
         
-        current_layout = self.settings.get('kb_layout', 'us,ara')
-        self.selected_languages = current_layout.split(',')
+        layouts = [l.strip() for l in self.settings.get('kb_layout', 'us,ara').split(',')]
+        variants = [v.strip() for v in self.settings.get('kb_variant', '').split(',')]
+        variants += [''] * (len(layouts) - len(variants))
+        self.selected_languages = list(zip(layouts, variants))
+        
+        # Filled in by a background thread; see _on_catalogue_loaded
+        self.catalogue = None
+        self.layout_store = None
+        self.descriptions = {layout_key(l, v): d for l, v, d, _ in FALLBACK_LAYOUTS}
+        self._catalogue_waiters = []
+        threading.Thread(target=self._load_catalogue, daemon=True).start()
         
         self._create_ui()
     
+    def _load_catalogue(self):
+        entries = load_xkb_catalogue()
+        GLib.idle_add(self._on_catalogue_loaded, entries)
+    
+    def _on_catalogue_loaded(self, entries):
+        self.catalogue = entries
+        self.descriptions.update((layout_key(l, v), d) for l, v, d, _ in entries)
+        self.current_languages_row.set_subtitle(self._get_languages_display())
+        waiters, self._catalogue_waiters = self._catalogue_waiters, []
+        for callback in waiters:
+            callback()
+        return False
+    
+    def _get_layout_store(self):
+        """Gio.ListStore of every layout, built once per page"""
+        if self.layout_store is None:
+            self.layout_store = Gio.ListStore(item_type=XkbLayoutItem)
+            self.layout_store.splice(0, 0, [XkbLayoutItem(*entry) for entry in self.catalogue])
+        return self.layout_store
+    
     def _create_ui(self):
         layout_group = Adw.PreferencesGroup()
         layout_group.set_title(" Keyboard Layouts")
@@ -576,9 +860,9 @@ class LanguageInputPage(Adw.PreferencesPage):
     def _get_languages_display(self):
         """Get display string for selected languages"""
         display_names = []
-        for lang in self.selected_languages:
-            lang = lang.strip()
-            display_names.append(self.AVAILABLE_LANGUAGES.get(lang, lang))
+        for layout, variant in self.selected_languages:
+            key = layout_key(layout, variant)
+            display_names.append(self.descriptions.get(key, key))
         return ' + '.join(display_names)
     
     def _show_language_picker(self, button):
@@ -586,7 +870,7 @@ class LanguageInputPage(Adw.PreferencesPage):
         dialog = Adw.Window()
         dialog.set_transient_for(self.get_root())
         dialog.set_modal(True)
-        dialog.set_default_size(450, 550)
+        dialog.set_default_size(450, 600)
         
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         dialog.set_content(main_box)
@@ -597,25 +881,59 @@ class LanguageInputPage(Adw.PreferencesPage):
         content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         content_box.set_vexpand(True)
         
-        subtitle_label = Gtk.Label(label="Choose up to 4 layouts")
+        picked = [layout_key(l, v) for l, v in self.selected_languages]
+        
+        subtitle_label = Gtk.Label()
         subtitle_label.add_css_class("dim-label")
+        subtitle_label.set_wrap(True)
         subtitle_label.set_margin_top(10)
-        subtitle_label.set_margin_bottom(20)
+        subtitle_label.set_margin_bottom(12)
+        subtitle_label.set_margin_start(20)
+        subtitle_label.set_margin_end(20)
         content_box.append(subtitle_label)
         
-        scrolled = Gtk.ScrolledWindow()
-        scrolled.set_vexpand(True)
-        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        
-        list_box = Gtk.ListBox()
-        list_box.add_css_class("boxed-list")
-        list_box.set_margin_start(20)
-        list_box.set_margin_end(20)
-        
-        self.lang_checkboxes = {}
-        
-        for code, name in self.AVAILABLE_LANGUAGES.items():
-            row = Gtk.ListBoxRow()
+        def update_summary():
+            names = ' + '.join(self.descriptions.get(key, key) for key in picked)
+            subtitle_label.set_label(names or f"Choose up to {self.MAX_LAYOUTS} layouts")
+        update_summary()
+        
+        search = Gtk.SearchEntry()
+        search.set_placeholder_text("Search layouts, variants and languages")
+        search.set_margin_start(20)
+        search.set_margin_end(20)
+        search.set_margin_bottom(12)
+        content_box.append(search)
+        
+        # Only the visible rows exist as widgets; they are recycled on scroll
+        query = {'words': []}
+        layout_filter = Gtk.CustomFilter.new(
+            lambda item: all(word in item.search_text for word in query['words']))
+        filtered = Gtk.FilterListModel(filter=layout_filter)
+        
+        def on_search_changed(entry):
+            query['words'] = entry.get_text().lower().split()
+            layout_filter.changed(Gtk.FilterChange.DIFFERENT)
+        search.connect("search-changed", on_search_changed)
+        
+        def on_toggled(check):
+            item = check.item
+            if item is None or check.binding:
+                return
+            if check.get_active() and item.key not in picked:
+                if len(picked) >= self.MAX_LAYOUTS:
+                    check.binding = True
+                    check.set_active(False)
+                    check.binding = False
+                    subtitle_label.set_label(f"At most {self.MAX_LAYOUTS} layouts; untick one first")
+                    return
+                picked.append(item.key)
+            elif not check.get_active() and item.key in picked:
+                picked.remove(item.key)
+            update_summary()
+        
+        factory = Gtk.SignalListItemFactory()
+        
+        def setup_row(factory, list_item):
             box = Gtk.Box(spacing=12)
             box.set_margin_start(12)
             box.set_margin_end(12)
@@ -623,20 +941,68 @@ class LanguageInputPage(Adw.PreferencesPage):
             box.set_margin_bottom(8)
             
             check = Gtk.CheckButton()
-            check.set_active(code in self.selected_languages)
-            self.lang_checkboxes[code] = check
+            check.item = None
+            check.binding = False
+            check.connect("toggled", on_toggled)
             
-            label = Gtk.Label(label=name)
-            label.set_hexpand(True)
-            label.set_halign(Gtk.Align.START)
+            labels = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+            labels.set_hexpand(True)
+            title = Gtk.Label(halign=Gtk.Align.START, xalign=0, wrap=True)
+            code = Gtk.Label(halign=Gtk.Align.START)
+            code.add_css_class("dim-label")
+            code.add_css_class("caption")
+            labels.append(title)
+            labels.append(code)
             
             box.append(check)
-            box.append(label)
-            row.set_child(box)
-            list_box.append(row)
+            box.append(labels)
+            list_item.set_child(box)
+        
+        def bind_row(factory, list_item):
+            item = list_item.get_item()
+            box = list_item.get_child()
+            check = box.get_first_child()
+            labels = check.get_next_sibling()
+            labels.get_first_child().set_label(item.description)
+            labels.get_last_child().set_label(item.key)
+            check.item = item
+            check.binding = True
+            check.set_active(item.key in picked)
+            check.binding = False
+        
+        def unbind_row(factory, list_item):
+            list_item.get_child().get_first_child().item = None
+        
+        factory.connect("setup", setup_row)
+        factory.connect("bind", bind_row)
+        factory.connect("unbind", unbind_row)
+        
+        list_view = Gtk.ListView(model=Gtk.NoSelection(model=filtered), factory=factory)
+        list_view.add_css_class("boxed-list")
+        list_view.set_margin_start(20)
+        list_view.set_margin_end(20)
+        
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled.set_child(list_view)
+        
+        stack = Gtk.Stack()
+        stack.set_vexpand(True)
+        spinner = Gtk.Spinner(spinning=True, halign=Gtk.Align.CENTER, valign=Gtk.Align.CENTER)
+        stack.add_named(spinner, "loading")
+        stack.add_named(scrolled, "list")
+        content_box.append(stack)
         
-        scrolled.set_child(list_box)
-        content_box.append(scrolled)
+        def show_catalogue():
+            filtered.set_model(self._get_layout_store())
+            stack.set_visible_child_name("list")
+            update_summary()
+        
+        if self.catalogue is None:
+            self._catalogue_waiters.append(show_catalogue)
+        else:
+            show_catalogue()
         
         button_box = Gtk.Box(spacing=12)
         button_box.set_margin_top(20)
@@ -651,24 +1017,33 @@ class LanguageInputPage(Adw.PreferencesPage):
         
         apply_btn = Gtk.Button(label="Apply")
         apply_btn.add_css_class("suggested-action")
-        apply_btn.connect("clicked", lambda b: self._on_language_picker_apply(dialog))
+        apply_btn.connect("clicked", lambda b: self._on_language_picker_apply(dialog, picked))
         button_box.append(apply_btn)
         
         content_box.append(button_box)
         
         main_box.append(content_box)
+        
+        def on_close(dialog):
+            if show_catalogue in self._catalogue_waiters:
+                self._catalogue_waiters.remove(show_catalogue)
+            return False
+        dialog.connect("close-request", on_close)
         dialog.present()
+        search.grab_focus()
     
-    def _on_language_picker_apply(self, dialog):
+    def _on_language_picker_apply(self, dialog, picked):
         """Handle language picker apply"""
         new_languages = []
-        for code, check in self.lang_checkboxes.items():
-            if check.get_active():
-                new_languages.append(code)
+        for key in picked:
+            layout, _, variant = key.partition('(')
+            new_languages.append((layout, variant.rstrip(')')))
         
         if new_languages:
-            self.selected_languages = new_languages[:4]
-            self._on_setting_changed('kb_layout', ','.join(self.selected_languages))
+            self.selected_languages = new_languages[:self.MAX_LAYOUTS]
+            self._on_setting_changed('kb_layout', ','.join(l for l, v in self.selected_languages))
+            variants = ','.join(v for l, v in self.selected_languages)
+            self._on_setting_changed('kb_variant', variants if variants.strip(',') else '')
             self.current_languages_row.set_subtitle(self._get_languages_display())
         
         dialog.close()
@@ -1174,6 +1549,7 @@ class OmarchySettingsWindow(Adw.ApplicationWindow):
         apply_btn.add_css_class("suggested-action")
         apply_btn.connect("clicked", self._on_apply_settings)
         header.pack_end(apply_btn)
+        self.apply_btn = apply_btn
         
         reload_btn = Gtk.Button()
         reload_btn.set_icon_name("view-refresh-symbolic")
@@ -1294,44 +1670,52 @@ class OmarchySettingsWindow(Adw.ApplicationWindow):
     
     def _on_apply_settings(self, button):
         """Apply all settings to Hyprland configuration"""
-        success_count = 0
-        error_messages = []
-        
+        tx = self.writer.transaction()
+        looknfeel, input_conf = self.writer.looknfeel_path, self.writer.input_path
+        
+        # Same order as the pages appear; later edits win on shared keys
+        if hasattr(self.language_page, 'settings'):
+            tx.add(input_conf, self.writer.edit_input, self.language_page.settings)
+        if hasattr(self.blur_page, 'settings'):
+            tx.add(looknfeel, self.writer.edit_blur, self.blur_page.settings)
+            tx.add(looknfeel, self.writer.edit_decoration, self.blur_page.settings)
+        if hasattr(self.appearance_page, 'settings'):
+            tx.add(looknfeel, self.writer.edit_general, self.appearance_page.settings)
+        if hasattr(self.appearance_page, 'decoration_settings'):
+            tx.add(looknfeel, self.writer.edit_decoration, self.appearance_page.decoration_settings)
+        
+        self.apply_btn.set_sensitive(False)
+        threading.Thread(target=self._apply_worker, args=(tx,), daemon=True).start()
+    
+    def _apply_worker(self, tx):
         try:
-            if hasattr(self.language_page, 'settings'):
-                if self.writer.update_input_settings(self.language_page.settings):
-                    success_count += 1
-                else:
-                    error_messages.append("Input settings")
-            if hasattr(self.blur_page, 'settings'):
-                if self.writer.update_blur_settings(self.blur_page.settings):
-                    success_count += 1
-                if self.writer.update_decoration_settings(self.blur_page.settings):
-                    success_count += 1
-                else:
-                    error_messages.append("Blur settings")
-            if hasattr(self.appearance_page, 'settings'):
-                if self.writer.update_general_settings(self.appearance_page.settings):
-                    success_count += 1
-                else:
-                    error_messages.append("General settings")
-            
-            if hasattr(self.appearance_page, 'decoration_settings'):
-                if self.writer.update_decoration_settings(self.appearance_page.decoration_settings):
-                    success_count += 1
-            if error_messages:
-                toast = Adw.Toast(title=f" Applied {success_count} settings, failed: {', '.join(error_messages)}")
-                toast.set_timeout(4)
-            else:
-                toast = Adw.Toast(title=" All settings applied successfully!")
-                toast.set_timeout(3)
-            
-            self.toast_overlay.add_toast(toast)
-            
+            results, reload = tx.run()
         except Exception as e:
-            toast = Adw.Toast(title=f" Error: {str(e)}")
-            toast.set_timeout(4)
-            self.toast_overlay.add_toast(toast)
+            results, reload = [("settings", False, str(e))], None
+        GLib.idle_add(self._on_apply_done, results, reload)
+    
+    def _on_apply_done(self, results, reload):
+        self.apply_btn.set_sensitive(True)
+        for name, ok, message in results:
+            print(f"{'✓' if ok else '✗'} {name}: {message}")
+        
+        failed = [f"{name} ({message})" for name, ok, message in results if not ok]
+        saved = [name for name, ok, message in results if ok and message == "saved"]
+        if failed:
+            title = f" Failed: {', '.join(failed)}"
+            if saved:
+                title += f" · saved {', '.join(saved)}"
+        elif not saved:
+            title = " Nothing to apply, settings unchanged"
+        elif reload is not None and not reload[0]:
+            title = f" Saved {', '.join(saved)}, {reload[1]}"
+        else:
+            title = f" Saved {', '.join(saved)} and reloaded"
+        
+        toast = Adw.Toast(title=title)
+        toast.set_timeout(4 if failed or (reload and not reload[0]) else 3)
+        self.toast_overlay.add_toast(toast)
+        return False
     
     def _on_reload_hyprland(self, button):
         """Manually reload Hyprland"""
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS App Bench
+Startup time and memory benchmarks for the GTK apps
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import signal
+import tarfile
+import tempfile
+import platform
+import argparse
+import subprocess
+from io import BytesIO
+from pathlib import Path
+from statistics import median
+from typing import Optional, List, Dict, Any, Tuple
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+APPS = {
+    "clock": "arch/hypr/scripts/Clock.py",
+    "settings": "arch/hypr/scripts/Settings.py",
+    "control": "omarchy/hypr/omarchy-control.py",
+}
+
+BROADWAY_DISPLAY = ":77"
+RUN_TIMEOUT = 60
+SETTLE_TIMEOUT = 30
+
+# A metric only counts as a regression when it is both this much slower
+# in relative terms and above the absolute noise floor for its unit.
+DEFAULT_THRESHOLD = 10.0
+NOISE_FLOOR = {"ms": 5.0, "kib": 2048.0}
+IMPORT_REPORT_MS = 2.0
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Child Process (runs inside the benchmarked interpreter)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def child_main(script: Path, out: Path) -> int:
+    """Load an app without running its __main__ block, activate it and
+    record timings until the first frame is painted."""
+    import resource
+    import importlib.util
+
+    t0 = float(os.environ["APPBENCH_T0"])
+
+    def since_spawn() -> float:
+        return (time.time() - t0) * 1000
+
+    metrics: Dict[str, Any] = {"entry_ms": since_spawn(), "css": [], "pages": {}}
+    sys.path.insert(0, str(script.parent))
+    sys.argv = [str(script)]
+
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("appbench_target", script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    metrics["module_ms"] = (time.perf_counter() - start) * 1000
+
+    from gi.repository import GLib, Gio, Gtk, Adw
+
+    def timed_css(original):
+        def load(provider, data, *args):
+            start = time.perf_counter()
+            result = original(provider, data, *args)
+            metrics["css"].append({"chars": len(data),
+                                   "ms": (time.perf_counter() - start) * 1000})
+            return result
+        return load
+
+    # load_from_string is GTK 4.12+
+    if hasattr(Gtk.CssProvider, "load_from_string"):
+        Gtk.CssProvider.load_from_string = timed_css(Gtk.CssProvider.load_from_string)
+    Gtk.CssProvider.load_from_data = timed_css(Gtk.CssProvider.load_from_data)
+
+    def timed_page(cls):
+        original = cls.__init__
+
+        def init(self, *args, **kwargs):
+            start = time.perf_counter()
+            original(self, *args, **kwargs)
+            pages = metrics["pages"]
+            pages[cls.__name__] = pages.get(cls.__name__, 0.0) + (time.perf_counter() - start) * 1000
+        cls.__init__ = init
+
+    page_names = set(filter(None, os.environ.get("APPBENCH_PAGE_CLASSES", "").split(",")))
+    app_cls = None
+    timed = 0
+    for value in list(vars(module).values()):
+        if not isinstance(value, type) or value.__module__ != module.__name__:
+            continue
+        if issubclass(value, Gtk.Widget) and (value.__name__.endswith("Page")
+                                              or value.__name__ in page_names):
+            timed_page(value)
+            timed += 1
+        elif issubclass(value, Adw.Application):
+            app_cls = value
+    if app_cls is None:
+        raise SystemExit(f"{script}: no Adw.Application subclass found")
+    if not timed:
+        metrics["note"] = ("page timing skipped: no widget class named *Page "
+                           "(name them with --page-class)")
+
+    state = {"presented": False, "painted": False, "pages_done": False}
+
+    def finish():
+        if state["painted"] and state["pages_done"]:
+            app.quit()
+
+    def build_deferred_pages():
+        # Settings builds its pages on first navigation; construct the rest
+        # here so every page gets a number.
+        page_types = getattr(module, "PAGE_TYPES", None)
+        if page_types and hasattr(app, "_page"):
+            start = time.perf_counter()
+            for tab_id in page_types:
+                app._page(tab_id)
+            metrics["deferred_pages_ms"] = (time.perf_counter() - start) * 1000
+        state["pages_done"] = True
+        finish()
+        return False
+
+    def on_paint(clock):
+        if not state["painted"]:
+            state["painted"] = True
+            metrics["first_frame_ms"] = since_spawn()
+            GLib.idle_add(build_deferred_pages)
+
+    def watch_frames(win):
+        clock = win.get_frame_clock()
+        if clock is not None:
+            clock.connect("after-paint", on_paint)
+
+    original_present = Gtk.Window.present
+
+    def present(win):
+        if not state["presented"]:
+            state["presented"] = True
+            metrics["run_to_present_ms"] = (time.perf_counter() - run_start) * 1000
+            metrics["present_ms"] = since_spawn()
+            if win.get_realized():
+                watch_frames(win)
+            else:
+                win.connect("realize", watch_frames)
+        original_present(win)
+
+    Gtk.Window.present = present
+
+    def on_timeout():
+        metrics["error"] = "no frame painted within %d s" % SETTLE_TIMEOUT
+        app.quit()
+        return False
+
+    app = app_cls()
+    # Never hand activation to an instance that is already running.
+    app.set_flags(app.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+    GLib.timeout_add_seconds(SETTLE_TIMEOUT, on_timeout)
+    run_start = time.perf_counter()
+    app.run([str(script)])
+
+    metrics["peak_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    metrics["css_ms"] = sum(entry["ms"] for entry in metrics["css"])
+    if timed and not metrics["pages"] and "note" not in metrics:
+        metrics["note"] = "page timing skipped: no page class was constructed"
+    out.write_text(json.dumps(metrics))
+    return 0
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Import Times
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Cumulative milliseconds per top-level module from -X importtime."""
+    modules: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        cumulative, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        # Depth-one entries already include everything they pulled in.
+        if indent <= 1:
+            modules[name] = modules.get(name, 0.0) + cumulative / 1000
+    return modules
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Runner
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+class Backend:
+    """GDK display for the benchmarked apps.
+
+    "broadway" starts a private gtk4-broadwayd so nothing appears on screen
+    and runs are not disturbed by the compositor; "inherit" uses whatever
+    display the caller has."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.proc: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "Backend":
+        if self.name == "broadway":
+            daemon = shutil.which("gtk4-broadwayd")
+            if not daemon:
+                raise SystemExit("gtk4-broadwayd not found; install gtk4 or use --backend inherit")
+            self.proc = subprocess.Popen([daemon, BROADWAY_DISPLAY],
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            time.sleep(0.5)
+        return self
+
+    def __exit__(self, *exc):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            self.proc.wait()
+
+    def env(self) -> Dict[str, str]:
+        if self.name == "broadway":
+            return {"GDK_BACKEND": "broadway", "BROADWAY_DISPLAY": BROADWAY_DISPLAY}
+        return {}
+
+
+def run_once(script: Path, backend: Backend, home: Optional[Path],
+             page_classes: Optional[List[str]] = None) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="appbench-") as tmp:
+        out = Path(tmp) / "metrics.json"
+        env = dict(os.environ, **backend.env(), APPBENCH_T0=repr(time.time()),
+                   APPBENCH_PAGE_CLASSES=",".join(page_classes or ()))
+        if home is not None:
+            env["HOME"] = str(home)
+        cmd = [sys.executable, "-X", "importtime", str(Path(__file__).resolve()),
+               "_child", str(script), str(out)]
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, text=True, start_new_session=True)
+        try:
+            _, stderr = proc.communicate(timeout=RUN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.communicate()
+            raise RuntimeError(f"{script.name} did not exit within {RUN_TIMEOUT} s")
+        if proc.returncode != 0 or not out.exists():
+            tail = "\n".join(stderr.splitlines()[-15:])
+            raise RuntimeError(f"{script.name} exited with {proc.returncode}\n{tail}")
+        metrics = json.loads(out.read_text())
+    metrics["imports"] = parse_importtime(stderr)
+    return metrics
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of every numeric metric across runs; peak RSS takes the max."""
+    flat = [flatten(run) for run in runs]
+    keys = sorted({key for run in flat for key in run})
+    summary: Dict[str, Any] = {}
+    for key in keys:
+        values = [run[key] for run in flat if key in run]
+        summary[key] = max(values) if key == "peak_rss_kib" else median(values)
+    errors = [run["error"] for run in runs if "error" in run]
+    if errors:
+        summary["errors"] = errors
+    notes = sorted({run["note"] for run in runs if "note" in run})
+    if notes:
+        summary["notes"] = notes
+    return summary
+
+
+def flatten(metrics: Dict[str, Any]) -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for key, value in metrics.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[key] = float(value)
+        elif key == "pages":
+            for name, ms in value.items():
+                flat[f"page.{name}_ms"] = ms
+        elif key == "imports":
+            for name, ms in value.items():
+                flat[f"import.{name}_ms"] = ms
+    return flat
+
+
+def checkout(rev: str, dest: Path) -> Path:
+    """Extract the benchmarked scripts at REV into DEST."""
+    paths = sorted({str(Path(p).parent) for p in APPS.values()})
+    data = subprocess.run(["git", "-C", str(REPO_ROOT), "archive", rev, *paths],
+                          check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=BytesIO(data)) as tar:
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(dest, filter="data")
+        else:
+            tar.extractall(dest)
+    return dest
+
+
+def git_revision(root: Path) -> Optional[str]:
+    try:
+        return subprocess.run(["git", "-C", str(root), "rev-parse", "--short", "HEAD"],
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(apps: List[str], root: Path, runs: int, backend_name: str,
+              isolated_home: bool, page_classes: Optional[List[str]] = None) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with Backend(backend_name) as backend, tempfile.TemporaryDirectory(prefix="appbench-home-") as tmp:
+        home = Path(tmp) if isolated_home else None
+        for name in apps:
+            script = root / APPS[name]
+            samples = []
+            for i in range(runs):
+                print(f"  {name} run {i + 1}/{runs}", file=sys.stderr)
+                samples.append(run_once(script, backend, home, page_classes))
+            results[name] = summarize(samples)
+    return results
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Reports
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def unit_of(key: str) -> str:
+    return "kib" if key.endswith("_kib") else "ms"
+
+
+def reportable(key: str, value: float) -> bool:
+    # Most imports are noise; only show the ones that cost something.
+    return not key.startswith("import.") or value >= IMPORT_REPORT_MS
+
+
+def print_results(results: Dict[str, Any]):
+    for app, metrics in results.items():
+        print(f"\n{app}")
+        for key, value in metrics.items():
+            if key == "errors":
+                for error in value:
+                    print(f"  ! {error}")
+            elif key == "notes":
+                for note in value:
+                    print(f"  - {note}")
+            elif reportable(key, value):
+                print(f"  {key:<44} {value:>10.1f} {unit_of(key)}")
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[Tuple[str, str, float, float]]:
+    """Print a side-by-side report and return the regressions."""
+    regressions = []
+    for app in sorted(set(old) & set(new)):
+        print(f"\n{app}")
+        before, after = old[app], new[app]
+        for key in sorted(set(before) | set(after)):
+            if key in ("errors", "notes"):
+                continue
+            a, b = before.get(key), after.get(key)
+            if a is None or b is None:
+                if reportable(key, a if b is None else b):
+                    state = "removed" if b is None else "new"
+                    print(f"  {key:<44} {state:>22}")
+                continue
+            if not (reportable(key, a) or reportable(key, b)):
+                continue
+            delta = b - a
+            pct = delta / a * 100 if a else 0.0
+            regressed = pct > threshold and delta > NOISE_FLOOR[unit_of(key)]
+            mark = "  REGRESSION" if regressed else ""
+            print(f"  {key:<44} {a:>10.1f} -> {b:>10.1f} {unit_of(key)} ({pct:+6.1f}%){mark}")
+            if regressed:
+                regressions.append((app, key, a, b))
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: Dict[str, Any], revision: Optional[str], args):
+    data = {
+        "meta": {
+            "revision": revision,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "backend": args.backend,
+            "runs": args.runs,
+        },
+        "apps": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    print(f"\nbaseline written to {path}", file=sys.stderr)
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Command Line
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def cmd_run(args) -> int:
+    apps = args.apps or list(APPS)
+    unknown = [name for name in apps if name not in APPS]
+    if unknown:
+        print(f"unknown app: {', '.join(unknown)} (choose from {', '.join(APPS)})", file=sys.stderr)
+        return 2
+    with tempfile.TemporaryDirectory(prefix="appbench-rev-") as tmp:
+        if args.rev:
+            root = checkout(args.rev, Path(tmp))
+            revision = args.rev
+        else:
+            root = REPO_ROOT
+            revision = git_revision(REPO_ROOT)
+        print(f"benchmarking {', '.join(apps)} at {revision or 'working tree'}", file=sys.stderr)
+        results = benchmark(apps, root, args.runs, args.backend, args.isolated_home, args.page_class)
+
+    print_results(results)
+    if args.save:
+        save_baseline(args.save, results, revision, args)
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        print(f"\ncompared with {baseline['meta'].get('revision')} ({args.compare})")
+        if compare(baseline["apps"], results, args.threshold):
+            return 1
+    return 0
+
+
+def cmd_compare(args) -> int:
+    old, new = load_baseline(args.old), load_baseline(args.new)
+    print(f"{old['meta'].get('revision')} -> {new['meta'].get('revision')}")
+    return 1 if compare(old["apps"], new["apps"], args.threshold) else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["_child"]:
+        return child_main(Path(argv[1]), Path(argv[2]))
+
+    parser = argparse.ArgumentParser(description="Benchmark startup time and memory of the GTK apps")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="benchmark the apps")
+    run.add_argument("apps", nargs="*", metavar="APP",
+                     help=f"apps to benchmark ({', '.join(APPS)}; default: all)")
+    run.add_argument("-n", "--runs", type=int, default=5)
+    run.add_argument("--backend", choices=["broadway", "inherit"], default="broadway")
+    run.add_argument("--rev", help="benchmark a git revision instead of the working tree")
+    run.add_argument("--isolated-home", action="store_true",
+                     help="run with an empty HOME so user configs don't skew results")
+    run.add_argument("--page-class", action="append", default=[], metavar="NAME",
+                     help="also time this widget class as a page (names ending in Page always are)")
+    run.add_argument("--save", type=Path, metavar="JSON", help="write results as a baseline")
+    run.add_argument("--compare", type=Path, metavar="JSON", help="report regressions against a baseline")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, metavar="PCT")
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser("compare", help="report regressions between two baselines")
+    cmp.add_argument("old", type=Path)
+    cmp.add_argument("new", type=Path)
+    cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, metavar="PCT")
+    cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
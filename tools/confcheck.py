@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS Config Check
+Correctness and speed checks for the omarchy control panel's config parser and writer,
+and correctness checks for the hyprconf.py command line
+"""
+
+import os
+import re
+import ast
+import json
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from statistics import median
+from typing import Optional, List, Dict, Any, Callable
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+CONTROL_SCRIPT = "omarchy/hypr/omarchy-control.py"
+SAMPLE_DIRS = ["omarchy/hypr", "ubuntu/hypr"]
+
+HYPRCONF_SCRIPT = "arch/hypr/scripts/hyprconf.py"
+HYPRLAND_SAMPLE = "arch/hypr/hyprland.conf"
+
+# Top-level names lifted out of omarchy-control.py; none of them needs gi.
+PARSER_NAMES = {
+    "HyprConfNode", "parse_hyprconf", "load_hyprconf", "OmarchyConfigParser",
+    "HyprConfSpans", "apply_option_edits", "_candidate_lines", "_render_block_lines",
+    "_format_edit_value",
+    "OmarchyConfigWriter",
+}
+
+# Line counts of the generated configs the writer is timed on
+BENCH_SIZES = [100, 1000, 10000]
+
+_BLUR = {
+    'blur_enabled': True, 'blur_size': 7, 'blur_passes': 4, 'blur_noise': 0.008,
+    'blur_contrast': 2.0, 'blur_brightness': 1.26, 'blur_vibrancy': 0.67,
+    'blur_vibrancy_darkness': 0.38, 'blur_xray': True, 'blur_new_optimizations': True,
+    'rounding': 25, 'shadow_enabled': True, 'shadow_range': 30, 'shadow_power': 3,
+}
+_INPUT = {
+    # sensitivity and natural_scroll are commented out in the samples
+    'kb_layout': 'us,ara', 'kb_options': 'grp:alt_shift_toggle', 'repeat_rate': 40,
+    'repeat_delay': 600, 'numlock_by_default': True, 'touchpad_scroll_factor': 0.4,
+}
+
+EXPECTED = {
+    "omarchy/hypr": {
+        "decoration": _BLUR,
+        "general": {'gaps_in': 3, 'gaps_out': 3, 'border_size': 3},
+        "input": _INPUT,
+        "animations": {'animations_enabled': True},
+    },
+    "ubuntu/hypr": {
+        "decoration": _BLUR,
+        "general": {'gaps_in': 2, 'gaps_out': 20, 'border_size': 2},
+        "input": _INPUT,
+        "animations": {'animations_enabled': True},
+    },
+}
+
+# (description, config text, option path, expected value)
+TREE_CASES = [
+    ("nested block after a sibling",
+     "decoration {\n  blur {\n    size = 3\n  }\n  shadow {\n    range = 9\n  }\n  rounding = 4\n}\n",
+     "decoration:rounding", "4"),
+    ("value after a nested block",
+     "decoration {\n  blur {\n    size = 3\n  }\n  rounding = 4\n}\n",
+     "decoration:blur:size", "3"),
+    ("commented assignment",
+     "input {\n  # sensitivity = 0.5\n  sensitivity = -0.2\n}\n",
+     "input:sensitivity", "-0.2"),
+    ("commented only",
+     "input {\n  # sensitivity = 0.5\n}\n", "input:sensitivity", None),
+    ("trailing comment", "general {\n  gaps_in = 5 # px\n}\n", "general:gaps_in", "5"),
+    ("escaped hash", "misc {\n  font = a##b\n}\n", "misc:font", "a#b"),
+    ("flat path", "decoration:blur:size = 11\n", "decoration:blur:size", "11"),
+    ("flat key inside block", "decoration {\n  blur:passes = 2\n}\n", "decoration:blur:passes", "2"),
+    ("one-line block", "general { border_size = 6 }\n", "general:border_size", "6"),
+    ("repeated blocks merge", "general {\n  gaps_in = 1\n}\ngeneral {\n  gaps_out = 2\n}\n",
+     "general:gaps_in", "1"),
+    ("last assignment wins", "general {\n  gaps_in = 1\n  gaps_in = 7\n}\n", "general:gaps_in", "7"),
+    ("same key at another depth", "enabled = false\nblur {\n  enabled = true\n}\n", "enabled", "false"),
+    ("unbalanced close", "}\ngeneral {\n  gaps_in = 4\n}\n", "general:gaps_in", "4"),
+]
+
+# (description, config text, {option path: value}, expected text)
+WRITER_CASES = [
+    ("replace in place, comment kept",
+     "general {\n    gaps_in = 3 # px\n}\n", {"general:gaps_in": "5"},
+     "general {\n    gaps_in = 5 # px\n}\n"),
+    ("commented key is not touched",
+     "input {\n  # sensitivity = 0.2\n}\n", {"input:sensitivity": "0.5"},
+     "input {\n  # sensitivity = 0.2\n  sensitivity = 0.5\n}\n"),
+    ("same key in a sibling block",
+     "decoration {\n    blur {\n        enabled = true\n    }\n    shadow {\n        enabled = true\n    }\n}\n",
+     {"decoration:shadow:enabled": "false"},
+     "decoration {\n    blur {\n        enabled = true\n    }\n    shadow {\n        enabled = false\n    }\n}\n"),
+    ("missing key goes into its block",
+     "input {\n  kb_layout = us\n  touchpad {\n    scroll_factor = 0.4\n  }\n}\n",
+     {"input:touchpad:natural_scroll": "true"},
+     "input {\n  kb_layout = us\n  touchpad {\n    scroll_factor = 0.4\n    natural_scroll = true\n  }\n}\n"),
+    ("missing nested block is created",
+     "decoration {\n    rounding = 4\n}\n", {"decoration:blur:size": "8", "decoration:blur:passes": "2"},
+     "decoration {\n    rounding = 4\n    blur {\n        size = 8\n        passes = 2\n    }\n}\n"),
+    ("missing top-level block is appended",
+     "general {\n    gaps_in = 3\n}\n", {"misc:vfr": "true"},
+     "general {\n    gaps_in = 3\n}\n\nmisc {\n    vfr = true\n}\n"),
+    ("flat key edited where it is",
+     "decoration:blur:size = 7\n", {"decoration:blur:size": "9"}, "decoration:blur:size = 9\n"),
+    ("one-line block",
+     "general { gaps_in = 3 }\n", {"general:gaps_in": "4", "general:gaps_out": "6"},
+     "general { gaps_in = 4\n    gaps_out = 6\n}\n"),
+    ("empty value for a missing key is skipped",
+     "input {\n  kb_layout = us\n}\n", {"input:kb_variant": ""}, "input {\n  kb_layout = us\n}\n"),
+    ("hash in value is escaped",
+     "misc {\n}\n", {"misc:font": "a#b"}, "misc {\n    font = a##b\n}\n"),
+    ("empty value gets a space after the =",
+     "input {\n  kb_variant =\n  kb_model = \n}\n", {"input:kb_variant": "intl", "input:kb_model": "pc105"},
+     "input {\n  kb_variant = intl\n  kb_model = pc105\n}\n"),
+    ("unchanged value keeps the text",
+     "general {\n\tgaps_in=3\n}\n", {"general:gaps_in": "3"}, "general {\n\tgaps_in=3\n}\n"),
+]
+
+# (description, hyprconf.py set assignments, {path: value read back afterwards})
+# Each case starts from a fresh copy of the bundled hyprland.conf.
+HYPRCONF_CASES = [
+    ("set into a missing section",
+     ["hyprland/xwayland/force_zero_scaling=true"],
+     {"hyprland/xwayland/force_zero_scaling": "true", "hyprland/general/gaps_in": "2"}),
+    ("backslashes in a value are kept as written",
+     ["hyprland/general/layout=x\\ny", "hyprland/misc/disable_splash_rendering=x\\gy"],
+     {"hyprland/general/layout": "x\\ny", "hyprland/misc/disable_splash_rendering": "x\\gy"}),
+    ("top-level key leaves nested keys of the same name alone",
+     ["hyprland/enabled=false"],
+     {"hyprland/enabled": "false", "hyprland/decoration:blur/enabled": "true",
+      "hyprland/decoration:shadow/enabled": "true", "hyprland/animations/enabled": "true"}),
+    ("empty value is replaced on its own line",
+     ["hyprland/input/kb_variant=intl"],
+     {"hyprland/input/kb_variant": "intl", "hyprland/input/kb_model": "",
+      "hyprland/input/kb_options": "grp:alt_shift_toggle"}),
+    ("section key leaves a child block's key of the same name alone",
+     ["hyprland/input/natural_scroll=true"],
+     {"hyprland/input/natural_scroll": "true", "hyprland/input:touchpad/natural_scroll": "false"}),
+    ("flat path edits the nested assignment",
+     ["hyprland/decoration:rounding=12"],
+     {"hyprland/decoration/rounding": "12", "hyprland/decoration:rounding": "12"}),
+    ("top-level key replaced where it is",
+     ["hyprland/monitor=,preferred,auto,1"],
+     {"hyprland/monitor": ",preferred,auto,1", "hyprland/general/gaps_in": "2"}),
+]
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Loading the Parser
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def load_parser(source: str, filename: str) -> Dict[str, Any]:
+    """Execute the parser part of omarchy-control.py without importing gi.
+
+    Keeps module-level constants and the definitions in PARSER_NAMES;
+    older revisions without a tree parser still yield OmarchyConfigParser.
+    """
+    module = ast.parse(source, filename)
+    keep = []
+    for node in module.body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef)) and node.name in PARSER_NAMES:
+            keep.append(node)
+        elif isinstance(node, ast.Assign) and all(
+                isinstance(t, ast.Name) and t.id.lstrip('_').isupper() for t in node.targets):
+            keep.append(node)
+    namespace: Dict[str, Any] = {"re": re, "os": os, "Path": Path, "__name__": "omarchy_control"}
+    exec(compile(ast.Module(keep, type_ignores=[]), filename, "exec"), namespace)
+    if "OmarchyConfigParser" not in namespace:
+        raise SystemExit(f"{filename}: no OmarchyConfigParser found")
+    return namespace
+
+
+def source_at(rev: Optional[str]) -> str:
+    if rev is None:
+        return (REPO_ROOT / CONTROL_SCRIPT).read_text()
+    return subprocess.run(["git", "-C", str(REPO_ROOT), "show", f"{rev}:{CONTROL_SCRIPT}"],
+                          check=True, capture_output=True, text=True).stdout
+
+
+def getters(parser) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    return {
+        "decoration": parser.parse_decoration_settings,
+        "general": parser.parse_general_settings,
+        "input": parser.parse_input_settings,
+        "animations": parser.parse_animations_settings,
+    }
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Correctness
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def check_samples(ns: Dict[str, Any]) -> List[str]:
+    failures = []
+    for sample, expected in EXPECTED.items():
+        parser = ns["OmarchyConfigParser"](REPO_ROOT / sample)
+        for what, getter in getters(parser).items():
+            got = getter()
+            if got != expected[what]:
+                diff = {k: (got.get(k), expected[what].get(k))
+                        for k in set(got) | set(expected[what]) if got.get(k) != expected[what].get(k)}
+                failures.append(f"{sample} {what}: got/expected {diff}")
+    return failures
+
+
+def check_tree(ns: Dict[str, Any]) -> List[str]:
+    failures = []
+    for description, text, option, expected in TREE_CASES:
+        got = ns["parse_hyprconf"](text).get(option)
+        if got != expected:
+            failures.append(f"tree, {description}: {option} is {got!r}, expected {expected!r}")
+    return failures
+
+
+def check_cache(ns: Dict[str, Any]) -> List[str]:
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        conf_dir = Path(tmp)
+        parser = ns["OmarchyConfigParser"](conf_dir)
+        if parser.parse_general_settings() != parser._default_general_settings():
+            failures.append("cache: a missing looknfeel.conf should give the defaults")
+
+        path = conf_dir / "looknfeel.conf"
+        path.write_text("general {\n  gaps_in = 4\n}\n")
+        first = ns["load_hyprconf"](path)
+        if ns["load_hyprconf"](path) is not first:
+            failures.append("cache: an unchanged file was parsed again")
+        if parser.parse_general_settings() != {'gaps_in': 4}:
+            failures.append("cache: getter doesn't read the written file")
+
+        path.write_text("general {\n  gaps_in = 9\n}\n")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        if parser.parse_general_settings() != {'gaps_in': 9}:
+            failures.append("cache: a rewritten file wasn't parsed again")
+
+        path.unlink()
+        if ns["load_hyprconf"](path) is not None:
+            failures.append("cache: a deleted file is still served from the cache")
+    return failures
+
+def check_writer(ns: Dict[str, Any]) -> List[str]:
+    failures = []
+    apply = ns["apply_option_edits"]
+    for description, text, edits, expected in WRITER_CASES:
+        got = apply(text, edits)
+        if got != expected:
+            failures.append(f"writer, {description}: got {got!r}, expected {expected!r}")
+            continue
+        tree = ns["parse_hyprconf"](got)
+        for option, value in edits.items():
+            if value and tree.get(option) != value:
+                failures.append(f"writer, {description}: {option} reads back as {tree.get(option)!r}")
+
+    # Every setting the panel writes, applied to the samples, reads back unchanged
+    for sample in SAMPLE_DIRS:
+        for path, settings in apply_settings(ns, REPO_ROOT / sample).items():
+            text = apply(path.read_text(), settings)
+            tree = ns["parse_hyprconf"](text)
+            for option, value in settings.items():
+                if tree.get(option) != value:
+                    failures.append(f"writer, {sample}/{path.name}: {option} reads back as "
+                                    f"{tree.get(option)!r}, wrote {value!r}")
+    return failures
+
+
+def check_hyprconf_cli() -> List[str]:
+    failures = []
+    sample = (REPO_ROOT / HYPRLAND_SAMPLE).read_text()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the snapshots of these writes out of the real history
+        env = dict(os.environ, HOME=tmp, XDG_STATE_HOME=tmp)
+        conf = Path(tmp) / "hyprland.conf"
+
+        def hyprconf(*args: str) -> subprocess.CompletedProcess:
+            return subprocess.run([sys.executable, str(REPO_ROOT / HYPRCONF_SCRIPT),
+                                   "--file", f"hyprland={conf}", *args],
+                                  capture_output=True, text=True, env=env, timeout=30)
+
+        for description, assignments, expected in HYPRCONF_CASES:
+            conf.write_text(sample)
+            result = hyprconf("set", *assignments)
+            if result.returncode != 0:
+                failures.append(f"hyprconf, {description}: set failed: {result.stderr.strip()}")
+                continue
+            # A new block is a few lines per assignment, never a second copy of the file
+            grown = conf.read_text().count("\n") - sample.count("\n")
+            if grown > 4 * len(assignments):
+                failures.append(f"hyprconf, {description}: the file grew by {grown} lines")
+            result = hyprconf("get", "--json", *expected)
+            got = json.loads(result.stdout) if result.returncode == 0 else {}
+            for path, value in expected.items():
+                if got.get(path) != value:
+                    failures.append(f"hyprconf, {description}: {path} reads back as "
+                                    f"{got.get(path)!r}, expected {value!r}")
+    return failures
+
+
+def panel_settings(ns: Dict[str, Any], conf_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """The settings dicts the panel's pages hold, with every value changed."""
+    parser = ns["OmarchyConfigParser"](conf_dir)
+    decoration = {**parser._default_decoration_settings(), **parser.parse_decoration_settings()}
+    general = {**parser._default_general_settings(), **parser.parse_general_settings()}
+    inputs = {**parser._default_input_settings(), **parser.parse_input_settings()}
+    for settings in (decoration, general, inputs):
+        for name, value in settings.items():
+            if isinstance(value, bool):
+                settings[name] = not value
+            elif isinstance(value, (int, float)):
+                settings[name] = value + 1
+    inputs['kb_layout'] = 'us,de'
+    inputs['kb_variant'] = ',nodeadkeys'
+    return {"decoration": decoration, "general": general, "input": inputs}
+
+
+def apply_settings(ns: Dict[str, Any], conf_dir: Path) -> Dict[Path, Dict[str, str]]:
+    """Option edits per file, merged the way ApplyTransaction does."""
+    writer = ns["OmarchyConfigWriter"](conf_dir)
+    pages = panel_settings(ns, conf_dir)
+    looknfeel = {**writer.edit_blur(pages["decoration"]), **writer.edit_decoration(pages["decoration"]),
+                 **writer.edit_general(pages["general"])}
+    return {writer.looknfeel_path: looknfeel, writer.input_path: writer.edit_input(pages["input"])}
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Speed
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def time_us(fn: Callable[[], Any], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1e6)
+    return median(samples)
+
+
+def bench(ns: Dict[str, Any], runs: int) -> Dict[str, float]:
+    """Median microseconds for reading every setting the panel shows."""
+    parser = ns["OmarchyConfigParser"](REPO_ROOT / SAMPLE_DIRS[0])
+    calls = list(getters(parser).values())
+
+    def all_settings():
+        for call in calls:
+            call()
+
+    results = {"all getters": time_us(all_settings, runs)}
+    cache = ns.get("_TREE_CACHE")
+    if cache is not None:
+        def cold():
+            cache.clear()
+            all_settings()
+        results["all getters, cold cache"] = time_us(cold, runs)
+        text = parser.looknfeel_path.read_text()
+        results["parse looknfeel.conf"] = time_us(lambda: ns["parse_hyprconf"](text), runs)
+    results.update(bench_writer(ns, runs))
+    return results
+
+
+def large_config(sample: str, lines: int) -> str:
+    """The sample looknfeel.conf padded to about `lines` lines with rules
+    and per-device blocks, as a long-lived config tends to be."""
+    out = [sample]
+    count = sample.count('\n')
+    i = 0
+    while count < lines:
+        if i % 100 == 99:
+            out.append(f"device {{\n    name = mouse-{i}\n    sensitivity = 0\n}}\n")
+            count += 4
+        else:
+            out.append(f"windowrulev2 = opacity 0.9 0.8, class:^(app-{i})$ # rule {i}\n")
+            count += 1
+        i += 1
+    return ''.join(out)
+
+
+def bench_writer(ns: Dict[str, Any], runs: int) -> Dict[str, float]:
+    """Median microseconds for one Apply's edits to looknfeel.conf.
+
+    Revisions before the span writer chained regex edits over the text;
+    those are timed the same way for --compare.
+    """
+    conf_dir = REPO_ROOT / SAMPLE_DIRS[0]
+    writer = ns["OmarchyConfigWriter"](conf_dir)
+    if not hasattr(writer, "edit_blur"):
+        return {}
+    pages = panel_settings(ns, conf_dir)
+    sample = writer.looknfeel_path.read_text()
+    deco, general = pages["decoration"], pages["general"]
+
+    if "apply_option_edits" in ns:
+        def apply(text):
+            edits = {**writer.edit_blur(deco), **writer.edit_decoration(deco), **writer.edit_general(general)}
+            return ns["apply_option_edits"](text, edits)
+    else:
+        def apply(text):
+            text = writer.edit_blur(text, deco)
+            text = writer.edit_decoration(text, deco)
+            return writer.edit_general(text, general)
+
+    results = {}
+    for lines in BENCH_SIZES:
+        text = large_config(sample, lines)
+        results[f"apply, {lines}-line config"] = time_us(lambda: apply(text), max(5, runs // (lines // 100 or 1)))
+    return results
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Command Line
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the omarchy config parser against the sample configs")
+    parser.add_argument("--runs", type=int, default=200, help="timing repetitions (default 200)")
+    parser.add_argument("--compare", metavar="REV",
+                        help="also time the parser and writer of a git revision, e.g. HEAD~1")
+    parser.add_argument("--budget-us", type=float,
+                        help="fail when reading all settings takes longer than this")
+    parser.add_argument("--no-bench", action="store_true", help="only run the correctness checks")
+    args = parser.parse_args(argv)
+
+    ns = load_parser(source_at(None), CONTROL_SCRIPT)
+    failures = (check_tree(ns) + check_samples(ns) + check_cache(ns) + check_writer(ns)
+                + check_hyprconf_cli())
+    total = (len(TREE_CASES) + len(EXPECTED) * 4 + 1 + len(WRITER_CASES) + len(SAMPLE_DIRS)
+             + len(HYPRCONF_CASES))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{'FAILED' if failures else 'ok'}: {len(failures)} failure(s) in {total} check groups")
+
+    if not args.no_bench:
+        current = bench(ns, args.runs)
+        baseline = bench(load_parser(source_at(args.compare), f"{args.compare}:{CONTROL_SCRIPT}"),
+                         args.runs) if args.compare else {}
+        print()
+        for name, us in current.items():
+            line = f"{name:<28} {us:10.1f} µs"
+            if name in baseline:
+                line += f"   {args.compare}: {baseline[name]:10.1f} µs  ({baseline[name] / us:.1f}x)"
+            print(line)
+        if args.budget_us is not None and current["all getters"] > args.budget_us:
+            print(f"FAIL reading all settings took {current['all getters']:.1f} µs "
+                  f"(budget {args.budget_us:.1f} µs)")
+            return 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
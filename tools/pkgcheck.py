@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+CarmonyOS Package Check
+Correctness checks for the pacman sync database reader, search index and vercmp
+"""
+
+import sys
+import tarfile
+import tempfile
+import argparse
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, List, Dict
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Configuration
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SCRIPTS_DIR = "arch/hypr/scripts"
+
+# Fixture sync databases: repo -> desc file contents, one per package
+FIXTURE_DBS = {
+    "core": {
+        "bash-5.2.037-1": "%NAME%\nbash\n\n%VERSION%\n5.2.037-1\n\n"
+                          "%DESC%\nThe GNU Bourne Again shell\n\n"
+                          "%PROVIDES%\nsh=5.2\n\n",
+        "zsh-5.9-5": "%NAME%\nzsh\n\n%VERSION%\n5.9-5\n\n%DESC%\nA very advanced shell\n\n",
+    },
+    "extra": {
+        "firefox-131.0-1": "%NAME%\nfirefox\n\n%VERSION%\n131.0-1\n\n"
+                           "%DESC%\nFast, Private & Safe Web Browser\n\n"
+                           "%GROUPS%\nbrowsers\n\n",
+        "firefox-i18n-de-131.0-1": "%NAME%\nfirefox-i18n-de\n\n%VERSION%\n131.0-1\n\n"
+                                   "%DESC%\nGerman language pack for Firefox\n\n",
+        "foxtheme-2.1-1": "%NAME%\nfoxtheme\n\n%VERSION%\n2:2.1-1\n\n"
+                          "%DESC%\nA dark theme for firefox\n\n",
+        "broken-1.0-1": "%NAME%\nbroken\n\n",
+    },
+}
+
+# (repo, [(name, version, description, provides, groups), ...]) as read_sync_db returns them
+EXPECTED_DBS = {
+    "core": [
+        ("bash", "5.2.037-1", "The GNU Bourne Again shell", ("sh",), ()),
+        ("zsh", "5.9-5", "A very advanced shell", (), ()),
+    ],
+    "extra": [
+        ("firefox", "131.0-1", "Fast, Private & Safe Web Browser", (), ("browsers",)),
+        ("firefox-i18n-de", "131.0-1", "German language pack for Firefox", (), ()),
+        ("foxtheme", "2:2.1-1", "A dark theme for firefox", (), ()),
+    ],
+}
+
+# (query, package names in the expected order)
+SEARCH_CASES = [
+    ("firefox", ["firefox", "firefox-i18n-de", "foxtheme"]),
+    ("FIREFOX german", ["firefox-i18n-de"]),
+    # Equal scores: the shorter name first
+    ("shell", ["zsh", "bash"]),
+    ("fire brow", ["firefox"]),
+    ("i18n-de", ["firefox-i18n-de"]),
+    ("theme dark", ["foxtheme"]),
+    ("nothing-like-this", []),
+    ("", []),
+]
+
+# (a, b, vercmp(a, b)), mostly from pacman's vercmptest.sh; each is also
+# checked reversed
+VERCMP_CASES = [
+    ("1.5.0", "1.5.0", 0),
+    ("1.5.1", "1.5.0", 1),
+    ("1.5.1", "1.5", 1),
+    ("1.10", "1.9", 1),
+    ("1.01", "1.1", 0),
+    # pkgrel
+    ("1.5.0-1", "1.5.0-2", -1),
+    ("1.5.0-2", "1.5.1-1", -1),
+    ("1.5-2", "1.5.1-1", -1),
+    ("1.5", "1.5-1", 0),
+    ("1.1-1", "1.1", 0),
+    ("1.0-1", "1.1", -1),
+    # alpha and numeric segments
+    ("1.0a", "1.0alpha", -1),
+    ("1.0alpha", "1.0b", -1),
+    ("1.0b", "1.0beta", -1),
+    ("1.0beta", "1.0rc", -1),
+    ("1.0rc", "1.0", -1),
+    ("1.5.a", "1.5", 1),
+    ("1.5.b", "1.5.a", 1),
+    ("1.5.1", "1.5.b", 1),
+    ("1.5.b-1", "1.5.b", 0),
+    ("1.5-1", "1.5.b", -1),
+    # separators
+    ("2.0", "2_0", 0),
+    ("2.0_a", "2_0.a", 0),
+    ("2.0a", "2.0.a", -1),
+    ("2___a", "2_a", 1),
+    # A tilde is just a separator to pacman, unlike rpm and dpkg
+    ("1.0~rc1", "1.0", 1),
+    ("1.0~rc1", "1.0~rc2", -1),
+    ("1.0~rc1", "1.0.rc1", 0),
+    # epoch
+    ("0:1.0", "1.0", 0),
+    ("0:1.0", "0:1.1", -1),
+    ("1:1.0", "0:1.1", 1),
+    ("1:1.0", "2:1.1", -1),
+    ("1:1.0", "0:1.0-1", 1),
+    ("1:1.0-1", "0:1.1-1", 1),
+    ("1:1.0", "1.1", 1),
+    ("2:2.1-1", "3.0-1", 1),
+]
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Fixtures
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def write_db(path: Path, packages: Dict[str, str]):
+    """A `<repo>.db` gzipped tar of `<pkg>/desc` files, as pacman downloads it."""
+    with tarfile.open(path, "w:gz") as tar:
+        for entry, desc in packages.items():
+            folder = tarfile.TarInfo(entry)
+            folder.type = tarfile.DIRTYPE
+            tar.addfile(folder)
+            data = desc.encode()
+            info = tarfile.TarInfo(f"{entry}/desc")
+            info.size = len(data)
+            tar.addfile(info, BytesIO(data))
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+#  Correctness
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def check_reader(pkgdb, sync_dir: Path) -> List[str]:
+    failures = []
+    for repo, expected in EXPECTED_DBS.items():
+        got = [(p.name, p.version, p.description, p.provides, p.groups)
+               for p in pkgdb.read_sync_db(sync_dir / f"{repo}.db")]
+        if got != expected:
+            failures.append(f"read_sync_db {repo}.db: got {got!r}, expected {expected!r}")
+        repos = {p.repo for p in pkgdb.read_sync_db(sync_dir / f"{repo}.db")}
+        if repos != {repo}:
+            failures.append(f"read_sync_db {repo}.db: repo names {sorted(repos)}")
+    return failures
+
+
+def check_search(pkgdb, sync_dir: Path) -> List[str]:
+    failures = []
+    index = pkgdb.SyncIndex(sync_dir)
+    if not index.refresh():
+        failures.append("search: first refresh read nothing")
+    if index.refresh():
+        failures.append("search: unchanged databases were read again")
+    for query, expected in SEARCH_CASES:
+        got = [p.name for p in index.search(query)]
+        if got != expected:
+            failures.append(f"search {query!r}: got {got}, expected {expected}")
+    if [p.name for p in index.search("firefox", limit=1)] != ["firefox"]:
+        failures.append("search: limit doesn't keep the best match")
+
+    write_db(sync_dir / "core.db", {"fish-3.7.1-2": "%NAME%\nfish\n\n%VERSION%\n3.7.1-2\n\n"
+                                                    "%DESC%\nSmart and user friendly shell\n\n"})
+    if not index.refresh():
+        failures.append("search: a rewritten database wasn't read again")
+    got = [p.name for p in index.search("shell")]
+    if got != ["fish"]:
+        failures.append(f"search after rewrite: got {got}, expected ['fish']")
+    return failures
+
+
+def check_vercmp(pkgdb) -> List[str]:
+    failures = []
+    for a, b, expected in VERCMP_CASES:
+        for x, y, want in ((a, b, expected), (b, a, -expected)):
+            got = pkgdb.vercmp(x, y)
+            if got != want:
+                failures.append(f"vercmp {x} {y}: got {got}, expected {want}")
+    return failures
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check pkgdb against fixture sync databases and vercmp vectors")
+    parser.parse_args(argv)
+
+    sys.path.insert(0, str(REPO_ROOT / SCRIPTS_DIR))
+    import pkgdb
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_dir = Path(tmp)
+        for repo, packages in FIXTURE_DBS.items():
+            write_db(sync_dir / f"{repo}.db", packages)
+        failures = check_reader(pkgdb, sync_dir) + check_search(pkgdb, sync_dir)
+    failures += check_vercmp(pkgdb)
+    total = len(EXPECTED_DBS) + len(SEARCH_CASES) + 4 + len(VERCMP_CASES)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{'FAILED' if failures else 'ok'}: {len(failures)} failure(s) in {total} check groups")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())